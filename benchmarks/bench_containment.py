@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+"""Benchmark checking pattern containment with the explicit stack search
+behind CompiledPattern.contained_in against taking the first occurrence from
+the generators of occurrences_in.
+
+For each pattern length k and perm length n, random patterns that are not
+monotone (those are checked by the longest monotone subsequence) are looked
+for in random perms; the microseconds per check are reported.
+
+The patterns with a dedicated matcher are then checked with contained_in
+against the stack search alone, both in random perms, which almost always
+contain them, and in perms avoiding them.
+
+Usage:
+    python benchmarks/bench_containment.py [count]
+"""
+
+import random
+import sys
+import time
+
+from permuta import CompiledPattern, Perm
+from permuta._pattern_matchers import MATCHERS
+
+
+PATTERN_LENGTHS = range(3, 9)
+PERM_LENGTHS = [10, 30, 100, 300, 1000]
+MATCHER_PERM_LENGTHS = [10, 100, 1000]
+# The stack search is too slow to time on the long avoiders
+SEARCH_AVOIDER_LENGTH = 100
+
+# Patterns avoided by skew sums of increasing runs; the others with a
+# matcher are avoided by direct sums of decreasing runs
+SKEW_AVOIDED = [(0, 2, 1), (1, 0, 2), (0, 2, 1, 3), (1, 3, 0, 2)]
+
+
+def generator_contains(compiled, perm):
+    return any(True for _ in compiled.occurrences_in(perm))
+
+
+def stack_contains(compiled, perm):
+    return compiled._search(perm)
+
+
+def microseconds(function, pairs):
+    start = time.perf_counter()
+    for compiled, perm in pairs:
+        function(compiled, perm)
+    return (time.perf_counter() - start)*1e6/len(pairs)
+
+
+def avoider(generator, pattern, length):
+    """Return a random sum of monotone runs avoiding pattern."""
+    entries = []
+    low, high = 0, length
+    while low < high:
+        size = generator.randint(1, min(high - low, 8))
+        if tuple(pattern) in SKEW_AVOIDED:
+            entries.extend(range(high - size, high))
+            high -= size
+        else:
+            entries.extend(range(low + size - 1, low - 1, -1))
+            low += size
+    return Perm(entries)
+
+
+def matcher_rows(generator, count):
+    print()
+    print("{:>12} {:>5} {:>8} {:>11} {:>15}".format(
+        "pattern", "n", "perms", "stack (us)", "contained (us)"))
+    for pattern in MATCHERS:
+        compiled = CompiledPattern.compile(pattern)
+        for perm_length in MATCHER_PERM_LENGTHS:
+            for kind in ("random", "avoiding"):
+                if kind == "random":
+                    perms = [Perm(generator.sample(range(perm_length), perm_length))
+                             for _ in range(count)]
+                else:
+                    perms = [avoider(generator, pattern, perm_length)
+                             for _ in range(max(count//20, 1))]
+                pairs = [(compiled, perm) for perm in perms]
+                if kind == "avoiding" and perm_length > SEARCH_AVOIDER_LENGTH:
+                    old = float("nan")
+                else:
+                    old = microseconds(stack_contains, pairs)
+                new = microseconds(CompiledPattern.contained_in, pairs)
+                print("{:>12} {:>5} {:>8} {:>11.1f} {:>15.1f}".format(
+                    "".join(str(element + 1) for element in pattern),
+                    perm_length, kind, old, new))
+
+
+def main(count=200):
+    generator = random.Random(0)
+    print("{:>3} {:>5} {:>9} {:>15} {:>11} {:>8}".format(
+        "k", "n", "contained", "generator (us)", "stack (us)", "speedup"))
+    for pattern_length in PATTERN_LENGTHS:
+        for perm_length in PERM_LENGTHS:
+            pairs = []
+            while len(pairs) < count:
+                patt = Perm(generator.sample(range(pattern_length), pattern_length))
+                compiled = CompiledPattern.compile(patt)
+                if compiled.direction:
+                    continue
+                perm = Perm(generator.sample(range(perm_length), perm_length))
+                pairs.append((compiled, perm))
+            contained = sum(compiled.contained_in(perm) for compiled, perm in pairs)
+            old = microseconds(generator_contains, pairs)
+            # Time the search itself rather than contained_in, which hands
+            # patterns with a dedicated matcher over to it
+            new = microseconds(stack_contains, pairs)
+            print("{:>3} {:>5} {:>9.0%} {:>15.1f} {:>11.1f} {:>7.1f}x".format(
+                pattern_length, perm_length, contained/count, old, new, old/new))
+    matcher_rows(generator, count)
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+"""Import-time benchmark for permuta.
+
+Each statement is timed in a fresh interpreter, so nothing is cached between
+runs. The minimum and median over the repeats are reported in milliseconds;
+pass --json to get a single JSON object instead, e.g. for tracking in CI.
+
+Usage:
+    python benchmarks/bench_import.py [repeat] [--json]
+"""
+
+import json
+import statistics
+import subprocess
+import sys
+
+
+STATEMENTS = [
+    "import permuta",
+    "from permuta import Perm",
+    "from permuta import PermSet",
+    "from permuta import MeshPatt",
+    "import permuta.io",
+]
+
+TIMER = """\
+import time
+start = time.perf_counter()
+{}
+print(time.perf_counter() - start)
+"""
+
+
+def import_time(statement):
+    """Return the seconds a fresh interpreter takes to run statement."""
+    output = subprocess.check_output([sys.executable, "-c", TIMER.format(statement)])
+    return float(output)
+
+
+def main(repeat=20, as_json=False):
+    results = {}
+    for statement in STATEMENTS:
+        times = [import_time(statement)*1000 for _ in range(repeat)]
+        results[statement] = {"min": min(times), "median": statistics.median(times)}
+    if as_json:
+        print(json.dumps(results, indent=2, sort_keys=True))
+        return
+    print("{:<30} {:>10} {:>12}".format("statement", "min (ms)", "median (ms)"))
+    for statement, result in results.items():
+        print("{:<30} {:>10.2f} {:>12.2f}".format(
+            statement, result["min"], result["median"]))
+
+
+if __name__ == "__main__":
+    arguments = [argument for argument in sys.argv[1:] if argument != "--json"]
+    main(*map(int, arguments), as_json="--json" in sys.argv[1:])
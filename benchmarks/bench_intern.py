@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+"""Benchmark the effect of perm interning on AvoidingGeneric._ensure_level.
+
+Each basis is enumerated up to the given length from an empty cache, once
+with interning off and once with it on.
+
+Usage:
+    python benchmarks/bench_intern.py [length]
+"""
+
+import sys
+import timeit
+
+from permuta import Perm, PermStore
+from permuta.descriptors import Basis
+from permuta._perm_set.unbounded.described.avoiding import AvoidingGeneric
+
+
+BASES = [
+    [Perm((0, 2, 1))],
+    [Perm((0, 2, 1, 3))],
+    [Perm((1, 3, 0, 2)), Perm((2, 0, 3, 1))],
+]
+
+
+def ensure_level(basis, length):
+    avoiders = AvoidingGeneric(Basis(basis))
+    avoiders.cache = [PermStore([Perm()])]
+    avoiders._ensure_level(length)  # pylint: disable=protected-access
+
+
+def main(length=9):
+    print("{:<28} {:>10} {:>10}".format("basis", "plain (s)", "intern (s)"))
+    for basis in BASES:
+        plain = min(timeit.repeat(lambda: ensure_level(basis, length),
+                                  number=1, repeat=3))
+        Perm.toggle_interning()
+        try:
+            interned = min(timeit.repeat(lambda: ensure_level(basis, length),
+                                         number=1, repeat=3))
+        finally:
+            Perm.toggle_interning()
+            Perm.collect_interned()
+        name = ", ".join("".join(map(str, perm)) for perm in basis)
+        print("{:<28} {:>10.3f} {:>10.3f}".format(name, plain, interned))
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
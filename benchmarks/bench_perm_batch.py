@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+"""Benchmark PermBatch statistics, composition and inversion against a Perm
+method call per perm.
+
+Usage:
+    python benchmarks/bench_perm_batch.py [length] [count]
+"""
+
+import sys
+import time
+
+from permuta import Perm, PermBatch
+
+
+STATISTICS = [
+    "count_descents",
+    "count_ascents",
+    "count_peaks",
+    "count_valleys",
+    "count_fixed_points",
+    "count_bonds",
+    "majorindex",
+    "count_inversions",
+    "count_ltrmin",
+    "is_involution",
+    "count_cycles",
+]
+
+# Name -> (operation on a list of perms, operation on a batch)
+OPERATIONS = {
+    "inverse": (lambda perms, other: [perm.inverse() for perm in perms],
+                lambda batch, other: batch.inverse()),
+    "compose with perm": (lambda perms, other: [perm * other[0] for perm in perms],
+                          lambda batch, other: batch * other[0]),
+    "perm compose with": (lambda perms, other: [other[0] * perm for perm in perms],
+                          lambda batch, other: other[0] * batch),
+    "compose pairs": (lambda perms, other: [perm * pair for perm, pair in zip(perms, other)],
+                      lambda batch, other: batch * other),
+}
+
+
+def seconds(function):
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def main(length=12, count=100000):
+    store = Perm.random_many(length, count, seed=0)
+    perms = list(store)
+    batch = PermBatch(store)
+    print("{:<20} {:>10} {:>10} {:>9}".format("statistic", "perm (s)", "batch (s)", "speedup"))
+    for statistic in STATISTICS:
+        method = getattr(Perm, statistic)
+        loop = seconds(lambda: [method(perm) for perm in perms])
+        vectorized = seconds(getattr(batch, statistic))
+        print("{:<20} {:>10.3f} {:>10.4f} {:>8.0f}x".format(
+            statistic, loop, vectorized, loop/vectorized))
+    others = list(Perm.random_many(length, count, seed=1))
+    other_batch = PermBatch(others)
+    for name, (perm_operation, batch_operation) in OPERATIONS.items():
+        loop = seconds(lambda: perm_operation(perms, others))
+        vectorized = seconds(lambda: batch_operation(batch, other_batch))
+        print("{:<20} {:>10.3f} {:>10.4f} {:>8.0f}x".format(
+            name, loop, vectorized, loop/vectorized))
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+"""Memory benchmark: bytes per perm for lengths 5 to 15.
+
+The "before" column measures a tuple subclass that, like the old Perm, gets
+an instance __dict__ holding a cached attribute. The "after" column measures
+the current permuta.Perm.
+
+Usage:
+    python benchmarks/bench_perm_memory.py [count]
+"""
+
+import sys
+import tracemalloc
+
+from permuta import Perm
+
+
+class DictPerm(tuple):
+    """Layout of Perm before it dropped its per-instance __dict__."""
+    def __init__(self, iterable=()):  # pylint: disable=super-init-not-called
+        self._cached_pattern_details = None
+
+
+def bytes_per_perm(cls, length, count):
+    """Return the average number of bytes allocated per instance of cls."""
+    sources = [Perm.random(length) for _ in range(count)]
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    perms = [cls(source) for source in sources]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # Do not count the list holding the instances
+    list_size = sys.getsizeof(perms)
+    return (after - before - list_size) / count
+
+
+def main(count=100000):
+    print("{:>6} {:>10} {:>10} {:>8}".format("length", "before", "after", "saved"))
+    for length in range(5, 16):
+        before = bytes_per_perm(DictPerm, length, count)
+        after = bytes_per_perm(Perm, length, count)
+        print("{:>6} {:>10.1f} {:>10.1f} {:>7.1%}".format(
+            length, before, after, 1 - after/before))
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
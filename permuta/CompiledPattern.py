@@ -0,0 +1,269 @@
+from permuta import _pattern_matchers
+from permuta.misc import left_floor_and_ceiling
+from permuta.misc import LRUCache
+
+
+__all__ = ["CompiledPattern"]
+
+
+def _monotone_direction(patt):
+    """Return 1 if patt is increasing, -1 if it is decreasing and 0 otherwise,
+    for patterns of length at least 2."""
+    if patt[0] < patt[1]:
+        direction = 1 if patt[0] == 0 and patt[-1] == len(patt) - 1 else 0
+    else:
+        direction = -1 if patt[-1] == 0 and patt[0] == len(patt) - 1 else 0
+    if direction and all((second - first)*direction > 0
+                         for first, second in zip(patt, patt[1:])):
+        return direction
+    return 0
+
+
+class CompiledPattern(object):
+    """The plan for matching a classical pattern against perms.
+
+    The elements of the pattern are matched from left to right, each against
+    bounds read off the entries matched to its left floor and ceiling. A
+    compiled pattern is obtained with CompiledPattern.compile, which keeps
+    the most recently used plans in a process-wide cache keyed by the value
+    of the pattern, so equal patterns share one plan.
+
+    Attributes:
+        pattern: <tuple> of <int>
+            The pattern compiled.
+        details: <tuple> of <tuple>
+            For each element of the pattern, the indices of its left floor
+            and left ceiling (or None) and how far below the ceiling and
+            above the floor the element is, or how far from the bottom and
+            top when it has none.
+        direction: <int>
+            1 if the pattern is increasing, -1 if it is decreasing and 0
+            otherwise, or if it is shorter than 2; monotone patterns are
+            contained exactly when a long enough monotone subsequence is.
+        matcher: <function>
+            A dedicated check of whether a perm contains the pattern, or
+            None if the pattern has none, see permuta._pattern_matchers.
+        matcher_length: <int>
+            The length of the shortest perms the matcher is used for.
+        matcher_budget: <int>
+            The number of steps per entry of the perm the search takes
+            before the matcher is used, or None to use it right away.
+    """
+
+    __slots__ = ("pattern", "details", "direction", "matcher", "matcher_length",
+                 "matcher_budget")
+
+    _cache = None  # Set below
+
+    def __init__(self, patt):
+        self.pattern = tuple(patt)
+        details = []
+        for index, (floor, ceiling) in enumerate(left_floor_and_ceiling(patt)):
+            element = patt[index]
+            details.append((floor,
+                            ceiling,
+                            element if floor is None else element - patt[floor],
+                            len(patt) - element if ceiling is None
+                            else patt[ceiling] - element))
+        self.details = tuple(details)
+        self.direction = _monotone_direction(patt) if len(patt) > 1 else 0
+        self.matcher, self.matcher_length, self.matcher_budget = \
+            _pattern_matchers.MATCHERS.get(self.pattern, (None, None, None))
+
+    @classmethod
+    def compile(cls, patt):
+        """Return the compiled pattern of patt, from the cache if possible.
+
+        Examples:
+            >>> CompiledPattern.compile((1, 0)) is CompiledPattern.compile([1, 0])
+            True
+        """
+        return cls._cache.get(tuple(patt))
+
+    @classmethod
+    def cache_info(cls):
+        """Return the hits, misses, maximum size and current size of the
+        cache of compiled patterns."""
+        return cls._cache.info()
+
+    @classmethod
+    def cache_clear(cls):
+        """Remove all compiled patterns from the cache and reset its
+        counters."""
+        cls._cache.clear()
+
+    @classmethod
+    def set_cache_size(cls, maxsize):
+        """Set the number of compiled patterns cached; None means no bound."""
+        cls._cache.resize(maxsize)
+
+    def occurrences_in(self, perm):
+        """Find all indices of occurrences of the pattern in perm.
+
+        See permuta.Perm.occurrences_in.
+        """
+        patt = self.pattern
+        # Special cases
+        if len(patt) == 0:
+            # Pattern is empty, occurs in all perms
+            # This is needed for the occurrences function to work correctly
+            yield ()
+            return
+        if len(patt) > len(perm):
+            # Pattern is too long to occur in perm
+            return
+
+        # The indices of the occurrence in perm
+        occurrence_indices = [None]*len(patt)
+
+        # Get left to right scan details
+        pattern_details = self.details
+
+        # Define function that works with the above defined variables
+        # i is the index of the element in perm that is to be considered
+        # k is how many elements of the perm have already been added to occurrence
+        def occurrences(i, k):
+            elements_remaining = len(perm) - i
+            elements_needed = len(patt) - k
+
+            # Get the following variables:
+            #   - lfi: Left Floor Index
+            #   - lci: Left Ceiling Index
+            #   - lbp: Lower Bound Pre-computation
+            #   - ubp: Upper Bound Pre-computation
+            lfi, lci, lbp, ubp = pattern_details[k]
+
+            # Set the bounds for the new element
+            if lfi is None:
+                # The new element of the occurrence must be at least patt[k];
+                # i.e., the k-th element of the pattern
+                # In this case, lbp = patt[k]
+                lower_bound = lbp
+            else:
+                # The new element of the occurrence must be at least as far
+                # from its left floor as patt[k] is from its left floor
+                # In this case, lbp = patt[k] - patt[lfi]
+                occurrence_left_floor = perm[occurrence_indices[lfi]]
+                lower_bound = occurrence_left_floor + lbp
+            if lci is None:
+                # The new element of the occurrence must be at least as less
+                # than its maximum possible element---i.e., len(perm)---as
+                # patt[k] is to its maximum possible element---i.e., len(patt)
+                # In this case, ubp = len(patt) - patt[k]
+                upper_bound = len(perm) - ubp
+            else:
+                # The new element of the occurrence must be at least as less
+                # than its left ceiling as patt[k] is to its left ceiling
+                # In this case, ubp = patt[lci] - patt[k]
+                upper_bound = perm[occurrence_indices[lci]] - ubp
+
+            # Loop over remaining elements of perm (actually i, the index)
+            while 1:
+                if elements_remaining < elements_needed:
+                    # Can't form an occurrence with remaining elements
+                    return
+                element = perm[i]
+                if lower_bound <= element <= upper_bound:
+                    occurrence_indices[k] = i
+                    if elements_needed == 1:
+                        # Yield occurrence
+                        yield tuple(occurrence_indices)
+                    else:
+                        # Yield occurrences where the i-th element is chosen
+                        for occurence in occurrences(i+1, k+1):
+                            yield occurence
+                # Increment i, that also means elements_remaining should decrement
+                i += 1
+                elements_remaining -= 1
+
+        for occurence in occurrences(0, 0):
+            yield occurence
+
+    def contained_in(self, perm):
+        """Check if the pattern occurs in perm, stopping at the first
+        occurrence.
+
+        Patterns with a dedicated matcher use it on long enough perms, after
+        a search bounded by a few steps per entry of perm has failed to
+        settle the question, so perms with an early occurrence skip the
+        setup of the matcher.
+        """
+        if self.matcher is not None and len(perm) >= self.matcher_length:
+            if self.matcher_budget is not None:
+                found = self._search(perm, self.matcher_budget*len(perm))
+                if found is not None:
+                    return found
+            return self.matcher(perm)
+        return self._search(perm)
+
+    def _search(self, perm, budget=None):
+        """Search for an occurrence in perm, giving up after looking at
+        budget entries if it is not None.
+
+        This is the search of occurrences_in with an explicit stack: the
+        index chosen for each element of the pattern and the bounds on the
+        next one are kept in lists allocated up front, and no occurrence is
+        built.
+
+        Returns: <bool>
+            Whether the pattern occurs in perm, or None if the search gave
+            up.
+        """
+        length = len(self.pattern)
+        if length == 0:
+            return True
+        perm_length = len(perm)
+        if length > perm_length:
+            return False
+        details = self.details
+        last = length - 1
+        # indices[k] is the index of perm matched to element k of the pattern
+        # and lower[k], upper[k] the bounds on the entry matched to it
+        indices = [0]*length
+        lower = [0]*length
+        upper = [0]*length
+        lower[0] = details[0][2]
+        upper[0] = perm_length - details[0][3]
+        depth = 0
+        i = 0
+        # Element k must be matched at an index below stop, leaving room
+        # for the elements after it
+        stop = perm_length - last
+        low, high = lower[0], upper[0]
+        while True:
+            start = i
+            while i < stop and not low <= perm[i] <= high:
+                i += 1
+            if budget is not None:
+                budget -= i - start + 1
+                if budget < 0:
+                    return None
+            if i == stop:
+                if depth == 0:
+                    return False
+                # Backtrack, trying the next index for the previous element
+                depth -= 1
+                stop -= 1
+                i = indices[depth] + 1
+                low, high = lower[depth], upper[depth]
+                continue
+            if depth == last:
+                return True
+            indices[depth] = i
+            depth += 1
+            stop += 1
+            i += 1
+            lfi, lci, lbp, ubp = details[depth]
+            low = lbp if lfi is None else perm[indices[lfi]] + lbp
+            high = perm_length - ubp if lci is None else perm[indices[lci]] - ubp
+            lower[depth] = low
+            upper[depth] = high
+
+    def __len__(self):
+        return len(self.pattern)
+
+    def __repr__(self):
+        return "CompiledPattern({})".format(self.pattern)
+
+
+CompiledPattern._cache = LRUCache(CompiledPattern, maxsize=4096)
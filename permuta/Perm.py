@@ -1,7 +1,8 @@
 # pylint: disable=too-many-lines,missing-docstring
 
+import bisect
 import collections
-import fractions
+import functools
 import itertools
 import math
 import numbers
@@ -9,9 +10,11 @@ import operator
 import random
 import sys
 
+from permuta.CompiledPattern import CompiledPattern
 from permuta.interfaces import Patt, Flippable, Rotatable, Shiftable
 from permuta.misc import checking
-from permuta.misc import left_floor_and_ceiling
+from permuta.misc import FenwickTree
+from permuta.misc import InternPool
 
 if sys.version_info.major == 2:
     range = xrange  #pylint: disable=redefined-builtin,invalid-name,undefined-variable
@@ -20,6 +23,73 @@ if sys.version_info.major == 2:
 __all__ = ["Perm"]
 
 
+# Perms at least this long have their Lehmer code computed with NumPy
+_VECTORIZED_LEHMER_LENGTH = 256
+
+# Perms at least this long have their patterns of length 3 and 4 counted with
+# corner trees rather than by standardizing every subsequence
+_CORNER_TREE_LENGTH = 12
+
+# Canonical perm instances, see Perm.intern
+_INTERN_POOL = InternPool()
+
+
+def _increasing_lengths(sequence):
+    """Return the length of the longest increasing subsequence ending at each
+    element of sequence, by patience sorting."""
+    # tops[k] is the smallest last element of an increasing subsequence of length k + 1
+    tops = []
+    result = []
+    for element in sequence:
+        length = bisect.bisect_left(tops, element)
+        if length == len(tops):
+            tops.append(element)
+        else:
+            tops[length] = element
+        result.append(length + 1)
+    return result
+
+
+def _increasing_length(sequence, bound=None):
+    """Return the length of the longest increasing subsequence of sequence, by
+    patience sorting, stopping as soon as it reaches bound."""
+    tops = []
+    for element in sequence:
+        length = bisect.bisect_left(tops, element)
+        if length == len(tops):
+            tops.append(element)
+            if len(tops) == bound:
+                break
+        else:
+            tops[length] = element
+    return len(tops)
+
+
+def _longest_increasing(sequence):
+    """Return the positions of a longest increasing subsequence of sequence,
+    by patience sorting."""
+    tops = []
+    top_positions = []
+    # The position before each element in the subsequence found ending at it
+    previous = []
+    for position, element in enumerate(sequence):
+        length = bisect.bisect_left(tops, element)
+        if length == len(tops):
+            tops.append(element)
+            top_positions.append(position)
+        else:
+            tops[length] = element
+            top_positions[length] = position
+        previous.append(top_positions[length - 1] if length else None)
+    result = []
+    position = top_positions[-1] if top_positions else None
+    while position is not None:
+        result.append(position)
+        position = previous[position]
+    result.reverse()
+    return tuple(result)
+
+
 class Perm(tuple,
            Patt,
            Rotatable,
@@ -28,6 +98,9 @@ class Perm(tuple,
           ):  # pylint: disable=too-many-ancestors,too-many-public-methods
     """A perm class."""
 
+    # No per-instance __dict__; matching plans are kept in a side cache
+    __slots__ = ()
+
     _TYPE_ERROR = "'{}' object is not a perm"
 
     #
@@ -42,6 +115,24 @@ class Perm(tuple,
         else:
             Perm._init_helper = Perm._init_checked
 
+    @staticmethod
+    def toggle_interning():
+        """Toggle whether constructing a perm returns its canonical instance.
+
+        While interning is on, every perm created, including those returned
+        by methods such as insert and remove, is replaced by the instance
+        held in the intern pool (see Perm.intern).
+
+        Examples:
+            >>> Perm.toggle_interning()
+            >>> Perm((0, 2, 1)) is Perm((0, 2, 1))
+            True
+            >>> Perm.toggle_interning()
+        """
+        Perm._interning = not Perm._interning
+
+    _interning = False
+
     #
     # Methods returning a single Perm instance
     #
@@ -76,7 +167,7 @@ class Perm(tuple,
             TypeError: 'a' object is not an integer
         """
         try:
-            return tuple.__new__(cls, iterable)
+            perm = tuple.__new__(cls, iterable)
         except TypeError:
             # Try to interpret object as perm
             if isinstance(iterable, numbers.Integral):
@@ -91,13 +182,14 @@ class Perm(tuple,
                         digit_list.append(number % 10)
                         number //= 10
                     digit_list.reverse()
-                return tuple.__new__(cls, digit_list)
+                perm = tuple.__new__(cls, digit_list)
             else:
                 raise
+        if Perm._interning and cls is Perm:
+            return _INTERN_POOL.intern(perm)
+        return perm
 
     def __init__(self, iterable=()):  # pylint: disable=unused-argument,super-init-not-called
-        # Cache for data used when finding occurrences of self in a perm
-        self._cached_pattern_details = None
         self._init_helper()
 
     def _init_unchecked(self):
@@ -117,6 +209,33 @@ class Perm(tuple,
 
     _init_helper = _init_unchecked
 
+    @classmethod
+    def intern(cls, perm):
+        """Return the canonical instance of perm.
+
+        Equal perms interned share one instance, so dicts and sets, which
+        compare keys by identity first, can skip comparing their elements.
+        Tuple subclasses cannot be weakly referenced, so the pool holds its
+        perms until they are released with Perm.collect_interned.
+
+        Examples:
+            >>> perm = Perm.intern(Perm((1, 0, 2)))
+            >>> Perm.intern((1, 0, 2)) is perm
+            True
+        """
+        if not isinstance(perm, Perm):
+            perm = cls(perm)
+        return _INTERN_POOL.intern(perm)
+
+    @staticmethod
+    def collect_interned():
+        """Release interned perms that are not referenced elsewhere.
+
+        Returns: <int>
+            The number of perms released.
+        """
+        return _INTERN_POOL.collect()
+
     @classmethod
     def to_standard(cls, iterable):
         """Return the perm corresponding to iterable.
@@ -150,6 +269,46 @@ class Perm(tuple,
     standardize = to_standard  # permpy backwards compatibility
     from_iterable = to_standard
 
+    @staticmethod
+    def to_standard_many(rows, codes=False):
+        """Return the perms corresponding to many equal length sequences.
+
+        The whole batch is standardized with a single stable argsort, so
+        duplicate elements become consecutive elements as in to_standard.
+
+        Args:
+            rows: <numpy.ndarray> or <collections.Iterable>
+                A two dimensional array, or an iterable of sequences all of
+                the same length.
+            codes: <bool>
+                If True, return the rank of each standardized row among the
+                perms of its length (see Perm.unrank) instead of the rows.
+
+        Returns: <numpy.ndarray>
+            The standardized rows as a two dimensional array, or the one
+            dimensional array of their codes.
+
+        Raises:
+            ValueError:
+                The sequences are not all of the same length.
+
+        Examples:
+            >>> Perm.to_standard_many([(5, 1, 9), (3, 3, 1), (0, 2, 1)])
+            array([[1, 0, 2],
+                   [1, 2, 0],
+                   [0, 2, 1]], dtype=uint8)
+            >>> Perm.to_standard_many(["caaba", "a2gsv"])
+            array([[4, 0, 1, 3, 2],
+                   [1, 0, 2, 3, 4]], dtype=uint8)
+            >>> Perm.to_standard_many([(5, 1, 9), (3, 2, 1)], codes=True)
+            array([2, 5])
+        """
+        from permuta import _bulk
+        standardized = _bulk.standardize(rows)
+        if codes:
+            return _bulk.rank(standardized)
+        return standardized
+
     @classmethod
     def from_string(cls, string):
         """Return the perm corresponding to the string given.
@@ -204,6 +363,42 @@ class Perm(tuple,
         random.shuffle(result)
         return cls(result)
 
+    @staticmethod
+    def random_many(length, count, seed=None, worker=None):
+        """Return many uniformly random perms of the specified length.
+
+        The perms are generated with NumPy's vectorized shuffling.
+
+        Args:
+            length: <numbers.Integral>
+                The length of the perms.
+            count: <numbers.Integral>
+                The number of perms.
+            seed: <numbers.Integral> or <numpy.random.SeedSequence>
+                A seed for reproducible results, or a numpy.random.Generator
+                to draw from. None seeds from the operating system.
+            worker: <numbers.Integral>
+                The index of a parallel worker. Workers given the same seed
+                and different indices get deterministic, non-overlapping
+                streams.
+
+        Returns: <permuta.PermStore>
+            The perms, created lazily; the underlying two dimensional array
+            is available as the array attribute.
+
+        Examples:
+            >>> perms = Perm.random_many(6, 1000, seed=2017)
+            >>> len(perms), perms.array.shape
+            (1000, (1000, 6))
+            >>> sorted(Perm.random_many(6, 5, seed=2017, worker=3)[0])
+            [0, 1, 2, 3, 4, 5]
+            >>> list(perms) == list(Perm.random_many(6, 1000, seed=2017))
+            True
+        """
+        from permuta import _bulk
+        from permuta import PermStore
+        return PermStore.from_array(_bulk.random_rows(length, count, seed, worker))
+
     @classmethod
     def monotone_increasing(cls, length):
         """Return a monotone increasing perm of the specified length.
@@ -230,7 +425,11 @@ class Perm(tuple,
 
     @classmethod
     def unrank(cls, number, length=None):
-        """
+        """Return the perm with the given rank.
+
+        If length is given, number is the lexicographic rank of the perm
+        among the perms of that length. Otherwise perms are ordered first by
+        length and then lexicographically. Runs in O(n log n) time.
 
         Examples:
             >>> Perm.unrank(0)
@@ -248,10 +447,6 @@ class Perm(tuple,
             >>> Perm.unrank(1, 3)
             Perm((0, 2, 1))
         """
-        # TODO: Docstring, and do better? Assertions and messages
-        #       Implement readably, nicely, and efficiently
-        #assert isinstance(number, numbers.Integral)
-        #assert 0 <= number
         if length is None:
             # Work out the length and number from the number given
             assert isinstance(number, numbers.Integral)
@@ -273,15 +468,79 @@ class Perm(tuple,
 
     @staticmethod
     def __unrank(number, length):
-        candidates = list(range(length))
-        for value in range(1, length+1):
-            factorial = math.factorial(length - value)
-            division = number//factorial
-            yield candidates.pop(division)
-            number %= factorial
-
+        # Digits of number in the factorial number system, most significant
+        # first, are the Lehmer code of the perm
+        code = [0]*length
+        for radix in range(1, length+1):
+            number, code[length - radix] = divmod(number, radix)
+        unused = FenwickTree(length, fill=1)
+        for digit in code:
+            value = unused.find(digit)
+            unused.add(value, -1)
+            yield value
     ind2perm = unrank  # permpy backwards compatibility
 
+    @classmethod
+    def myrvold_ruskey_unrank(cls, number, length):
+        """Return the perm of the given length with the given Myrvold-Ruskey
+        rank.
+
+        The Myrvold-Ruskey ranking is a bijection between the perms of a
+        length n and the integers 0, ..., n! - 1 that runs in O(n) time. Use
+        it instead of Perm.unrank when the order of the ranks does not matter,
+        e.g., for hash keys or for partitioning work.
+
+        Examples:
+            >>> Perm.myrvold_ruskey_unrank(0, 3)
+            Perm((1, 2, 0))
+            >>> Perm.myrvold_ruskey_unrank(Perm((3, 0, 2, 1)).myrvold_ruskey_rank(), 4)
+            Perm((3, 0, 2, 1))
+        """
+        assert isinstance(length, numbers.Integral)
+        assert length >= 0
+        assert 0 <= number < math.factorial(length)
+        result = list(range(length))
+        for size in range(length, 0, -1):
+            number, position = divmod(number, size)
+            result[size-1], result[position] = result[position], result[size-1]
+        return cls(result)
+
+    @staticmethod
+    def myrvold_ruskey_unrank_many(numbers, length):
+        """Return the perms of the given length with the given Myrvold-Ruskey
+        ranks, as a two dimensional array with one perm per row.
+
+        See Perm.myrvold_ruskey_unrank and Perm.unrank_many.
+        """
+        from permuta import _bulk
+        return _bulk.myrvold_ruskey_unrank(numbers, length)
+
+    @staticmethod
+    def unrank_many(numbers, length):
+        """Return the perms of the given length with the given ranks.
+
+        Args:
+            numbers: <collections.Iterable> of <numbers.Integral>
+                Lexicographic ranks among the perms of the given length.
+            length: <numbers.Integral>
+                The length of the perms.
+
+        Returns: <numpy.ndarray>
+            A two dimensional array with one perm per row.
+
+        Raises:
+            ValueError:
+                A number is not the rank of a perm of the given length.
+
+        Examples:
+            >>> Perm.unrank_many([0, 1, 5], 3)
+            array([[0, 1, 2],
+                   [0, 2, 1],
+                   [2, 1, 0]], dtype=uint8)
+        """
+        from permuta import _bulk
+        return _bulk.unrank(numbers, length)
+
     #
     # Methods modifying/combining Perm instances
     #
@@ -371,17 +630,41 @@ class Perm(tuple,
                 raise TypeError(Perm._TYPE_ERROR.format(repr(other)))
             if len(other) != len(self):
                 raise ValueError("Perm length mismatch")
-        result = [None]*len(self)
-        for value in range(len(self)):
-            composed_value = value
-            for other in reversed(others):
-                composed_value = other[composed_value]
-            composed_value = self[composed_value]
-            result[value] = composed_value
+        result = self
+        for other in others:
+            result = [result[value] for value in other]
         return Perm(result)
 
     multiply = compose
 
+    def power(self, exponent):
+        """Return the perm composed with itself exponent times.
+
+        Every element is moved along its cycle by the exponent modulo the
+        length of the cycle, so this takes O(n) time however large the
+        exponent. Negative exponents give the powers of the inverse.
+
+        Raises:
+            TypeError:
+                The exponent is not an integer.
+
+        Examples:
+            >>> Perm((1, 2, 0, 4, 3)).power(2)
+            Perm((2, 0, 1, 3, 4))
+            >>> Perm((1, 2, 0, 4, 3)).power(-1)
+            Perm((2, 0, 1, 4, 3))
+            >>> Perm((1, 2, 0, 4, 3)) ** 10**18
+            Perm((1, 2, 0, 3, 4))
+        """
+        if not isinstance(exponent, numbers.Integral):
+            raise TypeError("'{}' object is not an integer".format(repr(exponent)))
+        result = [None]*len(self)
+        for cycle in _cycles(self):
+            shift = exponent % len(cycle)
+            for element, image in zip(cycle, cycle[shift:] + cycle[:shift]):
+                result[element] = image
+        return Perm(result)
+
     def insert(self, index=None, new_element=None):
         """Return the perm acquired by adding a new element.
 
@@ -818,6 +1101,40 @@ class Perm(tuple,
 
     fixed_points = count_fixed_points
 
+    def sum_components(self):
+        """Return the sum components of the permutation, the sum
+        indecomposable permutations whose direct sum it is.
+
+        A sum component ends wherever the entries so far are the smallest
+        ones, so all of them are found in a single pass. The result is cached.
+
+        Returns: <list> of <permuta.Perm>
+            The components from left to right, none for the empty perm.
+
+        Examples:
+            >>> Perm((1, 0, 2, 5, 3, 4)).sum_components()
+            [Perm((1, 0)), Perm((0,)), Perm((2, 0, 1))]
+            >>> Perm((1, 0)).direct_sum(Perm((0,)), Perm((2, 0, 1)))
+            Perm((1, 0, 2, 5, 3, 4))
+        """
+        return list(_components(self, False))
+
+    def skew_components(self):
+        """Return the skew components of the permutation, the skew
+        indecomposable permutations whose skew sum it is. The result is
+        cached.
+
+        Returns: <list> of <permuta.Perm>
+            The components from left to right, none for the empty perm.
+
+        Examples:
+            >>> Perm((4, 5, 3, 0, 2, 1)).skew_components()
+            [Perm((0, 1)), Perm((0,)), Perm((0, 2, 1))]
+            >>> Perm((0, 1)).skew_sum(Perm((0,)), Perm((0, 2, 1)))
+            Perm((4, 5, 3, 0, 2, 1))
+        """
+        return list(_components(self, True))
+
     def is_skew_decomposable(self):
         """Determines whether the permutation is expressible as the skew sum of
         two permutations.
@@ -828,13 +1145,7 @@ class Perm(tuple,
         >>> p.complement().skew_decomposable()
         True
         """
-
-        p = list(self)
-        n = self.__len__()
-        for i in range(1,n):
-            if set(range(n-i,n)) == set(p[0:i]):
-                return True
-        return False
+        return len(_components(self, True)) > 1
 
     skew_decomposable = is_skew_decomposable # permpy backwards compatibilitye
 
@@ -848,13 +1159,7 @@ class Perm(tuple,
         >>> p.reverse().sum_decomposable()
         False
         """
-
-        p = list(self)
-        n = self.__len__()
-        for i in range(1,n):
-            if set(range(0,i)) == set(p[0:i]):
-                return True
-        return False
+        return len(_components(self, False)) > 1
 
     sum_decomposable = is_sum_decomposable # permpy backwards compatibility
 
@@ -1081,10 +1386,25 @@ class Perm(tuple,
             1
         """
         acc = 1
-        for l in map(len, self.cycle_decomp()):
-            acc = (acc * l) // fractions.gcd(acc, l)
+        for l in set(map(len, _cycles(self))):
+            acc = (acc * l) // math.gcd(acc, l)
         return acc
 
+    def cycle_type(self):
+        """Returns the cycle type of the permutation, the lengths of its cycles
+        in decreasing order.
+
+        Two permutations of the same length are conjugate if and only if they
+        have the same cycle type, so it is the key of the conjugacy class.
+
+        Examples:
+            >>> Perm((1, 2, 0, 4, 3, 5)).cycle_type()
+            (3, 2, 1)
+            >>> Perm((0, 1, 2)).cycle_type()
+            (1, 1, 1)
+        """
+        return tuple(sorted(map(len, _cycles(self)), reverse=True))
+
     # TODO: reimplement the following four functions to return generators
     def ltrmin(self):
         """Returns the positions of the left-to-right minima.
@@ -1142,11 +1462,57 @@ class Perm(tuple,
 
     num_ltrmin = count_ltrmin
 
+    def lehmer_code(self):
+        """Returns the Lehmer code of the permutation, i.e., the number of
+        smaller elements to the right of each element.
+
+        This is the kernel for the inversion based statistics. It uses a
+        binary indexed tree, or the vectorized merge counting of
+        permuta._bulk for long perms, and takes O(n log n) time.
+
+        Examples:
+            >>> Perm((3, 0, 2, 1)).lehmer_code()
+            [3, 0, 1, 0]
+            >>> Perm((0, 2, 4, 3, 1)).lehmer_code()
+            [0, 1, 2, 1, 0]
+        """
+        if len(self) >= _VECTORIZED_LEHMER_LENGTH:
+            import numpy
+            from permuta import _bulk
+            return _bulk.lehmer_codes(numpy.array(self, ndmin=2))[0].tolist()
+        seen = FenwickTree(len(self))
+        code = []
+        for element in self:
+            # The smaller elements not seen yet are to the right
+            code.append(element - seen.prefix_sum(element))
+            seen.add(element)
+        return code
+
+    rank_encoding = lehmer_code
+
+    def inversion_vector(self):
+        """Returns the inversion vector of the permutation, i.e., the number
+        of larger elements to the left of each value, indexed by value.
+
+        It is computed from the Lehmer code in O(n log n) time.
+
+        Examples:
+            >>> Perm((3, 0, 2, 1)).inversion_vector()
+            [1, 2, 1, 0]
+            >>> sum(Perm((4, 0, 3, 1, 2)).inversion_vector())
+            6
+        """
+        result = [0]*len(self)
+        for index, (element, smaller_right) in enumerate(zip(self, self.lehmer_code())):
+            # Of the index elements to the left, element - smaller_right are smaller
+            result[element] = index - element + smaller_right
+        return result
+
     def count_inversions(self):
         """Returns the number of inversions of the permutation, i.e., the
         number of pairs i,j such that i < j and self(i) > self(j).
 
-        TODO: Reimplement in NlogN time.
+        This is the sum of the Lehmer code, computed in O(n log n) time.
 
         >>> Perm(3021).count_inversions()
         4
@@ -1155,21 +1521,12 @@ class Perm(tuple,
         >>> Perm.monotone_increasing(7).count_inversions()
         0
         """
-
-        p = list(self)
-        n = self.__len__()
-        inv = 0
-        for i in range(n):
-            for j in range(i+1,n):
-                if p[i]>p[j]:
-                    inv+=1
-        return inv
+        return sum(self.lehmer_code())
 
     inversions = count_inversions
 
     # TODO: Implement function that returns list of inversions.
 
-    # TODO: Reimplement using count_inversions.
     def count_noninversions(self):
         """Returns the number of noninversions of the permutation, i.e., the
         number of pairs i,j such that i < j and self[i] < self[j].
@@ -1180,12 +1537,8 @@ class Perm(tuple,
             >>> Perm.monotone_increasing(7).count_noninversions() == (6 * 7) / 2
             True
         """
-        inv = 0
-        for i in range(len(self)):
-            for j in range(i + 1, len(self)):
-                if self[i] < self[j]:
-                    inv += 1
-        return inv
+        n = len(self)
+        return n*(n - 1)//2 - self.count_inversions()
 
     def min_gapsize(self):
         """Returns the minimum gap between any two entries in the permutation
@@ -1338,6 +1691,52 @@ class Perm(tuple,
         """
         return self.length_of_longestrun_ascending()
 
+    def longest_increasing_subsequence(self):
+        """Returns the positions of a longest increasing subsequence of the
+        permutation.
+
+        The subsequence is found by patience sorting, in O(n log n) time,
+        remembering the entry before each one in the longest increasing
+        subsequence found ending at it.
+
+        Examples:
+            >>> Perm((2, 0, 3, 1, 4, 5)).longest_increasing_subsequence()
+            (1, 3, 4, 5)
+            >>> Perm((2, 1, 0)).longest_increasing_subsequence()
+            (2,)
+        """
+        return _longest_increasing(self)
+
+    def longest_decreasing_subsequence(self):
+        """Returns the positions of a longest decreasing subsequence of the
+        permutation, see longest_increasing_subsequence.
+
+        Examples:
+            >>> Perm((2, 0, 3, 1, 4, 5)).longest_decreasing_subsequence()
+            (2, 3)
+        """
+        return _longest_increasing([-element for element in self])
+
+    def length_of_longest_increasing_subsequence(self):
+        """Returns the length of the longest increasing subsequence of the
+        permutation.
+
+        Examples:
+            >>> Perm((2, 0, 3, 1, 4, 5)).length_of_longest_increasing_subsequence()
+            4
+        """
+        return _increasing_length(self)
+
+    def length_of_longest_decreasing_subsequence(self):
+        """Returns the length of the longest decreasing subsequence of the
+        permutation.
+
+        Examples:
+            >>> Perm((2, 0, 3, 1, 4, 5)).length_of_longest_decreasing_subsequence()
+            2
+        """
+        return _increasing_length([-element for element in self])
+
     def cycle_decomp(self):
         """Calculates the cycle decomposition of the permutation. Returns a list
         of cycles, each of which is represented as a list.
@@ -1345,21 +1744,7 @@ class Perm(tuple,
         >>> Perm((4, 2, 7, 0, 3, 1, 6, 5)).cycle_decomp()
         [[4, 3, 0], [6], [7, 5, 1, 2]]
         """
-        n = self.__len__()
-        seen = set()
-        cyclelist = []
-        while len(seen) < n:
-            a = max(set(range(n)) - seen)
-            cyc = [a]
-            b = self(a)
-            seen.add(b)
-            while b != a:
-                cyc.append(b)
-                b = self(b)
-                seen.add(b)
-            cyclelist.append(cyc)
-        cyclelist.reverse()
-        return cyclelist
+        return [list(cycle) for cycle in _cycles(self)]
 
     def count_cycles(self):
         """Returns the number of cycles in the permutation.
@@ -1367,7 +1752,7 @@ class Perm(tuple,
         >>> Perm((5, 3, 8, 1, 0, 4, 2, 7, 6)).count_cycles()
         4
         """
-        return len(self.cycle_decomp())
+        return len(_cycles(self))
 
     num_cycles = count_cycles # permpy backwards compatibility
 
@@ -1381,8 +1766,7 @@ class Perm(tuple,
             >>> Perm((3, 0, 2, 4, 1, 5)).is_involution()
             False
         """
-
-        return self == self.inverse()
+        return all(len(cycle) <= 2 for cycle in _cycles(self))
 
     def is_identity(self):
         """Checks if the permutation is the identity.
@@ -1394,48 +1778,129 @@ class Perm(tuple,
 
         return self == Perm.identity(len(self))
 
-    # TODO: Implement rank method
-    #perm2ind = rank  # permpy backwards compatibility
+    def rank(self):
+        """Return the lexicographic rank of self among the perms of its length.
+
+        This is the inverse of Perm.unrank with the length given. The digits
+        in the factorial number system are those of Perm.lehmer_code.
+
+        Examples:
+            >>> Perm((0, 2, 1)).rank()
+            1
+            >>> Perm((3, 2, 1, 0)).rank()
+            23
+            >>> Perm.unrank(Perm((4, 0, 3, 1, 2)).rank(), 5)
+            Perm((4, 0, 3, 1, 2))
+        """
+        len_perm = len(self)
+        result = 0
+        for index, digit in enumerate(self.lehmer_code()):
+            result = result*(len_perm - index) + digit
+        return result
+
+    perm2ind = rank  # permpy backwards compatibility
+
+    def myrvold_ruskey_rank(self):
+        """Return the Myrvold-Ruskey rank of self among the perms of its
+        length in O(n) time.
+
+        This is the inverse of Perm.myrvold_ruskey_unrank.
+
+        Examples:
+            >>> Perm((1, 2, 0)).myrvold_ruskey_rank()
+            0
+            >>> sorted(perm.myrvold_ruskey_rank() for perm in PermSet(3))
+            [0, 1, 2, 3, 4, 5]
+        """
+        perm = list(self)
+        inverse = list(self.inverse())
+        result = 0
+        multiplier = 1
+        for size in range(len(perm), 0, -1):
+            last = perm[size-1]
+            position = inverse[size-1]
+            # Swap the largest remaining element into the last position
+            perm[position] = last
+            inverse[last] = position
+            result += last*multiplier
+            multiplier *= size
+        return result
+
+    @staticmethod
+    def myrvold_ruskey_rank_many(perms):
+        """Return the Myrvold-Ruskey ranks of many perms of the same length.
+
+        See Perm.myrvold_ruskey_rank and Perm.rank_many.
+        """
+        from permuta import _bulk
+        return _bulk.myrvold_ruskey_rank(perms)
+
+    @staticmethod
+    def rank_many(perms):
+        """Return the lexicographic ranks of many perms of the same length.
+
+        Args:
+            perms: <numpy.ndarray> or <collections.Iterable>
+                A two dimensional array with one perm per row, or an iterable
+                of perms of the same length.
+
+        Returns: <numpy.ndarray>
+            The ranks, as int64 for perms of length at most 20 and as Python
+            integers in an object array for longer perms.
+
+        Examples:
+            >>> Perm.rank_many([Perm((0, 1, 2)), Perm((1, 2, 0))])
+            array([0, 3])
+        """
+        from permuta import _bulk
+        return _bulk.rank(perms)
 
     def threepats(self):
         """Returns a dictionary of the number of occurrences of each
         permutation pattern of length 3.
 
+        Long permutations are handled in O(n log n) time from the number of
+        entries in each quadrant of every entry, see permuta._pattern_counts.
+
         Examples:
             >>> Perm((2, 1, 0, 3)).threepats()
             {Perm((0, 1, 2)): 0, Perm((0, 2, 1)): 0, Perm((1, 0, 2)): 3, Perm((1, 2, 0)): 0, Perm((2, 0, 1)): 0, Perm((2, 1, 0)): 1}
         """
-        patnums = { Perm((0, 1, 2)) : 0, Perm((0, 2, 1)) : 0, Perm((1, 0, 2)) : 0,
-                    Perm((1, 2, 0)) : 0, Perm((2, 0, 1)) : 0, Perm((2, 1, 0)) : 0 }
-        for i, j, k in itertools.combinations(range(len(self)), 3):
-            patnums[Perm.to_standard((self[i], self[j], self[k]))] += 1
-        return patnums
+        if len(self) < _CORNER_TREE_LENGTH:
+            return self._small_pattern_counts(3)
+        from permuta import _pattern_counts
+        return dict(zip(map(Perm, _pattern_counts.PATTERNS_3),
+                        _pattern_counts.count_patterns_3(self)))
 
     def fourpats(self):
         """Returns a dictionary of the number of occurrences of each
         permutation pattern of length 4.
 
+        Long permutations are handled with corner tree counts, in O(n log n)
+        time, and a count of 1324 in O(n^2) time, see permuta._pattern_counts.
+
         Examples:
             >>> Perm((1, 0, 3, 5, 2, 4)).fourpats()
             {Perm((0, 1, 2, 3)): 0, Perm((0, 1, 3, 2)): 2, Perm((0, 2, 1, 3)): 2, Perm((0, 2, 3, 1)): 2, Perm((0, 3, 1, 2)): 2, Perm((0, 3, 2, 1)): 0, Perm((1, 0, 2, 3)): 3, Perm((1, 0, 3, 2)): 3, Perm((1, 2, 0, 3)): 0, Perm((1, 2, 3, 0)): 0, Perm((1, 3, 0, 2)): 1, Perm((1, 3, 2, 0)): 0, Perm((2, 0, 1, 3)): 0, Perm((2, 0, 3, 1)): 0, Perm((2, 1, 0, 3)): 0, Perm((2, 1, 3, 0)): 0, Perm((2, 3, 0, 1)): 0, Perm((2, 3, 1, 0)): 0, Perm((3, 0, 1, 2)): 0, Perm((3, 0, 2, 1)): 0, Perm((3, 1, 0, 2)): 0, Perm((3, 1, 2, 0)): 0, Perm((3, 2, 0, 1)): 0, Perm((3, 2, 1, 0)): 0}
         """
-        patnums = { Perm((0, 1, 2, 3)): 0, Perm((0, 1, 3, 2)): 0, Perm((0, 2, 1, 3)): 0,
-            Perm((0, 2, 3, 1)): 0, Perm((0, 3, 1, 2)): 0, Perm((0, 3, 2, 1)): 0,
-            Perm((1, 0, 2, 3)): 0, Perm((1, 0, 3, 2)): 0, Perm((1, 2, 0, 3)): 0,
-            Perm((1, 2, 3, 0)): 0, Perm((1, 3, 0, 2)): 0, Perm((1, 3, 2, 0)): 0,
-            Perm((2, 0, 1, 3)): 0, Perm((2, 0, 3, 1)): 0, Perm((2, 1, 0, 3)): 0,
-            Perm((2, 1, 3, 0)): 0, Perm((2, 3, 0, 1)): 0, Perm((2, 3, 1, 0)): 0,
-            Perm((3, 0, 1, 2)): 0, Perm((3, 0, 2, 1)): 0, Perm((3, 1, 0, 2)): 0,
-            Perm((3, 1, 2, 0)): 0, Perm((3, 2, 0, 1)): 0, Perm((3, 2, 1, 0)): 0}
-
-        for i, j, k, l in itertools.combinations(range(len(self)), 4):
-            patnums[Perm.to_standard((self[i], self[j], self[k], self[l]))] += 1
+        if len(self) < _CORNER_TREE_LENGTH:
+            return self._small_pattern_counts(4)
+        from permuta import _pattern_counts
+        return dict(zip(map(Perm, _pattern_counts.PATTERNS_4),
+                        _pattern_counts.count_patterns_4(self)))
+
+    def _small_pattern_counts(self, length):
+        """Count the occurrences of the patterns of a length by standardizing
+        every subsequence of that length."""
+        patnums = dict.fromkeys(map(Perm, itertools.permutations(range(length))), 0)
+        for indices in itertools.combinations(range(len(self)), length):
+            patnums[Perm.to_standard([self[index] for index in indices])] += 1
         return patnums
 
     def rank_val(self, i):
         """Returns the 'rank value'(?) of index i, the number of inversions
-        with the value at i being the greater element.
-
+        with the value at i being the greater element. For all indices at once
+        use Perm.lehmer_code.
 
         Examples:
             >>> Perm((3, 0, 2, 1)).rank_val(0)
@@ -1445,29 +1910,42 @@ class Perm(tuple,
         """
         return len([j for j in range(i + 1, len(self)) if self[j] < self[i]])
 
-    def rank_encoding(self):
-        """Returns the 'rank value'(?) of each index in the permutation, the
-        number of inversions 'caused' by the values at each index.
-
-        Examples:
-            >>> Perm((3, 0, 2, 1)).rank_encoding()
-            [3, 0, 1, 0]
-            >>> Perm((0, 2, 4, 3, 1)).rank_encoding()
-            [0, 1, 2, 1, 0]
-        """
-        return [self.rank_val(i) for i in range(len(self))]
-
     #
     # Decomposition and generation from self methods
     #
 
+    def substitution_decomposition(self):
+        """Return the substitution decomposition tree of the permutation.
+
+        Every node is a point, or the inflation of an increasing, decreasing
+        or simple permutation by the patterns of its children. The tree is
+        built in O(n log n) time and cached, so the interval queries below are
+        cheap.
+
+        Returns: <permuta.decomposition.DecompositionNode>
+            The root of the tree, or None for the empty permutation.
+
+        Examples:
+            >>> root = Perm((1, 3, 0, 2, 5, 4)).substitution_decomposition()
+            >>> root.kind, root.skeleton
+            ('increasing', Perm((0, 1)))
+            >>> [child.kind for child in root.children]
+            ['simple', 'decreasing']
+        """
+        from permuta.decomposition import substitution_decomposition
+        return substitution_decomposition(self)
+
     def block_decomposition(self, return_patterns=False):
         """Returns the list of all blocks(intervals) in the permutation that
         are of length at least 2. The returned list of lists contains the
         indices of blocks of length i in index i.
 
-        When return_patterns is set to True, a list of patterns is returned
-        instead of list of list of indices.
+        When return_patterns is set to True, a sorted list of patterns is
+        returned instead of list of list of indices.
+
+        The intervals are read off the substitution decomposition tree: they
+        are its nodes and the unions of consecutive children of its increasing
+        and decreasing nodes.
 
         Examples:
             >>> Perm((5, 3, 0, 1, 2, 4, 7, 6)).block_decomposition()
@@ -1475,23 +1953,28 @@ class Perm(tuple,
             >>> Perm((4, 1, 0, 5, 2, 3)).block_decomposition(True)
             [Perm((0, 1)), Perm((1, 0))]
         """
-        blocks = [ [] for i in range(len(self))]
-        for start in range(0, len(self)):
-            mn, mx = self[start], self[start]
-            for length in range(2, len(self) - start + 1):
-                if length == len(self):
-                    continue
-                end = start + length - 1
-                mn, mx = min(mn, self[end]), max(mx, self[end])
-                if mx - mn == length - 1:
-                    blocks[length].append(start)
+        blocks = [[] for i in range(len(self))]
+        root = self.substitution_decomposition()
+        for node in (root if root is not None else ()):
+            if node is not root and len(node) > 1:
+                blocks[len(node)].append(node.start)
+            if node.is_linear:
+                children = node.children
+                for first in range(len(children) - 1):
+                    for last in range(first + 1, len(children)):
+                        if first == 0 and last == len(children) - 1:
+                            continue  # The node itself
+                        start = children[first].start
+                        blocks[children[last].stop - start].append(start)
+        for indices in blocks:
+            indices.sort()
 
         if return_patterns:
             patterns = set()
             for length in range(0, len(blocks)):
                 for start in blocks[length]:
                     patterns.add(Perm.to_standard(self[start:start + length]))
-            return list(patterns)
+            return sorted(patterns)
         else:
             return blocks
 
@@ -1584,11 +2067,17 @@ class Perm(tuple,
             >>> Perm((0, 2, 1, 5, 6, 7, 4, 3)).maximum_block()
             (7, 1)
         '''
-        blocks = self.block_decomposition()
-        for length, indexlist in reversed(list(enumerate(blocks))):
-            if len(indexlist):
-                return (length, indexlist[0])
-        return (0, 0)
+        root = self.substitution_decomposition()
+        if root is None or len(root) < 3:
+            return (0, 0)
+        children = root.children
+        if root.is_linear:
+            # All children but the first or the last
+            without_last = (len(root) - len(children[-1]), 0)
+            without_first = (len(root) - len(children[0]), children[0].stop)
+            return max(without_last, without_first, key=lambda block: block[0])
+        length, start = max((len(child), -child.start) for child in children)
+        return (length, -start) if length > 1 else (0, 0)
 
 
     maximal_interval = maximum_block # permpy backwards compatibility
@@ -1625,7 +2114,7 @@ class Perm(tuple,
             >>> Perm((4, 1, 6, 3, 0, 7, 2, 5)).is_strongly_simple()
             True
         """
-        return self.is_simple() and all([p.is_simple() for p in self.children()])
+        return self.is_simple() and all(p.is_simple() for p in self.children())
 
     def children(self):
         """Returns all patterns of length one less than the permutation. One
@@ -1672,14 +2161,54 @@ class Perm(tuple,
         return L
 
     def sum_indecomposable_sequence(self):
-        S = self.downset()
-        return [len([p for p in S if len(p)==i and not p.sum_decomposable()]) for i in range(1,max([len(p) for p in S])+1)]
+        """Counts the sum indecomposable permutations of each length 1, ...,
+        n contained in the permutation.
+
+        Examples:
+            >>> Perm((1, 0, 2)).sum_indecomposable_sequence()
+            [1, 1, 0]
+            >>> Perm((2, 0, 3, 1)).sum_indecomposable_sequence()
+            [1, 1, 2, 1]
+        """
+        result = []
+        level = set([self])
+        for length in range(len(self), 0, -1):
+            result.append(sum(1 for perm in level if not perm.is_sum_decomposable()))
+            level = set(child for perm in level for child in perm.children())
+        result.reverse()
+        return result
+
+    def rtlmax_ltrmin_layers(self):
+        """Returns the layer of each entry in the right-to-left maxima,
+        left-to-right minima decomposition, see rtlmax_ltrmin_decomposition.
+
+        An entry is removed with the first layer it is a left-to-right
+        minimum or right-to-left maximum of, so its layer is one less than
+        the length of the longest increasing subsequence ending at it or
+        starting at it, whichever is shorter. Both are found by patience
+        sorting, in O(n log n) time.
+
+        Examples:
+            >>> Perm((0, 3, 1, 2, 4)).rtlmax_ltrmin_layers()
+            [0, 1, 1, 1, 0]
+            >>> Perm((2, 0, 4, 1, 3)).rtlmax_ltrmin_layers()
+            [0, 0, 0, 1, 0]
+        """
+        ending_at = _increasing_lengths(self)
+        starting_at = _increasing_lengths([-element for element in reversed(self)])
+        starting_at.reverse()
+        return [min(ending, starting) - 1
+                for ending, starting in zip(ending_at, starting_at)]
 
     def count_rtlmax_ltrmin_layers(self):
         """Counts the layers in the right-to-left maxima, left-to-right minima
         decomposition.
+
+        Examples:
+            >>> Perm((0, 3, 1, 2, 4)).count_rtlmax_ltrmin_layers()
+            2
         """
-        return len(self.rtlmax_ltrmin_decomposition())
+        return max(self.rtlmax_ltrmin_layers(), default=-1) + 1
 
     num_rtlmax_ltrmin_layers = count_rtlmax_ltrmin_layers
 
@@ -1690,17 +2219,25 @@ class Perm(tuple,
         left-to-right minimas and the next layer is defined similarly for the
         permutation with the first layer removed and so on.
 
-        TODO: If this function is to be kept, then it probably should return
-        the layers as indices in the original permutation.
-        """
-        P = Perm(self)
-        num_layers = 0
-        layers = []
-        while len(P) > 0:
-            num_layers += 1
-            positions = sorted(list(set(P.rtlmax()+P.ltrmin())))
-            layers.append(positions)
-            P = Perm([P[i] for i in range(len(P)) if i not in positions])
+        Each layer is given as the positions in the permutation with the
+        previous layers removed; rtlmax_ltrmin_layers gives the layer of each
+        position in the original permutation.
+
+        Examples:
+            >>> Perm((0, 3, 1, 2, 4)).rtlmax_ltrmin_decomposition()
+            [[0, 4], [0, 1, 2]]
+        """
+        layer_of = self.rtlmax_ltrmin_layers()
+        layers = [[] for _ in range(max(layer_of, default=-1) + 1)]
+        for index, layer in enumerate(layer_of):
+            layers[layer].append(index)
+        # Translate to positions among the entries remaining at each layer
+        remaining = FenwickTree(len(self), fill=1)
+        for layer in layers:
+            positions = [remaining.prefix_sum(index) for index in layer]
+            for index in layer:
+                remaining.add(index, -1)
+            layer[:] = positions
         return layers
 
     #
@@ -1797,9 +2334,48 @@ class Perm(tuple,
 
     occurrences = count_occurrences_of  # permpy backwards compatibility
 
+    def count_occurrences_in(self, perm):
+        """Count the number of occurrences of self in perm.
+
+        The occurrences are not found: partial occurrences are merged by the
+        values they share and counted with Fenwick trees, see
+        permuta._occurrence_counts. Patterns of length 3 and 4 that are not
+        monotone are counted with corner trees in long perms.
+
+        Args:
+            self:
+                A classical pattern.
+            perm: <permuta.Perm>
+                A perm.
+
+        Returns: <int>
+            The number of times self occurs in perm.
+
+        Examples:
+            >>> Perm((0, 1)).count_occurrences_in(Perm((4, 1, 2, 3, 0)))
+            3
+            >>> Perm((0, 2, 1)).count_occurrences_in(Perm((1, 3, 4, 0, 2, 5)))
+            2
+            >>> Perm.monotone_increasing(5).count_occurrences_in(Perm.monotone_increasing(40))
+            658008
+        """
+        if len(self) in (3, 4) and len(perm) >= _CORNER_TREE_LENGTH \
+                and not CompiledPattern.compile(self).direction:
+            from permuta import _pattern_counts
+            if len(self) == 3:
+                return _pattern_counts.count_patterns_3(perm)[
+                    _pattern_counts.PATTERNS_3.index(self)]
+            return _pattern_counts.count_patterns_4(perm)[
+                _pattern_counts.PATTERNS_4.index(self)]
+        from permuta import _occurrence_counts
+        return _occurrence_counts.count_occurrences(self, perm)
+
     def occurrences_in(self, perm):
         """Find all indices of occurrences of self in perm.
 
+        The matching plan of self is compiled once and shared by all equal
+        patterns, see permuta.CompiledPattern.
+
         Args:
             self:
                 The classical pattern whose occurrences are to be found.
@@ -1822,81 +2398,7 @@ class Perm(tuple,
             >>> list(Perm().occurrences_in(Perm((1, 2, 3, 0))))
             [()]
         """
-        # Special cases
-        if len(self) == 0:
-            # Pattern is empty, occurs in all perms
-            # This is needed for the occurrences function to work correctly
-            yield ()
-            return
-        if len(self) > len(perm):
-            # Pattern is too long to occur in perm
-            return
-
-        # The indices of the occurrence in perm
-        occurrence_indices = [None]*len(self)
-
-        # Get left to right scan details
-        pattern_details = self.__pattern_details()
-
-        # Define function that works with the above defined variables
-        # i is the index of the element in perm that is to be considered
-        # k is how many elements of the perm have already been added to occurrence
-        def occurrences(i, k):
-            elements_remaining = len(perm) - i
-            elements_needed = len(self) - k
-
-            # Get the following variables:
-            #   - lfi: Left Floor Index
-            #   - lci: Left Ceiling Index
-            #   - lbp: Lower Bound Pre-computation
-            #   - ubp: Upper Bound Pre-computation
-            lfi, lci, lbp, ubp = pattern_details[k]
-
-            # Set the bounds for the new element
-            if lfi is None:
-                # The new element of the occurrence must be at least self[k];
-                # i.e., the k-th element of the pattern
-                # In this case, lbp = self[k]
-                lower_bound = lbp
-            else:
-                # The new element of the occurrence must be at least as far
-                # from its left floor as self[k] is from its left floor
-                # In this case, lbp = self[k] - self[lfi]
-                occurrence_left_floor = perm[occurrence_indices[lfi]]
-                lower_bound = occurrence_left_floor + lbp
-            if lci is None:
-                # The new element of the occurrence must be at least as less
-                # than its maximum possible element---i.e., len(perm)---as
-                # self[k] is to its maximum possible element---i.e., len(self)
-                # In this case, ubp = len(self) - self[k]
-                upper_bound = len(perm) - ubp
-            else:
-                # The new element of the occurrence must be at least as less
-                # than its left ceiling as self[k] is to its left ceiling
-                # In this case, ubp = self[lci] - self[k]
-                upper_bound = perm[occurrence_indices[lci]] - ubp
-
-            # Loop over remaining elements of perm (actually i, the index)
-            while 1:
-                if elements_remaining < elements_needed:
-                    # Can't form an occurrence with remaining elements
-                    return
-                element = perm[i]
-                if lower_bound <= element <= upper_bound:
-                    occurrence_indices[k] = i
-                    if elements_needed == 1:
-                        # Yield occurrence
-                        yield tuple(occurrence_indices)
-                    else:
-                        # Yield occurrences where the i-th element is chosen
-                        for occurence in occurrences(i+1, k+1):
-                            yield occurence
-                # Increment i, that also means elements_remaining should decrement
-                i += 1
-                elements_remaining -= 1
-
-        for occurence in occurrences(0, 0):
-            yield occurence
+        return CompiledPattern.compile(self).occurrences_in(perm)
 
     def occurrences_of(self, patt):
         """Find all indices of occurrences of patt in self.
@@ -1926,32 +2428,6 @@ class Perm(tuple,
         """
         return patt.occurrences_in(self)
 
-    def __pattern_details(self):
-        """Subroutine of occurrences_in method."""
-        # If details have been calculated before, return cached result
-        if self._cached_pattern_details is not None:
-            return self._cached_pattern_details
-        result = []
-        index = 0
-        for fac_indices in left_floor_and_ceiling(self):
-            base_element = self[index]
-            compiled = (fac_indices.floor,
-
-                        fac_indices.ceiling,
-
-                        self[index]
-                        if fac_indices.floor is None
-                        else base_element - self[fac_indices.floor],
-
-                        len(self) - self[index]
-                        if fac_indices.ceiling is None
-                        else self[fac_indices.ceiling] - base_element,
-                       )
-            result.append(compiled)
-            index += 1
-        self._cached_pattern_details = result
-        return result
-
     #
     # General methods
     #
@@ -2032,9 +2508,12 @@ class Perm(tuple,
         back to an ascii_plot if matplotlib isn't found, or if use_mpl is set to
         False.
         """
-        # TODO: check if matplotlib is imported
         if not use_mpl:
             return self._ascii_plot()
+        try:
+            import matplotlib.pyplot as plt
+        except ImportError:
+            return self._ascii_plot()
         xs = [val for val in range(len(self))]
         ys = [val for val in self]
         if not ax:
@@ -2133,9 +2612,19 @@ class Perm(tuple,
         return self.skew_sum(other)
 
     def __mul__(self, other):
-        """Return the composition of two perms."""
+        """Return the composition of two perms.
+
+        Other operands, e.g., a permuta.PermBatch, may implement the
+        composition themselves.
+        """
+        if not isinstance(other, Perm):
+            return NotImplemented
         return self.compose(other)
 
+    def __pow__(self, exponent):
+        """Return the exponent-th power of the perm."""
+        return self.power(exponent)
+
     def __repr__(self):
         return "Perm({})".format(super(Perm, self).__repr__())
 
@@ -2163,4 +2652,68 @@ class Perm(tuple,
         Returns: <bool>
             True if and only if the pattern patt is contained in self.
         """
-        return any(True for _ in patt.occurrences_in(self))
+        if not isinstance(patt, Perm):
+            return any(True for _ in patt.occurrences_in(self))
+        compiled = CompiledPattern.compile(patt)
+        if compiled.direction and len(patt) <= len(self):
+            # A monotone pattern is contained if and only if the longest
+            # monotone subsequence in its direction is long enough
+            if compiled.direction == 1:
+                return _increasing_length(self, len(patt)) == len(patt)
+            return _increasing_length([-element for element in self],
+                                      len(patt)) == len(patt)
+        return compiled.contained_in(self)
+
+
+@functools.lru_cache(maxsize=4096)
+def _cycles(perm):
+    """Return the cycles of perm as tuples, ordered by their largest element,
+    each starting with its largest element and followed by its images.
+
+    The cycles are found in one pass and kept in a side cache keyed by the
+    value of the perm.
+    """
+    cycles = []
+    seen = [False]*len(perm)
+    for largest in range(len(perm) - 1, -1, -1):
+        if seen[largest]:
+            continue
+        cycle = [largest]
+        seen[largest] = True
+        element = perm[largest]
+        while element != largest:
+            cycle.append(element)
+            seen[element] = True
+            element = perm[element]
+        cycles.append(tuple(cycle))
+    cycles.reverse()
+    return tuple(cycles)
+
+
+@functools.lru_cache(maxsize=4096)
+def _components(perm, skew):
+    """Return the sum components of perm, or its skew components if skew is
+    set, as a tuple of perms.
+
+    Like the cycles, the components are kept in a side cache keyed by the
+    value of the perm.
+    """
+    components = []
+    start = 0
+    if skew:
+        smallest = len(perm)
+        for index, element in enumerate(perm):
+            smallest = min(smallest, element)
+            if smallest == len(perm) - 1 - index:
+                components.append(Perm(element - smallest
+                                       for element in perm[start:index + 1]))
+                start = index + 1
+    else:
+        largest = -1
+        for index, element in enumerate(perm):
+            largest = max(largest, element)
+            if largest == index:
+                components.append(Perm(element - start
+                                       for element in perm[start:index + 1]))
+                start = index + 1
+    return tuple(components)
@@ -0,0 +1,361 @@
+import numbers
+
+import numpy as np
+
+from permuta import Perm
+from permuta import _bulk
+
+
+__all__ = ["PermBatch"]
+
+
+# Up to this length inversions are counted by comparing all pairs, which is
+# quadratic but beats the Lehmer code kernel in practice
+_PAIRWISE_INVERSIONS_LENGTH = 256
+
+
+class PermBatch(object):
+    """A batch of perms of a single length with vectorized statistics.
+
+    The perms are the rows of a two dimensional NumPy array. The statistics
+    mirror those of permuta.Perm, but each of them is computed for all the
+    perms at once and returned as an array with one entry per perm.
+
+    Examples:
+        >>> batch = PermBatch([Perm((0, 2, 1)), Perm((2, 1, 0)), Perm((1, 0, 2))])
+        >>> batch.count_descents()
+        array([1, 2, 1])
+        >>> batch.count_inversions()
+        array([1, 3, 1])
+        >>> batch.is_involution()
+        array([ True,  True,  True])
+    """
+
+    __slots__ = ("_array",)
+
+    def __init__(self, perms=(), length=None):
+        """Return a batch of the perms given.
+
+        Args:
+            perms: <numpy.ndarray>, <permuta.PermStore> or <collections.Iterable>
+                A two dimensional array whose rows are perms, an object with
+                such an array as its array attribute, e.g., a PermStore or a
+                level of an avoidance class, or an iterable of perms.
+            length: <numbers.Integral>
+                The length of the perms. Required if perms is an empty
+                iterable.
+
+        Raises:
+            ValueError:
+                The perms are not all of the same length.
+        """
+        if isinstance(perms, np.ndarray):
+            array = perms
+        elif hasattr(perms, "array"):
+            array = perms.array
+        else:
+            from permuta import PermStore
+            array = PermStore(perms, length).array
+        if array.ndim != 2:
+            raise ValueError("Array of perms must be two dimensional")
+        self._array = array
+
+    @property
+    def length(self):
+        """The length of the perms in the batch."""
+        return self._array.shape[1]
+
+    @property
+    def array(self):
+        """A read-only view of the underlying array, one perm per row."""
+        view = self._array.view()
+        view.flags.writeable = False
+        return view
+
+    def _signed(self):
+        """Return the perms as a signed array, safe to subtract."""
+        return self._array.astype(np.int64)
+
+    #
+    # Composition and inversion
+    #
+
+    def compose(self, *others):
+        """Return the batch of the compositions of the perms with others.
+
+        Args:
+            others: <permuta.Perm> or <permuta.PermBatch> argument list
+                A perm is composed with every perm of the batch, and a batch
+                of the same size is composed perm by perm.
+
+        Returns: <permuta.PermBatch>
+            The perms mapping i to perm[other[...][i]], as in
+            permuta.Perm.compose.
+
+        Raises:
+            TypeError:
+                An object in the argument list is neither a perm nor a batch.
+            ValueError:
+                A perm or a batch in the argument list is of the wrong length
+                or size.
+
+        Examples:
+            >>> batch = PermBatch([Perm((0, 3, 1, 2)), Perm((3, 2, 1, 0))])
+            >>> list(batch.compose(Perm((2, 1, 0, 3))))
+            [Perm((1, 3, 0, 2)), Perm((1, 2, 3, 0))]
+            >>> list(batch * batch)
+            [Perm((0, 2, 3, 1)), Perm((0, 1, 2, 3))]
+            >>> list(Perm((2, 1, 0, 3)) * batch)
+            [Perm((2, 3, 1, 0)), Perm((3, 0, 1, 2))]
+        """
+        result = self._array
+        for other in others:
+            result = _bulk.compose(result, PermBatch._operand(other))
+        return PermBatch(result)
+
+    multiply = compose
+
+    def inverse(self):
+        """Return the batch of the inverses of the perms.
+
+        Examples:
+            >>> list(PermBatch([Perm((1, 2, 5, 0, 3, 4)), Perm((0, 1, 2, 3, 4, 5))]).inverse())
+            [Perm((3, 0, 1, 4, 5, 2)), Perm((0, 1, 2, 3, 4, 5))]
+        """
+        return PermBatch(_bulk.inverses(self._array))
+
+    @staticmethod
+    def _operand(other):
+        """Return the array of a perm or a batch to be composed with."""
+        if isinstance(other, PermBatch):
+            return other._array
+        if isinstance(other, Perm):
+            return np.array(other, dtype=_bulk.dtype_for_length(len(other)))
+        raise TypeError("'{}' object is neither a perm nor a batch".format(repr(other)))
+
+    def __mul__(self, other):
+        """Return the composition of the batch with a perm or a batch."""
+        if not isinstance(other, (Perm, PermBatch)):
+            return NotImplemented
+        return self.compose(other)
+
+    def __rmul__(self, other):
+        """Return the composition of a perm with every perm of the batch."""
+        if not isinstance(other, Perm):
+            return NotImplemented
+        return PermBatch(_bulk.compose(PermBatch._operand(other), self._array))
+
+    #
+    # Statistics
+    #
+
+    def descents(self):
+        """Return the descents of the perms as a boolean array whose entry
+        [k, i] is True if i is a descent of the k-th perm.
+
+        Examples:
+            >>> PermBatch([Perm((0, 1, 3, 2)), Perm((3, 2, 1, 0))]).descents()
+            array([[False, False,  True],
+                   [ True,  True,  True]])
+        """
+        array = self._array
+        return array[:, :-1] > array[:, 1:]
+
+    def count_descents(self):
+        """Count the number of descents of each perm."""
+        return np.count_nonzero(self.descents(), axis=1)
+
+    def ascents(self):
+        """Return the ascents of the perms as a boolean array whose entry
+        [k, i] is True if i is an ascent of the k-th perm.
+        """
+        array = self._array
+        return array[:, :-1] < array[:, 1:]
+
+    def count_ascents(self):
+        """Count the number of ascents of each perm.
+
+        Examples:
+            >>> PermBatch([Perm((0, 1, 3, 2, 4)), Perm((0, 4, 3, 2, 1))]).count_ascents()
+            array([3, 1])
+        """
+        return np.count_nonzero(self.ascents(), axis=1)
+
+    def count_peaks(self):
+        """Count the number of peaks of each perm.
+
+        Examples:
+            >>> PermBatch([Perm((5, 3, 4, 0, 2, 1)), Perm((5, 4, 3, 2, 1, 0))]).count_peaks()
+            array([2, 0])
+        """
+        array = self._array
+        middle = array[:, 1:-1]
+        return np.count_nonzero((array[:, :-2] < middle) & (middle > array[:, 2:]), axis=1)
+
+    def count_valleys(self):
+        """Count the number of valleys of each perm.
+
+        Examples:
+            >>> PermBatch([Perm((5, 3, 4, 0, 2, 1)), Perm((2, 0, 1, 3, 4, 5))]).count_valleys()
+            array([2, 1])
+        """
+        array = self._array
+        middle = array[:, 1:-1]
+        return np.count_nonzero((array[:, :-2] > middle) & (middle < array[:, 2:]), axis=1)
+
+    def count_fixed_points(self):
+        """Count the number of fixed points of each perm.
+
+        Examples:
+            >>> PermBatch([Perm((0, 1, 4, 3, 2)), Perm((3, 4, 1, 0, 2))]).count_fixed_points()
+            array([3, 0])
+        """
+        return np.count_nonzero(self._array == np.arange(self.length), axis=1)
+
+    def count_bonds(self):
+        """Count the number of bonds, that is adjacent locations with
+        adjacent values, of each perm.
+
+        Examples:
+            >>> PermBatch([Perm((4, 0, 3, 2, 1, 5)), Perm((0, 1, 2, 3, 4, 5))]).count_bonds()
+            array([2, 5])
+        """
+        return np.count_nonzero(np.abs(np.diff(self._signed(), axis=1)) == 1, axis=1)
+
+    def majorindex(self):
+        """Return the major index, the sum of the 1-based positions of the
+        descents, of each perm.
+
+        Examples:
+            >>> PermBatch([Perm((3, 1, 2, 4, 0)), Perm((0, 2, 1, 3, 4))]).majorindex()
+            array([5, 2])
+        """
+        return self.descents() @ np.arange(1, self.length, dtype=np.int64)
+
+    def count_inversions(self):
+        """Count the number of inversions of each perm.
+
+        Examples:
+            >>> PermBatch([Perm((3, 0, 2, 1)), Perm((0, 1, 2, 3))]).count_inversions()
+            array([4, 0])
+        """
+        array = self._array
+        if self.length > _PAIRWISE_INVERSIONS_LENGTH:
+            return _bulk.lehmer_codes(array).sum(axis=1)
+        result = np.zeros(len(array), dtype=np.int64)
+        for index in range(self.length - 1):
+            result += np.count_nonzero(array[:, index:index + 1] > array[:, index + 1:], axis=1)
+        return result
+
+    def count_ltrmin(self):
+        """Count the number of left-to-right minima of each perm.
+
+        Examples:
+            >>> PermBatch([Perm((2, 4, 3, 0, 1)), Perm((4, 3, 2, 1, 0))]).count_ltrmin()
+            array([2, 5])
+        """
+        array = self._array
+        return np.count_nonzero(array == np.minimum.accumulate(array, axis=1), axis=1)
+
+    def is_involution(self):
+        """Check for each perm if it is equal to its own inverse.
+
+        Examples:
+            >>> PermBatch([Perm((2, 1, 0)), Perm((1, 2, 0))]).is_involution()
+            array([ True, False])
+        """
+        array = self._signed()
+        return np.all(np.take_along_axis(array, array, axis=1) == np.arange(self.length),
+                      axis=1)
+
+    def is_sum_decomposable(self):
+        """Check for each perm if it is the direct sum of two perms.
+
+        Examples:
+            >>> PermBatch([Perm((1, 0, 2)), Perm((2, 0, 1))]).is_sum_decomposable()
+            array([ True, False])
+        """
+        prefix_maxima = np.maximum.accumulate(self._array, axis=1)[:, :-1]
+        return np.any(prefix_maxima == np.arange(self.length - 1), axis=1)
+
+    def is_skew_decomposable(self):
+        """Check for each perm if it is the skew sum of two perms.
+
+        Examples:
+            >>> PermBatch([Perm((1, 0, 2)), Perm((2, 0, 1))]).is_skew_decomposable()
+            array([False,  True])
+        """
+        prefix_minima = np.minimum.accumulate(self._array, axis=1)[:, :-1]
+        return np.any(prefix_minima == np.arange(self.length - 1, 0, -1), axis=1)
+
+    def count_cycles(self):
+        """Count the number of cycles of each perm.
+
+        Examples:
+            >>> PermBatch([Perm((5, 3, 8, 1, 0, 4, 2, 7, 6))]).count_cycles()
+            array([4])
+        """
+        return _bulk.count_cycles(self._array)
+
+    def cycle_types(self):
+        """Return the cycle types of the perms as an array whose entry [k, l]
+        is the number of cycles of length l of the k-th perm.
+
+        Perms of the same length are conjugate exactly when their rows are
+        equal, so the rows can serve as keys of the conjugacy classes.
+
+        Examples:
+            >>> PermBatch([Perm((1, 2, 0, 4, 3)), Perm((0, 1, 2, 3, 4))]).cycle_types()
+            array([[0, 0, 1, 1, 0, 0],
+                   [0, 5, 0, 0, 0, 0]])
+        """
+        return _bulk.cycle_types(self._array)
+
+    def order(self):
+        """Return the order of each perm.
+
+        The orders are Python integers in an object array for perms longer
+        than permuta._bulk.MAX_FIXED_WIDTH_ORDER_LENGTH.
+
+        Examples:
+            >>> PermBatch([Perm((1, 2, 0, 4, 3, 5)), Perm((0, 1, 2, 3, 4, 5))]).order()
+            array([6, 1])
+        """
+        return _bulk.orders(self._array)
+
+    def power(self, exponent):
+        """Return the batch of the exponent-th powers of the perms, see
+        Perm.power.
+
+        Examples:
+            >>> list(PermBatch([Perm((1, 2, 0, 4, 3)), Perm((4, 3, 2, 1, 0))]).power(10**18))
+            [Perm((1, 2, 0, 3, 4)), Perm((0, 1, 2, 3, 4))]
+        """
+        if not isinstance(exponent, numbers.Integral):
+            raise TypeError("'{}' object is not an integer".format(repr(exponent)))
+        return PermBatch(_bulk.powers(self._array, exponent))
+
+    def __pow__(self, exponent):
+        return self.power(exponent)
+
+    #
+    # Container methods
+    #
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return PermBatch(self._array[key])
+        elif isinstance(key, numbers.Integral):
+            return Perm(self._array[key].tolist())
+        else:
+            raise TypeError("'{}' object is not a valid index".format(repr(key)))
+
+    def __iter__(self):
+        for row in self._array:
+            yield Perm(row.tolist())
+
+    def __len__(self):
+        return len(self._array)
+
+    def __repr__(self):
+        return "<PermBatch of {} perms of length {}>".format(len(self), self.length)
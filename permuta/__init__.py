@@ -1,7 +1,70 @@
-from .Perm import *
-from .PermSet import *
-from .MeshPatt import MeshPatt, gen_meshpatts
-from . import _perm_set
-from . import descriptors
-from . import interfaces
-from . import misc
+"""A comprehensive high performance permutation library.
+
+The public names of the package are imported on first access, so that a bare
+``import permuta`` stays cheap for short-lived processes.
+"""
+
+import importlib
+import sys
+import types
+
+
+# Public name -> the module defining it
+_LAZY_ATTRIBUTES = {
+    "Perm": "permuta.Perm",
+    "PermSet": "permuta.PermSet",
+    "Av": "permuta.PermSet",
+    "AvoidanceClass": "permuta.PermSet",
+    "PermStore": "permuta._perm_set.finite.PermStore",
+    "PermBatch": "permuta.PermBatch",
+    "CompiledPattern": "permuta.CompiledPattern",
+    "MeshPatt": "permuta.MeshPatt",
+    "gen_meshpatts": "permuta.MeshPatt",
+}
+
+# Submodules that used to be imported along with the package
+_LAZY_SUBMODULES = frozenset(["_perm_set", "descriptors", "interfaces", "misc"])
+
+__all__ = [
+    "Perm",
+    "PermSet",
+    "Av",
+    "AvoidanceClass",
+    "PermStore",
+    "PermBatch",
+    "CompiledPattern",
+    "MeshPatt",
+    "gen_meshpatts",
+    "descriptors",
+    "interfaces",
+    "misc",
+]
+
+
+class _LazyModule(types.ModuleType):
+    """The class of the permuta package module, importing names on demand."""
+
+    def __getattr__(self, name):
+        if name in _LAZY_ATTRIBUTES:
+            value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name]), name)
+        elif name in _LAZY_SUBMODULES:
+            value = importlib.import_module("." + name, self.__name__)
+        else:
+            message = "module {!r} has no attribute {!r}".format(self.__name__, name)
+            raise AttributeError(message)
+        setattr(self, name, value)
+        return value
+
+    def __setattr__(self, name, value):
+        # Importing e.g. the submodule permuta.Perm binds it to the attribute
+        # Perm of the package; keep the class there instead
+        if isinstance(value, types.ModuleType) \
+                and _LAZY_ATTRIBUTES.get(name) == value.__name__:
+            value = getattr(value, name)
+        super(_LazyModule, self).__setattr__(name, value)
+
+    def __dir__(self):
+        return sorted(set(self.__dict__) | set(_LAZY_ATTRIBUTES) | _LAZY_SUBMODULES)
+
+
+sys.modules[__name__].__class__ = _LazyModule
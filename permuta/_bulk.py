@@ -0,0 +1,409 @@
+"""Vectorized kernels working on batches of perms stored as array rows."""
+
+import math
+
+import numpy as np
+
+
+# The largest length for which the ranks of all perms fit in an int64
+MAX_FIXED_WIDTH_RANK_LENGTH = 20
+
+# The largest length for which the orders of all perms fit in an int64, by the
+# bound log g(n) < 1.05313 sqrt(n log n) on Landau's function
+MAX_FIXED_WIDTH_ORDER_LENGTH = 256
+
+
+def dtype_for_length(length):
+    """Return the smallest unsigned integer dtype that can hold the elements
+    of a perm of the given length.
+
+    Examples:
+        >>> dtype_for_length(10)
+        dtype('uint8')
+        >>> dtype_for_length(1000)
+        dtype('uint16')
+        >>> dtype_for_length(100000)
+        dtype('uint32')
+    """
+    if length <= 1 << 8:
+        return np.dtype(np.uint8)
+    elif length <= 1 << 16:
+        return np.dtype(np.uint16)
+    else:
+        return np.dtype(np.uint32)
+
+
+def as_rows(rows):
+    """Return rows as a two dimensional array.
+
+    Args:
+        rows: <numpy.ndarray> or <collections.Iterable>
+            A two dimensional array, or an iterable of equal length sequences.
+
+    Raises:
+        ValueError:
+            The sequences are not all of the same length.
+    """
+    if isinstance(rows, np.ndarray):
+        if rows.ndim != 2:
+            raise ValueError("Array of rows must be two dimensional")
+        return rows
+    rows = [list(row) for row in rows]
+    if not rows:
+        return np.empty((0, 0), dtype=np.uint8)
+    length = len(rows[0])
+    if any(len(row) != length for row in rows):
+        raise ValueError("Sequences must all be of the same length")
+    return np.array(rows).reshape(len(rows), length)
+
+
+def standardize(rows):
+    """Return the standardizations of rows, one perm per row.
+
+    Equal elements of a row become consecutive values, in order of
+    appearance, as in permuta.Perm.to_standard.
+    """
+    rows = as_rows(rows)
+    count, length = rows.shape
+    order = np.argsort(rows, axis=1, kind="stable")
+    result = np.empty((count, length), dtype=dtype_for_length(length))
+    result[np.arange(count)[:, np.newaxis], order] = np.arange(length, dtype=result.dtype)
+    return result
+
+
+def rank_dtype(length):
+    """Return the dtype used for ranks of perms of the given length."""
+    if length <= MAX_FIXED_WIDTH_RANK_LENGTH:
+        return np.dtype(np.int64)
+    return np.dtype(object)
+
+
+def lehmer_codes(rows):
+    """Return the Lehmer codes of the perms in rows.
+
+    The i-th entry of a Lehmer code is the number of smaller elements to the
+    right of the i-th element. This is counted bottom-up as in merge sort:
+    at the level with blocks of width w, each element of a left block counts
+    the smaller elements of its right sibling block with a binary search in
+    the block-wise sorted rows. All rows are processed at once, in O(log n)
+    array operations and O(n log^2 n) time per row.
+    """
+    rows = as_rows(rows)
+    count, length = rows.shape
+    codes = np.zeros((count, length), dtype=np.int64)
+    if not count or length < 2:
+        return codes
+    positions = np.arange(length, dtype=np.int64)
+    row_offsets = np.arange(count, dtype=np.int64)[:, np.newaxis]
+    # Keys of a row lie in [0, length**2) before the offset making them
+    # increase from row to row
+    keys = rows.astype(np.int64) + row_offsets*(length*length)
+    row_starts = row_offsets*length
+    width = 1
+    while width < length:
+        blocks = positions // width
+        block_keys = keys + blocks*length
+        sorted_keys = np.sort(block_keys, axis=1).ravel()
+        left = (blocks % 2 == 0) & ((blocks + 1)*width < length)
+        # The key of an element moved into its right sibling block
+        queries = block_keys[:, left] + length
+        sibling_starts = row_starts + (blocks[left] + 1)*width
+        smaller = np.searchsorted(sorted_keys, queries.ravel()).reshape(queries.shape)
+        codes[:, left] += smaller - sibling_starts
+        width *= 2
+    return codes
+
+
+def from_lehmer_codes(codes):
+    """Return the perms whose Lehmer codes are the rows of codes."""
+    codes = as_rows(codes)
+    count, length = codes.shape
+    result = np.empty((count, length), dtype=dtype_for_length(length))
+    # Each row has a binary indexed tree of the unused values, all set to 1
+    tree = np.tile(np.arange(length + 1) & -np.arange(length + 1), (count, 1))
+    row_indices = np.arange(count)
+    top_step = 1 << (length.bit_length() - 1) if length else 0
+    for index in range(length):
+        remaining = codes[:, index].astype(np.int64)
+        position = np.zeros(count, dtype=np.int64)
+        step = top_step
+        while step:
+            next_position = position + step
+            valid = next_position <= length
+            advance = np.zeros(count, dtype=bool)
+            advance[valid] = tree[row_indices[valid], next_position[valid]] <= remaining[valid]
+            position[advance] = next_position[advance]
+            remaining[advance] -= tree[row_indices[advance], position[advance]]
+            step >>= 1
+        result[:, index] = position
+        position = position + 1
+        while True:
+            active = position <= length
+            if not active.any():
+                break
+            tree[row_indices[active], position[active]] -= 1
+            position[active] += position[active] & -position[active]
+    return result
+
+
+def rank(rows):
+    """Return the lexicographic ranks of the perms in rows among the perms of
+    their length.
+
+    The ranks are int64 for lengths up to MAX_FIXED_WIDTH_RANK_LENGTH and
+    Python integers in an object array above that.
+    """
+    rows = as_rows(rows)
+    length = rows.shape[1]
+    codes = lehmer_codes(rows).astype(rank_dtype(length))
+    result = np.zeros(len(rows), dtype=rank_dtype(length))
+    for index in range(length):
+        # Horner's scheme for the factorial number system
+        result = result*(length - index) + codes[:, index]
+    return result
+
+
+def unrank(numbers, length):
+    """Return the perms of the given length with the given lexicographic
+    ranks, one perm per row.
+
+    Raises:
+        ValueError:
+            A number is not the rank of a perm of the given length.
+    """
+    dtype = rank_dtype(length)
+    numbers = np.array(numbers, dtype=dtype, ndmin=1)
+    if numbers.ndim != 1:
+        raise ValueError("Ranks must be given as a one dimensional sequence")
+    if len(numbers) and (numbers.min() < 0 or numbers.max() >= math.factorial(length)):
+        raise ValueError("Rank out of range for length {}".format(length))
+    codes = np.zeros((len(numbers), length), dtype=np.int64)
+    for radix in range(1, length + 1):
+        codes[:, length - radix] = numbers % radix
+        numbers = numbers // radix
+    return from_lehmer_codes(codes)
+
+
+def myrvold_ruskey_rank(rows):
+    """Return the Myrvold-Ruskey ranks of the perms in rows.
+
+    This is a bijection between the perms of length n and 0, ..., n! - 1
+    computed in O(n) array operations, but it does not respect the
+    lexicographic order.
+    """
+    rows = as_rows(rows)
+    count, length = rows.shape
+    dtype = rank_dtype(length)
+    perms = rows.astype(np.int64)
+    inverses = np.empty_like(perms)
+    row_indices = np.arange(count)[:, np.newaxis]
+    inverses[row_indices, perms] = np.arange(length)
+    row_indices = row_indices.ravel()
+    result = np.zeros(count, dtype=dtype)
+    multiplier = 1
+    for size in range(length, 0, -1):
+        last = perms[:, size - 1].copy()
+        position = inverses[:, size - 1].copy()
+        # Swap the largest remaining element into the last position
+        perms[row_indices, position] = last
+        inverses[row_indices, last] = position
+        result += last.astype(dtype)*multiplier
+        multiplier *= size
+    return result
+
+
+def myrvold_ruskey_unrank(numbers, length):
+    """Return the perms of the given length with the given Myrvold-Ruskey
+    ranks, one perm per row.
+
+    Raises:
+        ValueError:
+            A number is not the rank of a perm of the given length.
+    """
+    dtype = rank_dtype(length)
+    numbers = np.array(numbers, dtype=dtype, ndmin=1)
+    if numbers.ndim != 1:
+        raise ValueError("Ranks must be given as a one dimensional sequence")
+    if len(numbers) and (numbers.min() < 0 or numbers.max() >= math.factorial(length)):
+        raise ValueError("Rank out of range for length {}".format(length))
+    count = len(numbers)
+    result = np.tile(np.arange(length, dtype=dtype_for_length(length)), (count, 1))
+    row_indices = np.arange(count)
+    for size in range(length, 0, -1):
+        position = (numbers % size).astype(np.int64)
+        numbers = numbers // size
+        last = result[:, size - 1].copy()
+        result[:, size - 1] = result[row_indices, position]
+        result[row_indices, position] = last
+    return result
+
+
+def compose(left, right):
+    """Return the compositions of the perms in left with those in right.
+
+    Both are two dimensional arrays with one perm per row, composed row by
+    row, or one of them is a single perm composed with every row of the
+    other. The composition maps i to left[right[i]].
+
+    Raises:
+        ValueError:
+            The perms are not of the same length, or the batches are not of
+            the same size.
+    """
+    left = np.asarray(left)
+    right = np.asarray(right)
+    if left.shape[-1] != right.shape[-1]:
+        raise ValueError("Perm length mismatch")
+    if left.ndim == 1:
+        return left[right]
+    if right.ndim == 1:
+        return left[:, right]
+    if len(left) != len(right):
+        raise ValueError("Batch size mismatch")
+    return np.take_along_axis(left, right, axis=1)
+
+
+def inverses(rows):
+    """Return the inverses of the perms in rows."""
+    rows = as_rows(rows)
+    count, length = rows.shape
+    result = np.empty_like(rows)
+    result[np.arange(count)[:, np.newaxis], rows] = np.arange(length, dtype=rows.dtype)
+    return result
+
+
+def cycle_minima(rows):
+    """Return, for each element of the perms in rows, the smallest element of
+    its cycle.
+
+    The minima are found by pointer doubling: after k rounds the minimum is
+    taken over the next 2**k elements of the cycle, so O(log n) rounds of
+    array operations suffice.
+    """
+    rows = as_rows(rows)
+    count, length = rows.shape
+    successors = rows.astype(np.int64)
+    minima = np.tile(np.arange(length, dtype=np.int64), (count, 1))
+    covered = 1
+    while covered < length:
+        minima = np.minimum(minima, np.take_along_axis(minima, successors, axis=1))
+        successors = np.take_along_axis(successors, successors, axis=1)
+        covered *= 2
+    return minima
+
+
+def count_cycles(rows):
+    """Return the number of cycles of each of the perms in rows."""
+    minima = cycle_minima(rows)
+    return np.count_nonzero(minima == np.arange(minima.shape[1]), axis=1)
+
+
+def cycle_lengths(rows):
+    """Return, for each element of the perms in rows, the length of its
+    cycle."""
+    rows = as_rows(rows)
+    count, length = rows.shape
+    keys = cycle_minima(rows) + (length*np.arange(count, dtype=np.int64))[:, np.newaxis]
+    return np.bincount(keys.ravel(), minlength=count*length)[keys]
+
+
+def cycle_types(rows):
+    """Return the cycle types of the perms in rows, as an array whose entry
+    [k, l] is the number of cycles of length l of the k-th perm."""
+    rows = as_rows(rows)
+    count, length = rows.shape
+    keys = cycle_lengths(rows) + ((length + 1)*np.arange(count, dtype=np.int64))[:, np.newaxis]
+    elements = np.bincount(keys.ravel(), minlength=count*(length + 1))
+    elements = elements.reshape(count, length + 1)
+    # A cycle of length l has l elements
+    elements[:, 1:] //= np.arange(1, length + 1)
+    return elements
+
+
+def orders(rows):
+    """Return the orders of the perms in rows.
+
+    The orders are int64 for perms of length up to
+    MAX_FIXED_WIDTH_ORDER_LENGTH and Python integers beyond that.
+    """
+    rows = as_rows(rows)
+    lengths = cycle_lengths(rows)
+    if rows.shape[1] <= MAX_FIXED_WIDTH_ORDER_LENGTH:
+        return np.lcm.reduce(lengths, axis=1, initial=1)
+    result = np.empty(len(rows), dtype=object)
+    for index, row in enumerate(lengths):
+        order = 1
+        for cycle_length in np.unique(row).tolist():
+            order = order*cycle_length // math.gcd(order, cycle_length)
+        result[index] = order
+    return result
+
+
+def powers(rows, exponent):
+    """Return the exponent-th powers of the perms in rows.
+
+    As in Perm.power, every element is moved along its cycle by the exponent
+    modulo the length of the cycle, so the exponent may be arbitrarily large
+    or negative. The position of each element in its cycle is found by
+    pointer doubling from the cycle minima, which takes O(n log n) rather
+    than O(n) work per perm but only O(log n) array operations.
+    """
+    rows = as_rows(rows)
+    count, length = rows.shape
+    successors = rows.astype(np.int64)
+    identity = np.arange(length, dtype=np.int64)
+    minima = cycle_minima(rows)
+    keys = minima + (length*np.arange(count, dtype=np.int64))[:, np.newaxis]
+    lengths = np.bincount(keys.ravel(), minlength=count*length)[keys]
+    # The number of steps from each element forward to the minimum of its
+    # cycle, by pointer doubling with the minima pointing to themselves
+    is_minimum = minima == identity
+    pointers = np.where(is_minimum, identity, successors)
+    distances = (~is_minimum).astype(np.int64)
+    covered = 1
+    while covered < length:
+        distances = distances + np.take_along_axis(distances, pointers, axis=1)
+        pointers = np.take_along_axis(pointers, pointers, axis=1)
+        covered *= 2
+    positions = (lengths - distances) % lengths
+    # Lay the cycles out one after the other, each starting at its minimum
+    sizes = np.where(is_minimum, lengths, 0)
+    starts = np.cumsum(sizes, axis=1) - sizes
+    offsets = np.take_along_axis(starts, minima, axis=1)
+    row_indices = np.arange(count)[:, np.newaxis]
+    cycles = np.empty((count, length), dtype=np.int64)
+    cycles[row_indices, offsets + positions] = identity
+    shifts = np.array([exponent % cycle_length for cycle_length in range(1, length + 1)],
+                      dtype=np.int64)
+    targets = offsets + (positions + shifts[lengths - 1]) % lengths
+    return cycles[row_indices, targets].astype(rows.dtype)
+
+
+def random_generator(seed=None, worker=None):
+    """Return a NumPy random generator.
+
+    Args:
+        seed: <numbers.Integral>, <numpy.random.SeedSequence> or
+              <numpy.random.Generator>
+            The seed, or a generator to use as is. None seeds from the OS.
+        worker: <numbers.Integral>
+            The index of a parallel worker. Workers with the same seed get
+            deterministic and statistically independent streams.
+    """
+    if isinstance(seed, np.random.Generator):
+        if worker is not None:
+            raise ValueError("A worker index requires a seed, not a generator")
+        return seed
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    if worker is not None:
+        seed = np.random.SeedSequence(seed.entropy,
+                                      spawn_key=seed.spawn_key + (worker,))
+    return np.random.default_rng(seed)
+
+
+def random_rows(length, count, seed=None, worker=None):
+    """Return count uniformly random perms of the given length, one per row."""
+    generator = random_generator(seed, worker)
+    rows = np.tile(np.arange(length, dtype=dtype_for_length(length)), (count, 1))
+    return generator.permuted(rows, axis=1, out=rows)
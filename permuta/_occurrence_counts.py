@@ -0,0 +1,179 @@
+"""Count the occurrences of a classical pattern in a perm without finding them.
+
+The perm is scanned from left to right and a partial occurrence is a choice
+of entries for the first k points of the pattern. Whether it extends depends
+only on the values of the few chosen entries that are the left floor or left
+ceiling of a point still to be placed, so partial occurrences agreeing on
+those values are merged into one state holding their number. When placing
+point k lets the values of its left floor or ceiling be forgotten, the
+states are kept in Fenwick trees over those values, and the partial
+occurrences an entry extends are a range count.
+
+With d the largest number of values remembered from one step to the next,
+the count takes O(k n^(d + 1) log n) time. The pattern is first turned by
+the symmetry of the square that makes d smallest, which is 0 for monotone
+patterns and 1 for the other patterns of length 3.
+"""
+
+import functools
+
+from permuta.misc import FenwickTree
+from permuta.misc import left_floor_and_ceiling
+
+
+def _reverse(perm):
+    return tuple(perm[::-1])
+
+
+def _complement(perm):
+    return tuple(len(perm) - 1 - element for element in perm)
+
+
+def _inverse(perm):
+    result = [0]*len(perm)
+    for index, element in enumerate(perm):
+        result[element] = index
+    return tuple(result)
+
+
+# The symmetries of the square, as the maps applied in turn
+_SYMMETRIES = [
+    (),
+    (_reverse,),
+    (_complement,),
+    (_reverse, _complement),
+    (_inverse,),
+    (_inverse, _reverse),
+    (_inverse, _complement),
+    (_inverse, _reverse, _complement),
+]
+
+
+class _Step(object):
+    """The placing of one point of a pattern.
+
+    The states before the step are grouped by the values of the points in
+    kept, remembered after the step too, and hold the values of the left
+    floor (ceiling) of the point in a Fenwick tree if it is forgotten.
+    """
+
+    __slots__ = ("kept", "floor", "ceiling", "floor_tree", "ceiling_tree", "remember")
+
+    def __init__(self, kept, floor, ceiling, floor_tree, ceiling_tree, remember):
+        self.kept = kept  # Indices into the remembered values, in order
+        self.floor = floor  # Index into the group key, or None
+        self.ceiling = ceiling  # Index into the group key, or None
+        self.floor_tree = floor_tree  # Index into the remembered values, or None
+        self.ceiling_tree = ceiling_tree  # Index into the remembered values, or None
+        self.remember = remember  # Whether the new value is remembered
+
+
+def _plan(patt):
+    """Return the steps of counting patt from left to right."""
+    bounds = list(left_floor_and_ceiling(patt))
+    # remembered[k] are the points before k bounding point k or a later one
+    remembered = []
+    for k in range(len(patt) + 1):
+        needed = set()
+        for floor, ceiling in bounds[k:]:
+            needed.update((floor, ceiling))
+        remembered.append(sorted(point for point in needed
+                                 if point is not None and point < k))
+    steps = []
+    for k, (floor, ceiling) in enumerate(bounds):
+        kept = [point for point in remembered[k] if point in remembered[k + 1]]
+        steps.append(_Step(
+            [remembered[k].index(point) for point in kept],
+            kept.index(floor) if floor in kept else None,
+            kept.index(ceiling) if ceiling in kept else None,
+            remembered[k].index(floor) if floor is not None and floor not in kept else None,
+            remembered[k].index(ceiling) if ceiling is not None and ceiling not in kept else None,
+            k in remembered[k + 1]))
+    return steps
+
+
+@functools.lru_cache(maxsize=1024)
+def _best_plan(patt):
+    """Return the symmetry making patt cheapest to count and the plan for
+    the pattern it turns patt into."""
+    best = None
+    for symmetry in _SYMMETRIES:
+        turned = patt
+        for operation in symmetry:
+            turned = operation(turned)
+        steps = _plan(turned)
+        sizes = sorted((len(step.kept) for step in steps), reverse=True)
+        if best is None or sizes < best[0]:
+            best = (sizes, symmetry, steps)
+    return best[1], best[2]
+
+
+def _add(groups, step, key, count, size):
+    """Add count partial occurrences with remembered values key to the states
+    before step."""
+    group_key = tuple(key[index] for index in step.kept)
+    group = groups.get(group_key)
+    if group is None:
+        group = groups[group_key] = [
+            0,
+            None if step.floor_tree is None else FenwickTree(size),
+            None if step.ceiling_tree is None else FenwickTree(size),
+        ]
+    group[0] += count
+    if group[1] is not None:
+        group[1].add(key[step.floor_tree], count)
+    if group[2] is not None:
+        group[2].add(key[step.ceiling_tree], count)
+
+
+def count_occurrences(patt, perm):
+    """Return the number of occurrences of the classical pattern patt in perm.
+
+    Examples:
+        >>> count_occurrences((0, 2, 1), (1, 3, 4, 0, 2, 5))
+        2
+        >>> count_occurrences((1, 0), (4, 1, 2, 3, 0))
+        7
+    """
+    patt = tuple(patt)
+    perm = tuple(perm)
+    if not patt:
+        return 1
+    if len(patt) > len(perm):
+        return 0
+    symmetry, steps = _best_plan(patt)
+    for operation in symmetry:
+        perm = operation(perm)
+    size = len(perm)
+    last = len(steps) - 1
+    # levels[k] holds the states of the partial occurrences of k points
+    levels = [{} for _ in steps]
+    _add(levels[0], steps[0], (), 1, size)
+    result = 0
+    for value in perm:
+        # Longest partial occurrences first, so value is not used twice
+        for k in range(last, -1, -1):
+            step = steps[k]
+            for group_key, (total, floor_tree, ceiling_tree) in levels[k].items():
+                if step.floor is not None and value < group_key[step.floor]:
+                    continue
+                if step.ceiling is not None and value > group_key[step.ceiling]:
+                    continue
+                # The partial occurrences whose floor is below value and
+                # ceiling above it; the ceiling is above the floor
+                if floor_tree is not None:
+                    count = floor_tree.prefix_sum(value)
+                    if ceiling_tree is not None:
+                        count -= ceiling_tree.prefix_sum(value)
+                elif ceiling_tree is not None:
+                    count = total - ceiling_tree.prefix_sum(value)
+                else:
+                    count = total
+                if not count:
+                    continue
+                if k == last:
+                    result += count
+                else:
+                    key = group_key + (value,) if step.remember else group_key
+                    _add(levels[k + 1], steps[k + 1], key, count, size)
+    return result
@@ -0,0 +1,241 @@
+"""Count the occurrences of all patterns of length 3 or 4 in a perm.
+
+The counts come from corner trees, in the manner of Even-Zohar and Leng. A
+corner tree has a vertex for each point of a pattern and edges saying in
+which quadrant of one point the other lies. The number of ways to place a
+corner tree on the points of a perm is found in O(n log n) time, one sum
+over a quadrant per edge, and is a fixed linear combination of the pattern
+counts. The counts of the six patterns of length 3 follow from the quadrant
+counts of each point. Corner trees with four vertices span all but one
+dimension of the counts of the patterns of length 4, so the occurrences of
+1324 are counted directly and the counts are solved for.
+"""
+
+import functools
+import itertools
+import operator
+from fractions import Fraction
+
+import numpy as np
+
+
+# Quadrants of a point, as the signs of the differences in position and value
+# of the points in them
+SW, NW, SE, NE = (-1, -1), (-1, 1), (1, -1), (1, 1)
+
+# Corner trees with four vertices rooted at vertex 0, as edges (parent,
+# child, quadrant of the parent the child lies in); their counts and the
+# count of 1324 determine the counts of all patterns of length 4
+_STARS = [
+    (SW, SW, SW), (SW, SW, NW), (SW, SW, SE), (SW, SW, NE), (SW, NW, NW),
+    (SW, NW, SE), (SW, NW, NE), (SW, SE, SE), (SW, SE, NE), (SW, NE, NE),
+    (NW, NW, NW), (NW, NW, SE), (NW, SE, SE), (NW, SE, NE),
+]
+_PATHS = [
+    (SW, SW, SW), (SW, SW, NW), (SW, SW, SE), (SW, NW, SW), (SW, NW, SE),
+    (SW, SE, NW), (NW, SW, NW), (NW, SW, SE), (SE, SW, SE),
+]
+CORNER_TREES = tuple(
+    [((0, 1, first), (0, 2, second), (0, 3, third)) for first, second, third in _STARS] +
+    [((0, 1, first), (0, 2, second), (2, 3, third)) for first, second, third in _PATHS])
+
+PATTERNS_3 = tuple(itertools.permutations(range(3)))
+PATTERNS_4 = tuple(itertools.permutations(range(4)))
+_EXTRA_PATTERN = (0, 2, 1, 3)
+
+
+def _lower_left_sums(values, weights):
+    """Return, for each point, the total weight of the points to its left
+    and below it.
+
+    The points are merged in blocks of doubling size. At every level, the
+    points of each left half are sorted by value and the weights below each
+    point of the right half are read off the running sums.
+    """
+    length = len(values)
+    result = np.zeros(length, dtype=np.int64)
+    positions = np.arange(length)
+    size = 1
+    while size < length:
+        blocks = positions // (2*size)
+        keys = blocks*length + values
+        right = (positions // size) % 2 == 1
+        left_positions = np.flatnonzero(~right)
+        order = left_positions[np.argsort(keys[left_positions], kind="stable")]
+        sorted_keys = keys[order]
+        sums = np.concatenate(([0], np.cumsum(weights[order])))
+        right_positions = np.flatnonzero(right)
+        below = np.searchsorted(sorted_keys, keys[right_positions])
+        block_start = np.searchsorted(sorted_keys, blocks[right_positions]*length)
+        result[right_positions] += sums[below] - sums[block_start]
+        size *= 2
+    return result
+
+
+def _quadrant_sums(values, weights, quadrant):
+    """Return, for each point, the total weight of the points in a quadrant
+    of it."""
+    horizontal, vertical = quadrant
+    if vertical > 0:
+        values = len(values) - 1 - values
+    if horizontal < 0:
+        return _lower_left_sums(values, weights)
+    return _lower_left_sums(values[::-1], weights[::-1])[::-1]
+
+
+def _corner_tree_count(values, tree, cache):
+    """Return the number of ways to place the points of a corner tree on the
+    points of values, the sums over quadrants being shared through cache."""
+    children = {}
+    for parent, child, quadrant in tree:
+        children.setdefault(parent, []).append((child, quadrant))
+
+    def placements(vertex):
+        # The number of placements of the subtree below vertex at each point
+        result = np.ones(len(values), dtype=np.int64)
+        for child, quadrant in children.get(vertex, ()):
+            key = (quadrant, shape(child))
+            if key not in cache:
+                cache[key] = _quadrant_sums(values, placements(child), quadrant)
+            result = result*cache[key]
+        return result
+
+    def shape(vertex):
+        return tuple(sorted((quadrant, shape(child))
+                            for child, quadrant in children.get(vertex, ())))
+
+    return sum(placements(0).tolist())
+
+
+def _coefficient(tree, pattern):
+    """Return the number of ways to place the vertices of a corner tree on
+    the points of pattern, using every point."""
+    result = 0
+    for placement in itertools.product(range(len(pattern)), repeat=4):
+        if len(set(placement)) != len(pattern):
+            continue
+        if all((placement[child] - placement[parent])*quadrant[0] > 0
+               and (pattern[placement[child]] - pattern[placement[parent]])*quadrant[1] > 0
+               for parent, child, quadrant in tree):
+            result += 1
+    return result
+
+
+def _lower_patterns():
+    return [pattern for length in range(1, 4)
+            for pattern in itertools.permutations(range(length))]
+
+
+@functools.lru_cache(maxsize=None)
+def _system():
+    """Return the inverse of the matrix taking the counts of the patterns of
+    length 4 to the corner tree counts, less the contributions of shorter
+    patterns, and the count of 1324; and those contributions."""
+    matrix = [[Fraction(_coefficient(tree, pattern)) for pattern in PATTERNS_4]
+              for tree in CORNER_TREES]
+    matrix.append([Fraction(pattern == _EXTRA_PATTERN) for pattern in PATTERNS_4])
+    lower = [[_coefficient(tree, pattern) for pattern in _lower_patterns()]
+             for tree in CORNER_TREES]
+    # Invert by Gauss-Jordan elimination, exactly
+    size = len(matrix)
+    augmented = [row + [Fraction(int(column == index)) for column in range(size)]
+                 for index, row in enumerate(matrix)]
+    for column in range(size):
+        pivot = next(row for row in range(column, size) if augmented[row][column])
+        augmented[column], augmented[pivot] = augmented[pivot], augmented[column]
+        scale = augmented[column][column]
+        augmented[column] = [entry/scale for entry in augmented[column]]
+        for row in range(size):
+            if row != column and augmented[row][column]:
+                factor = augmented[row][column]
+                augmented[row] = [entry - factor*pivot_entry for entry, pivot_entry
+                                  in zip(augmented[row], augmented[column])]
+    return [row[size:] for row in augmented], lower
+
+
+def _quadrant_counts(values):
+    """Return the number of points to the lower left, upper left, lower
+    right and upper right of each point."""
+    length = len(values)
+    lower_left = _lower_left_sums(values, np.ones(length, dtype=np.int64))
+    upper_left = np.arange(length) - lower_left
+    lower_right = values - lower_left
+    upper_right = length - 1 - np.arange(length) - lower_right
+    return lower_left, upper_left, lower_right, upper_right
+
+
+def count_patterns_3(perm):
+    """Return the number of occurrences of each pattern of length 3 in perm,
+    in the order of PATTERNS_3, in O(n log n) time.
+
+    Every occurrence is counted by its first or middle point, from the number
+    of points in each quadrant of it.
+    """
+    values = np.asarray(perm, dtype=np.int64)
+    lower_left, upper_left, lower_right, upper_right = (
+        count.tolist() for count in _quadrant_counts(values))
+    increasing = sum(map(operator.mul, lower_left, upper_right))
+    decreasing = sum(map(operator.mul, upper_left, lower_right))
+    # Pairs right of the first point, both above it or both below it
+    count_021 = sum(count*(count - 1)//2 for count in upper_right) - increasing
+    count_201 = sum(count*(count - 1)//2 for count in lower_right) - decreasing
+    # The middle point is the largest or the smallest of the three
+    middle_largest = sum(map(operator.mul, lower_left, lower_right))
+    middle_smallest = sum(map(operator.mul, upper_left, upper_right))
+    return [increasing,
+            count_021,
+            middle_smallest - count_201,
+            middle_largest - count_021,
+            count_201,
+            decreasing]
+
+
+def _count_1324(values):
+    """Return the number of occurrences of 1324, in O(n^2) time, each point
+    being handled with a constant number of array operations.
+
+    An occurrence is a pair of an inversion at positions j < k, a point left
+    of j below both and a point right of k above both.
+    """
+    length = len(values)
+    # smaller_before[v] is the number of points left of the current one below v
+    smaller_before = np.zeros(length + 1, dtype=np.int64)
+    result = 0
+    for position in range(length):
+        value = values[position]
+        after = values[position + 1:]
+        above = after > value
+        # The points above value right of each point after the current one
+        above_after = np.count_nonzero(above) - np.cumsum(above)
+        below = ~above
+        result += int(np.dot(smaller_before[after[below]], above_after[below]))
+        smaller_before[value + 1:] += 1
+    return result
+
+
+def count_patterns_4(perm):
+    """Return the number of occurrences of each pattern of length 4 in perm,
+    in the order of PATTERNS_4.
+
+    The 23 corner tree counts take O(n log n) time and the count of 1324
+    O(n^2) time, with the inner loop in NumPy.
+    """
+    values = np.asarray(perm, dtype=np.int64)
+    length = len(values)
+    inverse, lower = _system()
+    lower_left = _quadrant_counts(values)[0]
+    noninversions = sum(lower_left.tolist())
+    lower_counts = [length, noninversions, length*(length - 1)//2 - noninversions]
+    lower_counts.extend(count_patterns_3(perm))
+    cache = {}
+    known = []
+    for tree, coefficients in zip(CORNER_TREES, lower):
+        count = _corner_tree_count(values, tree, cache)
+        known.append(count - sum(map(operator.mul, coefficients, lower_counts)))
+    known.append(_count_1324(values))
+    result = []
+    for row in inverse:
+        count = sum(entry*value for entry, value in zip(row, known))
+        assert count.denominator == 1
+        result.append(int(count))
+    return result
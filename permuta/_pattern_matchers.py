@@ -0,0 +1,193 @@
+"""Dedicated containment checks for small classical patterns.
+
+The four patterns of length 3 that are not monotone are found in O(n) time
+with a stack, and 1324, 4231, 2413 and 3142 in O(n log n) time with segment
+trees. Each check is written for one pattern and the others of its
+symmetry class are checked on the perm read backwards or with its entries
+negated. Monotone patterns are left to the longest monotone subsequence.
+"""
+
+import functools
+import itertools
+
+
+__all__ = ["MATCHERS"]
+
+
+_INFINITY = float("inf")
+
+
+def _inverse(perm):
+    result = [0]*len(perm)
+    for index, element in enumerate(perm):
+        result[element] = index
+    return result
+
+
+def _contains_132(perm, backward=True, sign=1):
+    """Check for i < j < k with perm[i] < perm[k] < perm[j].
+
+    The perm is scanned from the right. The stack holds a decreasing run of
+    candidates for the 3, and third is the largest entry with a larger one
+    to its left seen so far, the best candidate for the 2; any entry below
+    it is a 1.
+
+    Scanning from the left instead (backward false) checks for 231, and
+    multiplying the entries by sign -1 checks for the complement, so the
+    other patterns of length 3 are checked without copying the perm.
+    """
+    stack = []
+    third = -_INFINITY
+    for element in reversed(perm) if backward else perm:
+        element *= sign
+        if element < third:
+            return True
+        while stack and stack[-1] < element:
+            third = stack.pop()
+        stack.append(element)
+    return False
+
+
+def _contains_1324(perm):
+    """Check for i < j < k < l with perm[i] < perm[k] < perm[j] < perm[l].
+
+    For each k, the 1 and the 4 are best taken as the smallest entry left of
+    the 3 and the largest entry right of k. The candidates for the 3 are
+    kept in a segment tree over their values holding the smallest entry to
+    their left, and k completes an occurrence if a 3 with a value between
+    perm[k] and the largest entry to its right has one below perm[k].
+    """
+    length = len(perm)
+    if length < 4:
+        return False
+    largest_after = list(itertools.accumulate(reversed(perm), max))
+    largest_after.reverse()
+    largest_after = largest_after[1:] + [-1]
+    size = 1
+    while size < length:
+        size *= 2
+    # tree[size + v] is the smallest entry left of the entry of value v, if
+    # that entry has been passed
+    tree = [length]*(2*size)
+    smallest = length
+    for index, element in enumerate(perm):
+        # The 3s with values between element and the largest entry after it
+        start = element + 1 + size
+        stop = largest_after[index] + size
+        lowest = length
+        while start < stop:
+            if start & 1:
+                lowest = min(lowest, tree[start])
+                start += 1
+            if stop & 1:
+                stop -= 1
+                lowest = min(lowest, tree[stop])
+            start >>= 1
+            stop >>= 1
+        if lowest < element:
+            return True
+        node = element + size
+        tree[node] = smallest
+        node >>= 1
+        while node:
+            tree[node] = min(tree[2*node], tree[2*node + 1])
+            node >>= 1
+        smallest = min(smallest, element)
+    return False
+
+
+# The summary of a run of entries split at a threshold into low and high
+# ones: whether it has a high entry, the largest and smallest low entries,
+# the largest low entry with a high one after it, the smallest low entry with
+# a high one before it, and whether a low entry is above a later low entry
+# with a high one between them
+_EMPTY = (False, -1, _INFINITY, -1, _INFINITY, False)
+_HIGH = (True, -1, _INFINITY, -1, _INFINITY, False)
+
+
+def _join(left, right):
+    left_high, left_largest, left_smallest, left_before, left_after, left_found = left
+    right_high, right_largest, right_smallest, right_before, right_after, right_found = right
+    return (
+        left_high or right_high,
+        max(left_largest, right_largest),
+        min(left_smallest, right_smallest),
+        max(left_largest, right_before) if right_high else left_before,
+        min(left_after, right_smallest) if left_high else right_after,
+        left_found or right_found
+        or left_before > right_smallest or left_largest > right_after,
+    )
+
+
+def _contains_2413(perm):
+    """Check for i < j < k < l with perm[k] < perm[i] < perm[l] < perm[j].
+
+    The entries are taken as the 3 in increasing order of value. Entries
+    below the 3 are low and those above it high, and the 3 completes an
+    occurrence if left of it a low entry is above a later low entry with a
+    high one between them. A segment tree over the positions holds the
+    summaries of its ranges, and each entry turns from high to low once it
+    has been the 3.
+    """
+    length = len(perm)
+    if length < 4:
+        return False
+    size = 1
+    while size < length:
+        size *= 2
+    # All entries start high, and so does the padding right of them
+    tree = [_HIGH]*(2*size)
+    position = _inverse(perm)
+    for value in range(length):
+        # Summarize the entries left of the 3
+        start = size
+        stop = position[value] + size
+        left = right = _EMPTY
+        while start < stop:
+            if start & 1:
+                left = _join(left, tree[start])
+                start += 1
+            if stop & 1:
+                stop -= 1
+                right = _join(tree[stop], right)
+            start >>= 1
+            stop >>= 1
+        if _join(left, right)[5]:
+            return True
+        node = position[value] + size
+        tree[node] = (False, value, value, -1, _INFINITY, False)
+        node >>= 1
+        while node:
+            tree[node] = _join(tree[2*node], tree[2*node + 1])
+            node >>= 1
+    return False
+
+
+def _reversed(check):
+    def matcher(perm):
+        return check(perm[::-1])
+    return matcher
+
+
+# Below this length, the search of occurrences_in tends to settle the
+# question before the segment trees are set up
+_SEGMENT_TREE_LENGTH = 32
+
+# The steps per entry the search takes before the segment trees are set up,
+# so that perms with an early occurrence, such as most long perms, never pay
+# for them, while the search cannot take more than a constant factor longer
+# than the trees
+_SEARCH_BUDGET = 4
+
+# Pattern -> (function checking if a perm contains it, the shortest perms it
+# is used for, the steps per entry the search takes first or None)
+MATCHERS = {
+    (0, 2, 1): (_contains_132, 0, None),
+    (1, 2, 0): (functools.partial(_contains_132, backward=False), 0, None),
+    (2, 0, 1): (functools.partial(_contains_132, sign=-1), 0, None),
+    (1, 0, 2): (functools.partial(_contains_132, backward=False, sign=-1), 0, None),
+    (0, 2, 1, 3): (_contains_1324, _SEGMENT_TREE_LENGTH, _SEARCH_BUDGET),
+    (3, 1, 2, 0): (_reversed(_contains_1324), _SEGMENT_TREE_LENGTH, _SEARCH_BUDGET),
+    (1, 3, 0, 2): (_contains_2413, _SEGMENT_TREE_LENGTH, _SEARCH_BUDGET),
+    (2, 0, 3, 1): (_reversed(_contains_2413), _SEGMENT_TREE_LENGTH, _SEARCH_BUDGET),
+}
@@ -3,4 +3,10 @@ from .PermSetFinite import PermSetFinite
 
 class PermSetFiniteSpecificLength(PermSetFinite):
     """Base class for all finite perm sets of perms of a specific length."""
-    pass
+
+    def count_sum_indecomposable(self):
+        """Count the sum indecomposable perms in the set.
+
+        The perms are streamed, so they are never all held at once.
+        """
+        return sum(1 for perm in self if not perm.is_sum_decomposable())
@@ -0,0 +1,151 @@
+import numbers
+import random
+
+import numpy as np
+
+from permuta._bulk import dtype_for_length
+from .PermSetFiniteSpecificLength import PermSetFiniteSpecificLength
+from .PermSetStatic import PermSetStatic
+from permuta import Perm
+
+
+class PermStore(PermSetFiniteSpecificLength):
+    """A columnar store of perms of a single length.
+
+    The perms are kept as the rows of a packed two dimensional NumPy array
+    whose dtype is chosen by the length of the perms. Perm instances are only
+    created when the store is indexed or iterated over. Membership tests use
+    a sorted index over the raw bytes of the rows, built on first use.
+    This module is only imported once a store is used, which keeps NumPy
+    out of importing permuta.PermSet.
+
+    Examples:
+        >>> store = PermStore([Perm((1, 0, 2)), Perm((0, 1, 2))])
+        >>> len(store)
+        2
+        >>> Perm((0, 1, 2)) in store
+        True
+        >>> store[0]
+        Perm((1, 0, 2))
+        >>> store.array
+        array([[1, 0, 2],
+               [0, 1, 2]], dtype=uint8)
+    """
+
+    __slots__ = ("_array", "_sorted_keys")
+
+    def __init__(self, perms=(), length=None):
+        """Return a store of the perms given.
+
+        Args:
+            perms: <collections.Iterable> of <permuta.Perm>
+                Perms, all of the same length.
+            length: <numbers.Integral>
+                The length of the perms. Required if perms is empty, otherwise
+                deduced from the first perm.
+
+        Raises:
+            ValueError:
+                The perms are not all of the same length.
+        """
+        perms = perms if isinstance(perms, (list, tuple)) else list(perms)
+        if length is None:
+            if not perms:
+                raise ValueError("Length of an empty store must be given")
+            length = len(perms[0])
+        array = np.empty((len(perms), length), dtype=dtype_for_length(length))
+        for row, perm in enumerate(perms):
+            if len(perm) != length:
+                raise ValueError("Perm length mismatch")
+            array[row] = perm
+        self._set_array(array)
+
+    @classmethod
+    def from_array(cls, array):
+        """Return a store backed by array without copying it.
+
+        Args:
+            array: <numpy.ndarray>
+                A two dimensional array whose rows are perms.
+
+        Raises:
+            ValueError:
+                The array is not two dimensional.
+        """
+        array = np.asarray(array)
+        if array.ndim != 2:
+            raise ValueError("Array of perms must be two dimensional")
+        store = cls.__new__(cls)
+        store._set_array(array)
+        return store
+
+    def _set_array(self, array):
+        self._array = array
+        self._sorted_keys = None
+
+    @property
+    def length(self):
+        """The length of the perms in the store."""
+        return self._array.shape[1]
+
+    @property
+    def array(self):
+        """A read-only view of the underlying array, one perm per row."""
+        view = self._array.view()
+        view.flags.writeable = False
+        return view
+
+    def of_length(self, length):
+        if length != self.length:
+            return PermSetStatic()
+        else:
+            return self
+
+    def random(self):
+        return self[random.randrange(len(self))]
+
+    def _row_keys(self, array):
+        """Return the rows of array as opaque byte strings."""
+        array = np.ascontiguousarray(array, dtype=self._array.dtype)
+        key_dtype = np.dtype((np.void, max(1, array.itemsize*self.length)))
+        if self.length == 0:
+            return np.zeros(len(array), dtype=key_dtype)
+        return array.view(key_dtype).ravel()
+
+    def _index(self):
+        """Return the sorted row keys, building them on first use."""
+        if self._sorted_keys is None:
+            self._sorted_keys = np.sort(self._row_keys(self._array))
+        return self._sorted_keys
+
+    def __contains__(self, other):
+        """Check if other is a perm in the store."""
+        if not isinstance(other, Perm) or len(other) != self.length:
+            return False
+        if not len(self._array):
+            return False
+        sorted_keys = self._index()
+        key = self._row_keys(np.array([other]))
+        position = np.searchsorted(sorted_keys, key)[0]
+        return position < len(sorted_keys) and sorted_keys[position] == key[0]
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return PermStore.from_array(self._array[key])
+        elif isinstance(key, numbers.Integral):
+            return Perm(self._array[key].tolist())
+        else:
+            raise TypeError("'{}' object is not a valid index".format(repr(key)))
+
+    def __iter__(self):
+        for row in self._array:
+            yield Perm(row.tolist())
+
+    def __len__(self):
+        return len(self._array)
+
+    def __str__(self):
+        return "a store of {} perms of length {}".format(len(self), self.length)
+
+    def __repr__(self):
+        return "<PermStore of {} perms of length {}>".format(len(self), self.length)
@@ -88,9 +88,31 @@ class PermSetAllSpecificLength(PermSetFiniteSpecificLength):
         random.shuffle(all_elements)
         return Perm(all_elements)
 
+    def random_many(self, count, seed=None, worker=None):
+        """Return count random perms of the length, see Perm.random_many."""
+        return Perm.random_many(self.length, count, seed, worker)
+
+    def count_sum_indecomposable(self):
+        """Count the sum indecomposable perms of the length.
+
+        Every perm is a sum indecomposable perm followed by the direct sum of
+        any perm, which gives a recurrence instead of generating the perms.
+
+        Examples:
+            >>> [PermSetAllSpecificLength(length).count_sum_indecomposable()
+            ...  for length in range(7)]
+            [1, 1, 1, 3, 13, 71, 461]
+        """
+        counts = [1]
+        for length in range(1, self.length + 1):
+            counts.append(factorial(length)
+                          - sum(counts[first]*factorial(length - first)
+                                for first in range(1, length)))
+        return counts[self.length]
+
     def __contains__(self, other):
         """Check if other is a permutation in the set."""
-        return isinstance(other, Permutation) and len(other) == self.length
+        return isinstance(other, Perm) and len(other) == self.length
 
     def __getitem__(self, key):
         return Perm.unrank(key, self.length)
@@ -9,6 +9,13 @@ from permuta._perm_set.finite import PermSetFiniteSpecificLength
 from ..PermSetDescribed import PermSetDescribed
 
 
+def _store(perms, length):
+    """Return a PermStore of the perms, importing it (and NumPy) only once
+    a level of an avoidance class is built."""
+    from permuta._perm_set.finite.PermStore import PermStore
+    return PermStore(perms, length)
+
+
 class Avoiding(PermSetDescribed):
     """The base class for all avoidance classes."""
     # NOTE: Monkey patching of default subclass happens at end of file
@@ -44,7 +51,7 @@ class AvoidingGeneric(Avoiding):
             return AvoidingGeneric.__CLASS_CACHE[basis]
         else:
             instance = super(AvoidingGeneric, cls).__new__(cls)
-            instance.cache = [set([Perm()])]  # Generic case includes empty permutation
+            instance.cache = [_store([Perm()], 0)]  # Generic case includes empty permutation
             AvoidingGeneric.__CLASS_CACHE[basis] = instance
             return instance
 
@@ -60,7 +67,8 @@ class AvoidingGeneric(Avoiding):
                     new_perm = perm.insert(index)
                     if new_perm.avoids(*patts):
                         new_level.add(new_perm)
-            self.cache.append(new_level)
+            # Levels are stored as packed arrays rather than sets of perms
+            self.cache.append(_store(new_level, total_indices))
 
     def _get_level(self, level_number):
         self._ensure_level(level_number)
@@ -77,8 +85,8 @@ class AvoidingGeneric(Avoiding):
             level = self._get_level(level_number)
             if len(level) <= key:
                 key -= len(level)
-            else:  # TODO: So dumb
-                return list(level)[key]
+            else:
+                return level[key]
             level_number += 1
 
     def __next__(self):
@@ -127,9 +135,20 @@ class AvoidingGenericSpecificLength(PermSetFiniteSpecificLength):
         else:
             return self
 
+    @property
+    def array(self):
+        """A read-only view of the perms of the level, one perm per row."""
+        return self._get_perms().array
+
     def random(self):
         return random.choice(self._get_perms())
 
+    def count_sum_indecomposable(self):
+        """Count the sum indecomposable perms of the level, checking all the
+        stored perms at once."""
+        from permuta import PermBatch
+        return len(self) - int(PermBatch(self).is_sum_decomposable().sum())
+
     def __contains__(self, other):
         """Check if other is a permutation in the set."""
         return isinstance(other, Perm) and other in self._get_perms()
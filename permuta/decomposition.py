@@ -0,0 +1,266 @@
+"""The substitution decomposition of perms.
+
+Every perm is the inflation of a simple perm or of a monotone perm of length
+at least 2, and repeating this on the components gives the substitution
+decomposition tree. The tree is built in O(n log n) time with the stack
+algorithm for permutation trees: the entries are pushed one by one, merging
+the top of the stack into increasing, decreasing or simple nodes, and a
+segment tree over the left endpoints tells when the entries ending at the
+current one contain an interval.
+"""
+
+import functools
+
+from permuta import Perm
+
+
+__all__ = [
+    "DecompositionNode",
+    "substitution_decomposition",
+]
+
+
+class DecompositionNode(object):
+    """A node of a substitution decomposition tree.
+
+    The node covers the entries of a perm at the positions start, ...,
+    stop - 1, whose values are low, ..., high. These form an interval of the
+    perm, the inflation of the node's skeleton by the patterns of its
+    children.
+
+    Attributes:
+        kind: <str>
+            One of POINT, INCREASING, DECREASING and SIMPLE.
+        perm: <permuta.Perm>
+            The perm decomposed.
+        start, stop: <int>
+            The positions covered.
+        low, high: <int>
+            The values covered.
+        children: <list> of <permuta.decomposition.DecompositionNode>
+            The children from left to right; empty for a point.
+    """
+
+    POINT = "point"
+    INCREASING = "increasing"
+    DECREASING = "decreasing"
+    SIMPLE = "simple"
+
+    __slots__ = ("kind", "perm", "start", "stop", "low", "high", "children")
+
+    def __init__(self, kind, perm, start, stop, low, high, children=None):
+        self.kind = kind
+        self.perm = perm
+        self.start = start
+        self.stop = stop
+        self.low = low
+        self.high = high
+        self.children = [] if children is None else children
+
+    @property
+    def is_linear(self):
+        return self.kind == DecompositionNode.INCREASING \
+            or self.kind == DecompositionNode.DECREASING
+
+    @property
+    def pattern(self):
+        """The pattern formed by the entries of the node.
+
+        Examples:
+            >>> substitution_decomposition(Perm((4, 1, 0, 2, 3))).children[1].pattern
+            Perm((1, 0, 2, 3))
+        """
+        return Perm(element - self.low for element in self.perm[self.start:self.stop])
+
+    @property
+    def skeleton(self):
+        """The perm inflated by the children's patterns to give the node's
+        pattern.
+
+        Examples:
+            >>> substitution_decomposition(Perm((1, 3, 0, 2))).skeleton
+            Perm((1, 3, 0, 2))
+            >>> substitution_decomposition(Perm((4, 1, 0, 2, 3))).skeleton
+            Perm((1, 0))
+        """
+        if not self.children:
+            return Perm((0,))
+        return Perm.to_standard([child.low for child in self.children])
+
+    @property
+    def components(self):
+        """The patterns of the children, inflating the skeleton."""
+        return [child.pattern for child in self.children]
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def __iter__(self):
+        """Yield the nodes of the subtree in preorder."""
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed(node.children))
+
+    def __repr__(self):
+        return "<DecompositionNode {} at {}:{}>".format(self.kind, self.start, self.stop)
+
+
+class _IntervalTree(object):
+    """A segment tree over the left endpoints l of the entries ending at the
+    current entry r, holding max - min + l of the values at l, ..., r.
+
+    This is r exactly when the entries at l, ..., r form an interval, and
+    never less, so intervals are found with range minimum queries.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.height = max(size, 1).bit_length()
+        # Values start as l, the right value for the interval l, ..., l
+        self.low = [0]*size + list(range(size))
+        self.pending = [0]*size
+        for node in range(size - 1, 0, -1):
+            self.low[node] = min(self.low[2*node], self.low[2*node + 1])
+
+    def _apply(self, node, delta):
+        self.low[node] += delta
+        if node < self.size:
+            self.pending[node] += delta
+
+    def _rebuild(self, node):
+        low = self.low
+        pending = self.pending
+        while node > 1:
+            node >>= 1
+            low[node] = min(low[2*node], low[2*node + 1]) + pending[node]
+
+    def _push(self, node):
+        for shift in range(self.height, 0, -1):
+            parent = node >> shift
+            if parent and self.pending[parent]:
+                delta = self.pending[parent]
+                self._apply(2*parent, delta)
+                self._apply(2*parent + 1, delta)
+                self.pending[parent] = 0
+
+    def add(self, start, stop, delta):
+        """Add delta to the values at start, ..., stop - 1."""
+        start += self.size
+        stop += self.size
+        first, last = start, stop - 1
+        while start < stop:
+            if start & 1:
+                self._apply(start, delta)
+                start += 1
+            if stop & 1:
+                stop -= 1
+                self._apply(stop, delta)
+            start >>= 1
+            stop >>= 1
+        self._rebuild(first)
+        self._rebuild(last)
+
+    def minimum(self, start, stop):
+        """Return the smallest value at start, ..., stop - 1."""
+        start += self.size
+        stop += self.size
+        self._push(start)
+        self._push(stop - 1)
+        result = float("inf")
+        while start < stop:
+            if start & 1:
+                result = min(result, self.low[start])
+                start += 1
+            if stop & 1:
+                stop -= 1
+                result = min(result, self.low[stop])
+            start >>= 1
+            stop >>= 1
+        return result
+
+
+def _merge(kind, perm, children):
+    return DecompositionNode(kind, perm, children[0].start, children[-1].stop,
+                             min(child.low for child in children),
+                             max(child.high for child in children),
+                             children)
+
+
+def _is_interval(first, second):
+    """Check if the entries of two nodes next to each other form an interval."""
+    return max(first.high, second.high) - min(first.low, second.low) \
+        == second.stop - first.start - 1
+
+
+@functools.lru_cache(maxsize=256)
+def substitution_decomposition(perm):
+    """Return the root of the substitution decomposition tree of perm.
+
+    The children of an increasing (decreasing) node are the sum (skew)
+    components of its pattern, and those of a simple node are the maximal
+    intervals of its pattern, which is the inflation of a simple perm of
+    length at least 4. The tree is built in O(n log n) time and the most
+    recently used trees are cached.
+
+    Returns: <permuta.decomposition.DecompositionNode>
+        The root, or None for the empty perm.
+
+    Examples:
+        >>> root = substitution_decomposition(Perm((4, 1, 0, 2, 3)))
+        >>> root.kind, root.skeleton, root.components
+        ('decreasing', Perm((1, 0)), [Perm((0,)), Perm((1, 0, 2, 3))])
+        >>> root.children[1].kind
+        'increasing'
+    """
+    perm = Perm(perm) if not isinstance(perm, Perm) else perm
+    length = len(perm)
+    if not length:
+        return None
+    tree = _IntervalTree(length)
+    maxima = []  # Positions of decreasing values, the maxima of suffixes
+    minima = []  # Positions of increasing values, the minima of suffixes
+    stack = []
+    for position, value in enumerate(perm):
+        while maxima and perm[maxima[-1]] < value:
+            top = maxima.pop()
+            tree.add(maxima[-1] + 1 if maxima else 0, top + 1, value - perm[top])
+        maxima.append(position)
+        while minima and perm[minima[-1]] > value:
+            top = minima.pop()
+            tree.add(minima[-1] + 1 if minima else 0, top + 1, perm[top] - value)
+        minima.append(position)
+        current = DecompositionNode(DecompositionNode.POINT, perm, position, position + 1,
+                                    value, value)
+        while stack:
+            top = stack[-1]
+            if top.is_linear and _is_interval(top.children[-1], current):
+                # Extend the monotone node, its direction is kept
+                stack.pop()
+                top.children.append(current)
+                top.stop = current.stop
+                top.low = min(top.low, current.low)
+                top.high = max(top.high, current.high)
+                current = top
+            elif _is_interval(top, current):
+                stack.pop()
+                kind = DecompositionNode.INCREASING if top.high < current.low \
+                    else DecompositionNode.DECREASING
+                current = _merge(kind, perm, [top, current])
+            elif tree.minimum(0, top.start) == position:
+                # Some nodes on the stack form a simple node with current
+                children = [current]
+                low, high = current.low, current.high
+                while True:
+                    node = stack.pop()
+                    children.append(node)
+                    low, high = min(low, node.low), max(high, node.high)
+                    if high - low == position - node.start:
+                        break
+                children.reverse()
+                current = _merge(DecompositionNode.SIMPLE, perm, children)
+            else:
+                break
+        stack.append(current)
+    return stack[0]
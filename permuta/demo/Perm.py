@@ -3,16 +3,9 @@
 
 import numbers
 import tempfile
-import warnings
 import webbrowser
 
-try:
-    import seaborn
-    _SEABORN_AVAILABLE = True
-except ImportError:
-    _SEABORN_AVAILABLE = False
-    warnings.warn("Unable to load seaborn for PermClass plotting")
-
+from . import _import_seaborn
 from ..Perm import Perm as _ZBPerm
 
 
@@ -412,7 +405,8 @@ class Perm:
             x-axis and the "yticklabels kwarg as range(len(self), -1, -1) for
             a labelled y-axis.
         """
-        if not _SEABORN_AVAILABLE:
+        seaborn = _import_seaborn("Perm")
+        if seaborn is None:
             return None
 
         # Compile the data
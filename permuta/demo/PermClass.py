@@ -3,17 +3,10 @@
 
 #import numbers
 import tempfile
-import warnings
 import webbrowser
 
 #import numpy
-try:
-    import seaborn
-    _SEABORN_AVAILABLE = True
-except ImportError:
-    _SEABORN_AVAILABLE = False
-    warnings.warn("Unable to load seaborn for Perm plotting")
-
+from . import _import_seaborn
 from .Perm import Perm
 from ..Perm import Perm as _ZBPerm
 from ..PermSet import PermSet as _ZBPermSet
@@ -133,7 +126,8 @@ class _PermClassOfLength:
             that appears in all the perms gets the maximum color value.
             Set the "xticklabels" kwarg as range(self.length) for a labelled x-axis.
         """
-        if not _SEABORN_AVAILABLE:
+        seaborn = _import_seaborn("PermClass")
+        if seaborn is None:
             return None
 
         # Compile the data
@@ -1,2 +1,27 @@
+"""Wrappers around the permuta classes for teaching and demonstration."""
+
+import warnings
+
+
+def _import_seaborn(name):
+    """Return the seaborn module, or None if it is unavailable.
+
+    It is slow to import and only needed for plotting, so this is done on
+    first use rather than with the module.
+
+    Args:
+        name: <str>
+            The name of the class plotting, for the warning given when
+            seaborn is unavailable.
+    """
+    try:
+        import seaborn
+    except ImportError:
+        warnings.warn("Unable to load seaborn for {} plotting".format(name))
+        return None
+    return seaborn
+
+
+# Defined first, as the modules below import it
 from .Perm import *
 from .PermClass import *
@@ -1,6 +1,5 @@
 # TODO: Module docstring
 
-from dis import dis
 from collections import Callable
 
 from .Descriptor import Descriptor
@@ -21,6 +20,7 @@ class Predicate(Descriptor):  # pylint: disable=too-few-public-methods
     def __eq__(self, other):
         if isinstance(other, self.__class__):
             # Disassemble predicates and see if code is the same
+            from dis import dis
             return dis(self.predicate) == dis(other.predicate)
         else:
             return False
@@ -1,10 +1,12 @@
 import abc
 
-ABC = abc.ABCMeta("ABC", (object,), {})
+ABC = abc.ABCMeta("ABC", (object,), {"__slots__": ()})
 
 
 class Flippable(ABC):
 
+    __slots__ = ()
+
     @abc.abstractmethod
     def flip_horizontal(self):
         """Return self flipped horizontally."""
@@ -1,10 +1,12 @@
 import abc
 
-ABC = abc.ABCMeta("ABC", (object,), {})
+ABC = abc.ABCMeta("ABC", (object,), {"__slots__": ()})
 
 
 class Patt(ABC):
 
+    __slots__ = ()
+
     def avoided_by(self, *perms):
         """Check if self is avoided by perms.
 
@@ -1,10 +1,12 @@
 import abc
 
-ABC = abc.ABCMeta("ABC", (object,), {})
+ABC = abc.ABCMeta("ABC", (object,), {"__slots__": ()})
 
 
 class Rotatable(ABC):
 
+    __slots__ = ()
+
     def rotate(self, times=1):
         """Return self rotated 90 degrees to the right."""
         return self._rotate(times)
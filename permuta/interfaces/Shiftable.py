@@ -1,10 +1,12 @@
 import abc
 
-ABC = abc.ABCMeta("ABC", (object,), {})
+ABC = abc.ABCMeta("ABC", (object,), {"__slots__": ()})
 
 
 class Shiftable(ABC):
 
+    __slots__ = ()
+
     @abc.abstractmethod
     def shift_right(self, times=1):
         """Return self shifted times steps to the right.
@@ -0,0 +1,738 @@
+"""Compact binary encodings and a chunked file format for perms.
+
+A perm file starts with a header recording the encoding, the length of the
+perms and their count, followed by chunks. Each chunk has a small header
+with the number of perms in it and the size of its payload, so files can be
+read one chunk at a time, either streamed or memory-mapped.
+
+Text dumps with one perm per line can be bulk loaded in parallel with
+load_text, or converted to a perm file with convert_text.
+
+The encodings are:
+    raw:
+        Elements as unsigned integers of the smallest sufficient width.
+    nibble:
+        Elements packed two per byte, for perms of length at most 16.
+    lehmer:
+        Lehmer codes bit-packed with each digit as wide as its maximum needs,
+        a fixed number of bytes per perm close to log2(n!) bits.
+    varint:
+        Lexicographic ranks (see permuta.Perm.rank) as LEB128 varints.
+"""
+
+import collections
+import concurrent.futures
+import itertools
+import mmap
+import os
+import struct
+
+import numpy as np
+
+from permuta import Perm
+from permuta._bulk import as_rows, dtype_for_length
+from permuta._bulk import lehmer_codes, from_lehmer_codes
+from permuta._bulk import rank, unrank, rank_dtype
+
+
+__all__ = [
+    "encode",
+    "decode",
+    "PermWriter",
+    "PermReader",
+    "write_perms",
+    "read_perms",
+    "iter_perms",
+    "MalformedLine",
+    "load_text",
+    "convert_text",
+    ]
+
+
+MAGIC = b"PRMT"
+VERSION = 1
+
+# Magic, version, encoding, reserved, perm length, perm count
+HEADER = struct.Struct("<4sBBHIQ")
+# Perm count, payload size in bytes
+CHUNK_HEADER = struct.Struct("<IQ")
+
+# The most perms a chunk can hold
+MAX_CHUNK_COUNT = (1 << 32) - 1
+
+# Count recorded in the header of a file whose writer could not seek back
+UNKNOWN_COUNT = (1 << 64) - 1
+
+ENCODINGS = ("raw", "nibble", "lehmer", "varint")
+
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+
+def default_encoding(length):
+    """Return the encoding used when none is given for perms of length."""
+    return "nibble" if length <= 16 else "lehmer"
+
+
+def _lehmer_widths(length):
+    """Return the number of bits used for each Lehmer code digit."""
+    return [(length - index - 1).bit_length() for index in range(length)]
+
+
+def record_size(encoding, length):
+    """Return the number of bytes per perm, or None for varint."""
+    if encoding == "raw":
+        return dtype_for_length(length).itemsize*length
+    elif encoding == "nibble":
+        return (length + 1)//2
+    elif encoding == "lehmer":
+        return (sum(_lehmer_widths(length)) + 7)//8
+    elif encoding == "varint":
+        return None
+    raise ValueError("Unknown encoding: {}".format(encoding))
+
+
+def encode(perms, encoding=None):
+    """Return the perms encoded as bytes.
+
+    Args:
+        perms: <numpy.ndarray> or <collections.Iterable>
+            A two dimensional array with one perm per row, or an iterable of
+            perms of the same length.
+        encoding: <str>
+            One of "raw", "nibble", "lehmer" and "varint". Defaults to
+            "nibble" for perms of length at most 16 and "lehmer" otherwise.
+
+    Raises:
+        ValueError:
+            Unknown encoding, or perms too long for the encoding.
+
+    Examples:
+        >>> data = encode([Perm((2, 0, 1)), Perm((0, 1, 2))], "nibble")
+        >>> data
+        b' \\x10\\x01 '
+        >>> decode(data, 3, 2, "nibble").tolist()
+        [[2, 0, 1], [0, 1, 2]]
+    """
+    rows = as_rows(perms)
+    count, length = rows.shape
+    if encoding is None:
+        encoding = default_encoding(length)
+    if encoding == "raw":
+        return rows.astype(dtype_for_length(length), copy=False).tobytes()
+    elif encoding == "nibble":
+        if length > 16:
+            raise ValueError("Nibble encoding requires length at most 16")
+        padded = np.zeros((count, 2*record_size(encoding, length)), dtype=np.uint8)
+        padded[:, :length] = rows
+        return (padded[:, 0::2] << 4 | padded[:, 1::2]).tobytes()
+    elif encoding == "lehmer":
+        codes = lehmer_codes(rows)
+        bits = [(codes[:, index, np.newaxis] >> np.arange(width - 1, -1, -1)) & 1
+                for index, width in enumerate(_lehmer_widths(length)) if width]
+        if not bits:
+            return b""
+        return np.packbits(np.hstack(bits).astype(np.uint8), axis=1).tobytes()
+    elif encoding == "varint":
+        return _encode_varints(rank(rows))
+    raise ValueError("Unknown encoding: {}".format(encoding))
+
+
+def decode(data, length, count, encoding=None):
+    """Return the perms encoded in data as a two dimensional array.
+
+    Args:
+        data: <bytes-like>
+            The output of encode.
+        length: <numbers.Integral>
+            The length of the perms.
+        count: <numbers.Integral>
+            The number of perms.
+        encoding: <str>
+            The encoding used, see encode.
+
+    Raises:
+        ValueError:
+            Unknown encoding, or data of the wrong size.
+    """
+    if encoding is None:
+        encoding = default_encoding(length)
+    size = record_size(encoding, length)
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    if size is not None and len(buffer) != size*count:
+        raise ValueError("Expected {} bytes of data".format(size*count))
+    if encoding == "raw":
+        return np.frombuffer(data, dtype=dtype_for_length(length)).reshape(count, length)
+    elif encoding == "nibble":
+        packed = buffer.reshape(count, size)
+        result = np.empty((count, 2*size), dtype=np.uint8)
+        result[:, 0::2] = packed >> 4
+        result[:, 1::2] = packed & 0xF
+        return result[:, :length]
+    elif encoding == "lehmer":
+        widths = _lehmer_widths(length)
+        bits = np.unpackbits(buffer.reshape(count, size), axis=1).astype(np.int64)
+        codes = np.zeros((count, length), dtype=np.int64)
+        offset = 0
+        for index, width in enumerate(widths):
+            for _ in range(width):
+                codes[:, index] = codes[:, index] << 1 | bits[:, offset]
+                offset += 1
+        return from_lehmer_codes(codes)
+    elif encoding == "varint":
+        numbers = _decode_varints(buffer, rank_dtype(length))
+        if len(numbers) != count:
+            raise ValueError("Expected {} varints".format(count))
+        return unrank(numbers, length)
+    raise ValueError("Unknown encoding: {}".format(encoding))
+
+
+def _encode_varints(numbers):
+    """Return the non-negative integers encoded as LEB128 varints."""
+    if numbers.dtype == object:
+        result = bytearray()
+        for number in numbers:
+            while number >= 0x80:
+                result.append(number & 0x7F | 0x80)
+                number >>= 7
+            result.append(number)
+        return bytes(result)
+    numbers = numbers.astype(np.uint64)
+    groups = np.arange(10, dtype=np.uint64)
+    septets = (numbers[:, np.newaxis] >> (7*groups)) & 0x7F
+    sizes = _septet_counts(numbers)
+    used = groups[np.newaxis, :] < sizes[:, np.newaxis]
+    more = groups[np.newaxis, :] < (sizes[:, np.newaxis] - 1)
+    septets = septets | (more.astype(np.uint64) << 7)
+    return septets[used].astype(np.uint8).tobytes()
+
+
+def _septet_counts(numbers):
+    """Return the number of 7 bit groups needed for each number."""
+    counts = np.ones(len(numbers), dtype=np.uint64)
+    remaining = numbers >> 7
+    while remaining.any():
+        counts += remaining != 0
+        remaining >>= 7
+    return counts
+
+
+def _decode_varints(buffer, dtype):
+    """Return the integers encoded as LEB128 varints in buffer."""
+    ends = np.flatnonzero(buffer < 0x80)
+    if dtype == object:
+        result = np.empty(len(ends), dtype=object)
+        start = 0
+        for index, end in enumerate(ends):
+            number = 0
+            for shift, byte in enumerate(buffer[start:end + 1].tolist()):
+                number |= (byte & 0x7F) << (7*shift)
+            result[index] = number
+            start = end + 1
+        return result
+    starts = np.concatenate(([0], ends[:-1] + 1)).astype(np.int64)
+    sizes = ends - starts + 1
+    result = np.zeros(len(ends), dtype=np.uint64)
+    for shift in range(int(sizes.max()) if len(sizes) else 0):
+        active = sizes > shift
+        septets = buffer[starts[active] + shift].astype(np.uint64) & 0x7F
+        result[active] |= septets << np.uint64(7*shift)
+    return result.astype(dtype)
+
+
+class PermWriter(object):
+    """Write perms of a single length to a perm file, chunk by chunk.
+
+    The header is written with the first chunk, at the current position of
+    a file object passed in. When the file is seekable the total count is
+    filled in on close.
+
+    Examples:
+        >>> import io
+        >>> from permuta import PermSet
+        >>> stream = io.BytesIO()
+        >>> with PermWriter(stream, length=3, close_file=False) as writer:
+        ...     writer.write(PermSet(3))
+        >>> _ = stream.seek(0)
+        >>> PermReader(stream).count
+        6
+    """
+
+    def __init__(self, file, length=None, encoding=None,
+                 chunk_size=DEFAULT_CHUNK_SIZE, close_file=True):
+        """Create a writer.
+
+        Args:
+            file: <str>, <os.PathLike> or <file object>
+                A path or a binary file object open for writing.
+            length: <numbers.Integral>
+                The length of the perms. If None, taken from the first perm.
+            encoding: <str>
+                See encode.
+            chunk_size: <numbers.Integral>
+                The maximum number of perms per chunk.
+            close_file: <bool>
+                Whether closing the writer closes a file object passed in.
+        """
+        if encoding is not None and encoding not in ENCODINGS:
+            raise ValueError("Unknown encoding: {}".format(encoding))
+        if isinstance(file, (str, os.PathLike)):
+            self._file = open(file, "wb")
+            self._close_file = True
+        else:
+            self._file = file
+            self._close_file = close_file
+        self.length = length
+        self.encoding = encoding
+        self.chunk_size = chunk_size
+        self.count = 0
+        self._header_position = None
+
+    def _write_header(self, count):
+        self._file.write(HEADER.pack(MAGIC, VERSION, ENCODINGS.index(self.encoding),
+                                     0, self.length, count))
+
+    def write_array(self, rows):
+        """Write a two dimensional array of perms as a single chunk.
+
+        Raises:
+            ValueError:
+                The perms are not of the length of the file, or more than
+                MAX_CHUNK_COUNT of them are given.
+        """
+        rows = as_rows(rows)
+        if self.length is None:
+            self.length = rows.shape[1]
+        if self.encoding is None:
+            self.encoding = default_encoding(self.length)
+        if self._header_position is None:
+            self._header_position = self._file.tell() if self._file.seekable() else -1
+            self._write_header(UNKNOWN_COUNT)
+        if not len(rows):
+            return
+        if rows.shape[1] != self.length:
+            raise ValueError("Perm length mismatch")
+        if len(rows) > MAX_CHUNK_COUNT:
+            raise ValueError("At most {} perms fit in a chunk".format(MAX_CHUNK_COUNT))
+        payload = encode(rows, self.encoding)
+        self._file.write(CHUNK_HEADER.pack(len(rows), len(payload)))
+        self._file.write(payload)
+        self.count += len(rows)
+
+    def write(self, perms):
+        """Write perms from any iterable, e.g., a PermSet or a PermStore."""
+        array = getattr(perms, "array", None)
+        if isinstance(array, np.ndarray):
+            for start in range(0, len(array), self.chunk_size):
+                self.write_array(array[start:start + self.chunk_size])
+            return
+        iterator = iter(perms)
+        while True:
+            chunk = list(itertools.islice(iterator, self.chunk_size))
+            if not chunk:
+                break
+            self.write_array(chunk)
+
+    def close(self):
+        """Finish the file, recording the count if possible."""
+        if self._header_position is None:
+            if self.length is None:
+                raise ValueError("Length of an empty perm file must be given")
+            self.write_array(np.empty((0, self.length), dtype=np.uint8))
+        if self._header_position >= 0:
+            end = self._file.tell()
+            self._file.seek(self._header_position)
+            self._write_header(self.count)
+            self._file.seek(end)
+        if self._close_file:
+            self._file.close()
+        else:
+            self._file.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class PermReader(object):
+    """Read a perm file chunk by chunk.
+
+    A file object is read from its current position, where the header must
+    start, so a perm file can follow other data in the same file.
+
+    Files can be memory-mapped, in which case the raw encoding yields
+    read-only views of the file without copying. Such views are only valid
+    while the reader is open.
+
+    Attributes:
+        length: <int>
+            The length of the perms in the file.
+        count: <int> or None
+            The number of perms in the file, None if not recorded.
+        encoding: <str>
+            The encoding of the file.
+    """
+
+    def __init__(self, file, use_mmap=False):
+        """Open a reader.
+
+        Args:
+            file: <str>, <os.PathLike> or <file object>
+                A path or a binary file object open for reading.
+            use_mmap: <bool>
+                Memory-map the file instead of reading it.
+
+        Raises:
+            ValueError:
+                Not a perm file, or one of an unknown version or encoding.
+        """
+        if isinstance(file, (str, os.PathLike)):
+            self._file = open(file, "rb")
+            self._close_file = True
+        else:
+            self._file = file
+            self._close_file = False
+        # Positions in the perm file are relative to its header
+        self._start = self._file.tell()
+        self._mmap = None
+        if use_mmap:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        header = self._read(0, HEADER.size)
+        magic, version, encoding, _, length, count = HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ValueError("Not a perm file")
+        if version != VERSION:
+            raise ValueError("Unsupported perm file version: {}".format(version))
+        if encoding >= len(ENCODINGS):
+            raise ValueError("Unknown perm file encoding: {}".format(encoding))
+        self.encoding = ENCODINGS[encoding]
+        self.length = length
+        self.count = None if count == UNKNOWN_COUNT else count
+
+    def _read(self, position, size):
+        # The map covers the whole file, data before the header included
+        position += self._start
+        if self._mmap is not None:
+            if position + size > len(self._mmap):
+                raise ValueError("Truncated perm file")
+            return memoryview(self._mmap)[position:position + size]
+        self._file.seek(position)
+        data = self._file.read(size)
+        if len(data) != size:
+            raise ValueError("Truncated perm file")
+        return data
+
+    def _end(self):
+        if self._mmap is not None:
+            return len(self._mmap) - self._start
+        return self._file.seek(0, 2) - self._start
+
+    def chunks(self):
+        """Yield the perms of the file as two dimensional arrays, one per
+        chunk."""
+        position = HEADER.size
+        end = self._end()
+        while position < end:
+            count, size = CHUNK_HEADER.unpack(self._read(position, CHUNK_HEADER.size))
+            position += CHUNK_HEADER.size
+            yield decode(self._read(position, size), self.length, count, self.encoding)
+            position += size
+
+    def read(self):
+        """Return all the perms of the file in a PermStore."""
+        from permuta import PermStore
+        chunks = list(self.chunks())
+        if not chunks:
+            return PermStore([], self.length)
+        return PermStore.from_array(np.concatenate(chunks))
+
+    def close(self):
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # Chunks handed out still view the map, it is released with them
+                pass
+            self._mmap = None
+        if self._close_file:
+            self._file.close()
+
+    def __iter__(self):
+        for chunk in self.chunks():
+            for row in chunk.tolist():
+                yield Perm(row)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def write_perms(path, perms, length=None, encoding=None,
+                chunk_size=DEFAULT_CHUNK_SIZE):
+    """Write perms of a single length to a perm file and return the count.
+
+    Examples:
+        >>> import os, tempfile
+        >>> from permuta import PermSet
+        >>> path = os.path.join(tempfile.mkdtemp(), "perms.bin")
+        >>> write_perms(path, PermSet(4), encoding="varint")
+        24
+        >>> read_perms(path)[5]
+        Perm((0, 3, 2, 1))
+    """
+    with PermWriter(path, length, encoding, chunk_size) as writer:
+        writer.write(perms)
+    return writer.count
+
+
+def read_perms(path, use_mmap=False):
+    """Return all the perms in a perm file in a PermStore."""
+    with PermReader(path, use_mmap) as reader:
+        return reader.read()
+
+
+def iter_perms(path, use_mmap=True):
+    """Yield the perms in a perm file one at a time, a chunk in memory at a
+    time."""
+    with PermReader(path, use_mmap) as reader:
+        for perm in reader:
+            yield perm
+
+
+#
+# Bulk loading of text dumps
+#
+
+MalformedLine = collections.namedtuple("MalformedLine", ["line_number", "text", "reason"])
+
+DEFAULT_TEXT_CHUNK_SIZE = 1 << 24
+
+# Characters allowed to separate elements, e.g. "0 2 1", "[0, 2, 1]"
+_SEPARATORS = b" \t\r,()[]"
+_TO_SPACES = bytes.maketrans(_SEPARATORS, b" "*len(_SEPARATORS))
+_ALLOWED = _SEPARATORS + b"0123456789"
+
+
+def _split_text_ranges(path, chunk_size):
+    """Return (start, end) byte ranges of path that end on line boundaries."""
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+    ranges = []
+    with open(path, "rb") as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            start = 0
+            while start < size:
+                end = mapped.find(b"\n", min(start + chunk_size, size) - 1)
+                end = size if end == -1 else end + 1
+                ranges.append((start, end))
+                start = end
+    return ranges
+
+
+def _parse_text_range(task):
+    """Parse the lines in a byte range of a text dump.
+
+    Returns the number of lines, a dict mapping each perm length to the
+    chunk relative line indices and rows of the valid perms of that length,
+    and a list of (line index, text, reason) for the malformed lines.
+    """
+    path, start, end, one_based, digits = task
+    with open(path, "rb") as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            data = mapped[start:end]
+    lines = data.split(b"\n")
+    if lines and not lines[-1]:
+        lines.pop()
+    errors = []
+    # Tokenize, grouping lines by the number of elements
+    groups = collections.defaultdict(lambda: ([], []))
+    for index, line in enumerate(lines):
+        stripped = line.strip()
+        if not stripped:
+            continue
+        if digits:
+            if not stripped.isdigit():
+                errors.append((index, line, "unexpected character"))
+                continue
+            indices, tokens = groups[len(stripped)]
+            indices.append(index)
+            tokens.append(stripped)
+        else:
+            if stripped.translate(None, _ALLOWED):
+                errors.append((index, line, "unexpected character"))
+                continue
+            elements = stripped.translate(_TO_SPACES).split()
+            if any(len(element) > 18 for element in elements):
+                errors.append((index, line, "element out of range"))
+                continue
+            indices, tokens = groups[len(elements)]
+            indices.append(index)
+            tokens.extend(elements)
+    result = {}
+    for length, (indices, tokens) in groups.items():
+        indices = np.array(indices, dtype=np.int64)
+        if digits:
+            rows = (np.frombuffer(b"".join(tokens), dtype=np.uint8)
+                    .reshape(len(indices), length).astype(np.int64) - ord("0"))
+        elif length:
+            rows = np.array(tokens).astype(np.int64).reshape(len(indices), length)
+        else:
+            rows = np.empty((len(indices), 0), dtype=np.int64)
+        if one_based:
+            rows -= 1
+        # A row is a perm if and only if sorting it gives the identity
+        valid = (np.sort(rows, axis=1) == np.arange(length)).all(axis=1)
+        for index in indices[~valid].tolist():
+            errors.append((index, lines[index], "not a perm"))
+        if valid.any():
+            result[length] = (indices[valid], rows[valid].astype(dtype_for_length(length)))
+    errors.sort()
+    return len(lines), result, errors
+
+
+def _bounded_map(executor, function, tasks, window):
+    """Yield function applied to each task in order, with at most window
+    tasks submitted to executor and not yet consumed at any time.
+
+    Unlike executor.map, which submits every task up front, this keeps the
+    results waiting to be consumed, and so the memory used, bounded.
+    """
+    pending = collections.deque()
+    tasks = iter(tasks)
+    for task in itertools.islice(tasks, window):
+        pending.append(executor.submit(function, task))
+    while pending:
+        result = pending.popleft().result()
+        for task in itertools.islice(tasks, 1):
+            pending.append(executor.submit(function, task))
+        yield result
+
+
+def _parse_text(path, length, one_based, digits, processes, chunk_size):
+    """Yield the rows of valid perms and the malformed lines of each chunk of
+    a text dump, in file order."""
+    tasks = [(path, start, end, one_based, digits)
+             for start, end in _split_text_ranges(path, chunk_size)]
+    if processes == 1 or len(tasks) <= 1:
+        results = map(_parse_text_range, tasks)
+        executor = None
+    else:
+        processes = processes or os.cpu_count() or 1
+        executor = concurrent.futures.ProcessPoolExecutor(processes)
+        # Keep the workers busy without parsing far ahead of the consumer
+        results = _bounded_map(executor, _parse_text_range, tasks, 2*processes)
+    file = open(path, "rb")
+    try:
+        offset = 0
+        for task, (line_count, groups, errors) in zip(tasks, results):
+            errors = [MalformedLine(offset + index + 1, text.decode(errors="replace"), reason)
+                      for index, text, reason in errors]
+            if length is None and groups:
+                # The length of the first valid perm in the file
+                length = min(groups, key=lambda key: groups[key][0][0])
+            rows = None
+            lines = None
+            for group_length, (indices, group_rows) in groups.items():
+                if group_length == length:
+                    rows = group_rows
+                    continue
+                if lines is None:
+                    # Perms of the wrong length are rare, reread their text
+                    _, start, end, _, _ = task
+                    file.seek(start)
+                    lines = file.read(end - start).split(b"\n")
+                for index in indices.tolist():
+                    text = lines[index].decode(errors="replace")
+                    reason = "length is not {}".format(length)
+                    errors.append(MalformedLine(offset + index + 1, text, reason))
+            errors.sort(key=lambda error: error.line_number)
+            offset += line_count
+            yield length, rows, errors
+    finally:
+        file.close()
+        if executor is not None:
+            executor.shutdown()
+
+
+def load_text(path, length=None, one_based=False, digits=False, processes=None,
+              chunk_size=DEFAULT_TEXT_CHUNK_SIZE):
+    """Load a text dump with one perm per line.
+
+    The file is memory-mapped, split into chunks on line boundaries and the
+    chunks are parsed and validated in a process pool. Malformed lines are
+    reported rather than stopping the load.
+
+    Args:
+        path: <str>
+            The path of the text file.
+        length: <numbers.Integral>
+            The length of the perms. If None, the length of the first valid
+            perm; perms of other lengths are reported as malformed.
+        one_based: <bool>
+            Whether the elements are 1, ..., n rather than 0, ..., n-1.
+        digits: <bool>
+            Whether each line is a digit string such as "2013", rather than
+            elements separated by whitespace, commas, parentheses or brackets.
+        processes: <numbers.Integral>
+            The number of worker processes, defaults to the number of CPUs.
+        chunk_size: <numbers.Integral>
+            The approximate number of bytes parsed per task.
+
+    Returns: (<permuta.PermStore>, <list> of <permuta.io.MalformedLine>)
+        The perms and the malformed lines, with 1-based line numbers.
+
+    Examples:
+        >>> import os, tempfile
+        >>> path = os.path.join(tempfile.mkdtemp(), "perms.txt")
+        >>> with open(path, "w") as file:
+        ...     _ = file.write("3 1 2\\n1 1 2\\n[2, 3, 1]\\n")
+        >>> perms, errors = load_text(path, one_based=True, processes=1)
+        >>> list(perms)
+        [Perm((2, 0, 1)), Perm((1, 2, 0))]
+        >>> errors
+        [MalformedLine(line_number=2, text='1 1 2', reason='not a perm')]
+    """
+    chunks = []
+    errors = []
+    for length, rows, chunk_errors in _parse_text(path, length, one_based, digits,
+                                                  processes, chunk_size):
+        if rows is not None:
+            chunks.append(rows)
+        errors.extend(chunk_errors)
+    from permuta import PermStore
+    if not chunks:
+        return PermStore([], length or 0), errors
+    return PermStore.from_array(np.concatenate(chunks)), errors
+
+
+def convert_text(path, output, length=None, one_based=False, digits=False,
+                 encoding=None, processes=None, chunk_size=DEFAULT_TEXT_CHUNK_SIZE):
+    """Convert a text dump with one perm per line to a perm file.
+
+    The text is parsed as in load_text and each chunk is written to the perm
+    file as soon as it is parsed, so the perms are never all in memory.
+
+    Args:
+        output: <str> or <file object>
+            Where to write the perm file, see PermWriter.
+        encoding: <str>
+            The encoding of the perm file, see encode.
+
+    Returns: (<int>, <list> of <permuta.io.MalformedLine>)
+        The number of perms written and the malformed lines.
+    """
+    errors = []
+    writer = PermWriter(output, length, encoding)
+    with writer:
+        for length, rows, chunk_errors in _parse_text(path, length, one_based, digits,
+                                                      processes, chunk_size):
+            if rows is not None:
+                writer.write_array(rows)
+            errors.extend(chunk_errors)
+        if writer.length is None:
+            writer.length = length or 0
+    return writer.count, errors
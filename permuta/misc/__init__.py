@@ -4,6 +4,9 @@ from .algorithm_x import AlgorithmX
 from .counting import factorial, binomial, catalan
 from .dancing_links import DancingLinks
 from .exact_cover import exact_cover, exact_cover_smallest
+from .fenwick_tree import FenwickTree
+from .intern_pool import InternPool
+from .lru_cache import LRUCache
 from .iterable_floor_and_ceiling import left_floor_and_ceiling, right_floor_and_ceiling
 from .misc import flatten, binary_search, choose, subsets
 from .ordered_set_partitions import ordered_set_partitions
@@ -0,0 +1,62 @@
+class FenwickTree(object):
+    """A binary indexed tree over the indices 0, ..., size - 1.
+
+    Supports adding to a single index and summing a prefix in O(log n) time.
+    When all values are 0 or 1 it doubles as an order-statistic structure:
+    find(k) is the index of the k-th (0-based) index with value 1.
+
+    Examples:
+        >>> tree = FenwickTree(5, fill=1)
+        >>> tree.prefix_sum(3)
+        3
+        >>> tree.add(1, -1)
+        >>> tree.prefix_sum(3)
+        2
+        >>> tree.find(1)
+        2
+    """
+
+    def __init__(self, size, fill=0):
+        """Create a tree of size indices, each holding the value fill."""
+        self.size = size
+        # tree[i] holds the sum of the lowbit(i) values ending at index i - 1
+        self.tree = [fill*(i & -i) for i in range(size + 1)]
+        self.step = 1 << (size.bit_length() - 1) if size else 0
+
+    def add(self, index, delta=1):
+        """Add delta to the value at index."""
+        tree = self.tree
+        size = self.size
+        index += 1
+        while index <= size:
+            tree[index] += delta
+            index += index & -index
+
+    def prefix_sum(self, stop):
+        """Return the sum of the values at the indices less than stop."""
+        tree = self.tree
+        result = 0
+        while stop > 0:
+            result += tree[stop]
+            stop -= stop & -stop
+        return result
+
+    def find(self, k):
+        """Return the smallest index whose prefix sum (inclusive) exceeds k.
+
+        The values must all be non-negative.
+        """
+        tree = self.tree
+        size = self.size
+        position = 0
+        step = self.step
+        while step:
+            next_position = position + step
+            if next_position <= size and tree[next_position] <= k:
+                position = next_position
+                k -= tree[position]
+            step >>= 1
+        return position
+
+    def __len__(self):
+        return self.size
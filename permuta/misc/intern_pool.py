@@ -0,0 +1,53 @@
+import sys
+
+
+class _Unreferenced(object):
+    """Placeholder object referenced only by the pool during a collection."""
+    pass
+
+
+class InternPool(object):
+    """A pool of canonical instances of hashable values.
+
+    Interning a value returns the first instance of an equal value that was
+    added to the pool, so equal values share a single object. Containers such
+    as sets and dicts compare keys by identity before equality, so lookups of
+    interned values short-circuit.
+
+    Objects that cannot be weakly referenced, such as tuple subclasses, are
+    held strongly; collect drops the ones nothing else refers to.
+    """
+
+    def __init__(self):
+        self._pool = {}
+
+    def intern(self, obj):
+        """Return the canonical instance of the value of obj."""
+        return self._pool.setdefault(obj, obj)
+
+    def collect(self):
+        """Remove objects only referenced by the pool and return how many."""
+        # Calibrate the reference count of an object referenced only by the
+        # pool, since it depends on the interpreter version
+        sentinel = _Unreferenced()
+        self._pool[sentinel] = sentinel
+        del sentinel
+        candidates = list(self._pool)
+        counts = [sys.getrefcount(obj) for obj in candidates]
+        threshold = counts[-1]  # The sentinel was inserted last
+        removed = 0
+        for obj, count in zip(candidates, counts):
+            if count <= threshold:
+                del self._pool[obj]
+                removed += 1
+        return removed - 1  # Do not count the sentinel
+
+    def clear(self):
+        """Remove all objects from the pool."""
+        self._pool.clear()
+
+    def __contains__(self, obj):
+        return obj in self._pool
+
+    def __len__(self):
+        return len(self._pool)
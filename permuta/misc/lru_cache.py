@@ -0,0 +1,94 @@
+import collections
+
+
+CacheInfo = collections.namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+
+class LRUCache(object):
+    """A cache of the values of a function of hashable keys, dropping the
+    least recently used entries once more than maxsize are held.
+
+    Unlike functools.lru_cache, the size can be changed after creation, and
+    the entries of equal keys are shared no matter which instances they are
+    looked up with.
+
+    Examples:
+        >>> cache = LRUCache(len, maxsize=2)
+        >>> cache.get("ab"), cache.get("abc"), cache.get("ab")
+        (2, 3, 2)
+        >>> cache.info()
+        CacheInfo(hits=1, misses=2, maxsize=2, currsize=2)
+    """
+
+    def __init__(self, function, maxsize=128):
+        """Cache the values of function; maxsize None means no bound.
+
+        The function may be None for a cache only filled with put and read
+        with peek.
+        """
+        self._function = function
+        self._entries = collections.OrderedDict()
+        self._maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Return the value of the function at key."""
+        entries = self._entries
+        try:
+            value = entries[key]
+        except KeyError:
+            self.misses += 1
+            value = entries[key] = self._function(key)
+            self._evict()
+        else:
+            self.hits += 1
+            entries.move_to_end(key)
+        return value
+
+    def peek(self, key, default=None):
+        """Return the value at key if it is cached and default otherwise,
+        without computing it; counted as a hit or a miss like get."""
+        entries = self._entries
+        try:
+            value = entries[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self.hits += 1
+        entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        """Store value as the value of the function at key, e.g., when it
+        was computed along with others."""
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        self._evict()
+
+    def resize(self, maxsize):
+        """Change the largest number of entries held, dropping the least
+        recently used ones if there are too many."""
+        self._maxsize = maxsize
+        self._evict()
+
+    def _evict(self):
+        if self._maxsize is not None:
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+
+    def info(self):
+        """Return the hits, misses, maximum size and current size."""
+        return CacheInfo(self.hits, self.misses, self._maxsize, len(self._entries))
+
+    def clear(self):
+        """Remove all entries and reset the counters."""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
@@ -2,3 +2,7 @@ from .symmetry import *
 from .polynomial import is_polynomial, is_non_polynomial
 from .insertion_encodable import is_insertion_encodable_rightmost, is_insertion_encodable_maximum, is_insertion_encodable
 from .finite import is_finite
+from .statistics import distribution, distributions, joint_distribution
+from .statistics import clear_distribution_cache
+from .equidistribution import fingerprints, equidistribution_groups
+from .equidistribution import equidistributed_classes, equidistributed_statistics
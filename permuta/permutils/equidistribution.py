@@ -0,0 +1,225 @@
+"""Find equidistributed statistics and perm classes."""
+
+import collections
+import concurrent.futures
+import hashlib
+import json
+import os
+
+from .statistics import _basis_of, distributions
+
+
+__all__ = [
+    "fingerprints",
+    "equidistribution_groups",
+    "equidistributed_classes",
+    "equidistributed_statistics",
+]
+
+
+CACHE_FORMAT_VERSION = 1
+
+
+def _statistic_key(statistic):
+    """Return the name under which fingerprints of statistic are stored on
+    disk.
+
+    Raises:
+        ValueError: If statistic cannot be imported by its name, like a
+            lambda or a nested function, so its name does not tell it apart
+            from other callables.
+    """
+    if isinstance(statistic, str):
+        return statistic
+    qualname = getattr(statistic, "__qualname__", None)
+    if qualname is None or "<lambda>" in qualname or "<locals>" in qualname:
+        message = "Statistic {!r} cannot be cached on disk by name".format(statistic)
+        raise ValueError(message)
+    return "{}.{}".format(statistic.__module__, qualname)
+
+
+def _basis_key(basis):
+    return json.dumps([list(perm) for perm in basis])
+
+
+def _json_value(value):
+    """Return value as stored in the cache, so that fingerprints compare the
+    same whether or not they were read from disk."""
+    if isinstance(value, bool):
+        return int(value)
+    return json.loads(json.dumps(value))
+
+
+def _load_cache(path):
+    """Return the stored fingerprints: basis key -> statistic key -> length
+    -> list of [value, count] pairs."""
+    if path is None or not os.path.exists(path):
+        return {}
+    with open(path) as file:
+        data = json.load(file)
+    if data.get("version") != CACHE_FORMAT_VERSION:
+        return {}
+    return data["fingerprints"]
+
+
+def _save_cache(path, cache):
+    # Write to a temporary file first so a crash cannot corrupt the cache
+    temporary_path = "{}.{}.tmp".format(path, os.getpid())
+    with open(temporary_path, "w") as file:
+        json.dump({"version": CACHE_FORMAT_VERSION, "fingerprints": cache}, file)
+    os.replace(temporary_path, path)
+
+
+def _compute(task):
+    """Return the distributions of the statistics of a class as lists of
+    [value, count] pairs, in the order of the statistics."""
+    basis, lengths, statistics, processes = task
+    result = distributions(basis, lengths, *statistics, processes=processes)
+    return [{str(length): sorted([_json_value(value), count]
+                                 for value, count in counter.items())
+             for length, counter in result[statistic].items()}
+            for statistic in statistics]
+
+
+def fingerprints(pairs, max_length, cache_path=None, processes=None):
+    """Return the fingerprint of each pair of a perm class and a statistic.
+
+    The fingerprint is the distribution polynomial of the statistic over the
+    perms of the class of each length up to max_length, as the sorted pairs
+    of values and counts. All the statistics of a class are computed in one
+    traversal, and different classes are computed in parallel.
+
+    Args:
+        pairs: <collections.Iterable> of <tuple>
+            Pairs of a perm class, as accepted by
+            permuta.permutils.distribution, and a statistic.
+        max_length: <numbers.Integral>
+            The largest length of the perms.
+        cache_path: <str>
+            A JSON file keeping the fingerprints between runs. Only the
+            lengths missing from it are computed. The statistics must then
+            be names of perm methods or functions importable by name.
+        processes: <numbers.Integral>
+            The number of worker processes, defaults to the number of CPUs.
+
+    Returns: <list> of <tuple>
+        The fingerprint of each pair, for the lengths 0, ..., max_length.
+
+    Raises:
+        ValueError: If cache_path is given and a statistic cannot be
+            imported by name.
+    """
+    pairs = [(_basis_of(perm_class), statistic) for perm_class, statistic in pairs]
+    cache = _load_cache(cache_path)
+    # (basis, statistic) -> length -> [value, count] pairs, keyed by the
+    # statistic itself so that callables with the same name stay apart
+    known = {}
+    for basis, statistic in pairs:
+        if (basis, statistic) not in known:
+            stored = {}
+            if cache_path is not None:
+                stored = cache.get(_basis_key(basis), {}).get(_statistic_key(statistic), {})
+            known[basis, statistic] = dict(stored)
+    lengths = range(max_length + 1)
+    # Group the missing lengths of each class together
+    missing = collections.OrderedDict()
+    for basis, statistic in pairs:
+        stored = known[basis, statistic]
+        missing_lengths = [length for length in lengths if str(length) not in stored]
+        if missing_lengths:
+            task_lengths, task_statistics = missing.setdefault(basis, (set(), []))
+            task_lengths.update(missing_lengths)
+            if statistic not in task_statistics:
+                task_statistics.append(statistic)
+    if len(missing) == 1:
+        tasks = [(basis, sorted(task_lengths), task_statistics, processes)
+                 for basis, (task_lengths, task_statistics) in missing.items()]
+    else:
+        tasks = [(basis, sorted(task_lengths), task_statistics, 1)
+                 for basis, (task_lengths, task_statistics) in missing.items()]
+    if processes == 1 or len(tasks) <= 1:
+        results = map(_compute, tasks)
+        executor = None
+    else:
+        executor = concurrent.futures.ProcessPoolExecutor(processes)
+        results = executor.map(_compute, tasks)
+    try:
+        for (basis, _, statistics, _), result in zip(tasks, results):
+            for statistic, by_length in zip(statistics, result):
+                known[basis, statistic].update(by_length)
+                if cache_path is not None:
+                    cache.setdefault(_basis_key(basis), {}) \
+                        .setdefault(_statistic_key(statistic), {}).update(by_length)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    if tasks and cache_path is not None:
+        _save_cache(cache_path, cache)
+    result = []
+    for basis, statistic in pairs:
+        stored = known[basis, statistic]
+        result.append(tuple(tuple(tuple(item) for item in stored[str(length)])
+                            for length in lengths))
+    return result
+
+
+def _digest(fingerprint):
+    return hashlib.sha256(json.dumps(fingerprint).encode()).hexdigest()
+
+
+def equidistribution_groups(pairs, max_length, cache_path=None, processes=None):
+    """Group pairs of a perm class and a statistic by their fingerprints.
+
+    See fingerprints for the arguments.
+
+    Returns: <list> of <list> of <tuple>
+        The groups of pairs whose statistics are equidistributed on their
+        classes for the lengths up to max_length, in order of first
+        appearance. Pairs without an equal are in groups of their own.
+
+    Examples:
+        >>> from permuta import Perm, PermSet
+        >>> av_120 = PermSet.avoiding([Perm((1, 2, 0))])
+        >>> av_201 = PermSet.avoiding([Perm((2, 0, 1))])
+        >>> av_012 = PermSet.avoiding([Perm((0, 1, 2))])
+        >>> groups = equidistribution_groups(
+        ...     [(av_120, "count_inversions"), (av_201, "count_inversions"),
+        ...      (av_012, "count_inversions")], 6, processes=1)
+        >>> [len(group) for group in groups]
+        [2, 1]
+    """
+    pairs = list(pairs)
+    groups = collections.OrderedDict()
+    for pair, fingerprint in zip(pairs, fingerprints(pairs, max_length, cache_path,
+                                                     processes)):
+        groups.setdefault(_digest(fingerprint), []).append(pair)
+    return list(groups.values())
+
+
+def equidistributed_classes(perm_classes, statistic, max_length, cache_path=None,
+                            processes=None):
+    """Group perm classes on which statistic has the same distribution.
+
+    See equidistribution_groups.
+    """
+    pairs = [(perm_class, statistic) for perm_class in perm_classes]
+    groups = equidistribution_groups(pairs, max_length, cache_path, processes)
+    return [[perm_class for perm_class, _ in group] for group in groups]
+
+
+def equidistributed_statistics(perm_class, statistics, max_length, cache_path=None,
+                               processes=None):
+    """Group statistics that have the same distribution on perm_class.
+
+    See equidistribution_groups.
+
+    Examples:
+        >>> from permuta import Perm, PermSet
+        >>> av = PermSet.avoiding([Perm((0, 2, 1))])
+        >>> equidistributed_statistics(av, ["count_descents", "count_ascents",
+        ...     "count_peaks", "count_inversions"], 6, processes=1)
+        [['count_descents', 'count_ascents'], ['count_peaks'], ['count_inversions']]
+    """
+    pairs = [(perm_class, statistic) for statistic in statistics]
+    groups = equidistribution_groups(pairs, max_length, cache_path, processes)
+    return [[statistic for _, statistic in group] for group in groups]
@@ -0,0 +1,273 @@
+"""Distributions of perm statistics over perm classes."""
+
+import collections
+import concurrent.futures
+import numbers
+import os
+
+from permuta import Perm
+from permuta.descriptors import Basis
+from permuta.misc import LRUCache
+from permuta._perm_set.unbounded.all import PermSetAll
+
+
+__all__ = [
+    "distribution",
+    "distributions",
+    "joint_distribution",
+    "clear_distribution_cache",
+]
+
+
+# The number of distributions cached, each keyed by a basis, a length and the
+# statistics, which may be callables that the cache then keeps alive
+_DISTRIBUTION_CACHE_SIZE = 1024
+
+# The subtrees of the generating tree handed out per worker process
+_SUBTREES_PER_WORKER = 16
+
+
+def _basis_of(perm_class):
+    """Return the basis of a perm class given as a perm set, a basis or an
+    iterable of perms."""
+    if isinstance(perm_class, Basis):
+        return perm_class
+    if isinstance(perm_class, PermSetAll):
+        return Basis(())
+    basis = getattr(perm_class, "basis", None)
+    if basis is not None:
+        return Basis(basis)
+    return Basis(perm_class)
+
+
+def _lengths_of(lengths):
+    """Return the lengths given as a single length or an iterable."""
+    if isinstance(lengths, numbers.Integral):
+        lengths = [lengths]
+    lengths = sorted(set(lengths))
+    if any(length < 0 for length in lengths):
+        raise ValueError("Lengths must be non-negative")
+    return lengths
+
+
+def _statistic_function(statistic):
+    """Return the function computing statistic, the name of a Perm method
+    or a callable taking a perm."""
+    if isinstance(statistic, str):
+        function = getattr(Perm, statistic, None)
+        if function is None:
+            raise ValueError("Perm has no statistic {!r}".format(statistic))
+        return function
+    if callable(statistic):
+        return statistic
+    raise TypeError("'{}' object is not a statistic".format(repr(statistic)))
+
+
+def _children(perm, basis):
+    """Yield the perms of the class acquired by inserting a new maximum.
+
+    Removing the maximum of a perm in a class gives a perm in the class, so
+    every perm of the class has exactly one parent and is yielded once.
+    """
+    for index in range(len(perm) + 1):
+        child = perm.insert(index)
+        if child.avoids(*basis):
+            yield child
+
+
+def _tally(counts, perms, groups):
+    for perm in perms:
+        counters = counts.get(len(perm))
+        if counters is not None:
+            for counter, functions in zip(counters, groups):
+                counter[tuple(function(perm) for function in functions)] += 1
+
+
+def _count_subtrees(task):
+    """Count the statistic values of the perms in the subtrees below roots.
+
+    The subtrees are traversed depth-first, so only a path of the
+    generating tree is held in memory at a time.
+    """
+    roots, basis, lengths, groups = task
+    groups = [[_statistic_function(statistic) for statistic in group] for group in groups]
+    max_length = lengths[-1]
+    counts = {length: [collections.Counter() for _ in groups] for length in lengths}
+    stack = list(roots)
+    while stack:
+        perm = stack.pop()
+        _tally(counts, (perm,), groups)
+        if len(perm) < max_length:
+            stack.extend(_children(perm, basis))
+    return counts
+
+
+def _count(basis, lengths, groups, processes):
+    """Return, for each length, the joint distribution of each group of
+    statistics over the perms of the class with that length."""
+    functions = [[_statistic_function(statistic) for statistic in group] for group in groups]
+    counts = {length: [collections.Counter() for _ in groups] for length in lengths}
+    if not Perm().avoids(*basis):
+        return counts
+    workers = processes or os.cpu_count() or 1
+    # Count the top of the generating tree here until it fans out enough to
+    # share its subtrees among the workers
+    frontier = [Perm()]
+    while frontier and 1 < workers and len(frontier) < _SUBTREES_PER_WORKER*workers \
+            and len(frontier[0]) < lengths[-1]:
+        _tally(counts, frontier, functions)
+        frontier = [child for perm in frontier for child in _children(perm, basis)]
+    lengths = [length for length in lengths if frontier and len(frontier[0]) <= length]
+    if not lengths:
+        return counts
+    task_count = min(len(frontier), _SUBTREES_PER_WORKER*workers) if workers > 1 else 1
+    tasks = [(frontier[start::task_count], basis, lengths, groups)
+             for start in range(task_count)]
+    if workers == 1 or len(tasks) <= 1:
+        results = map(_count_subtrees, tasks)
+        executor = None
+    else:
+        executor = concurrent.futures.ProcessPoolExecutor(processes)
+        results = executor.map(_count_subtrees, tasks)
+    try:
+        for result in results:
+            for length, counters in result.items():
+                for total, counter in zip(counts[length], counters):
+                    total.update(counter)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return counts
+
+
+# (basis, length, statistics) -> Counter of the tuples of statistic values,
+# filled in batches as they are computed in a single traversal
+_DISTRIBUTION_CACHE = LRUCache(None, maxsize=_DISTRIBUTION_CACHE_SIZE)
+
+
+def _cached_counts(basis, lengths, groups, processes):
+    """Return the joint distribution of each group of statistics for each
+    length, computing the ones not in the cache in a single traversal."""
+    for group in groups:
+        for statistic in group:
+            _statistic_function(statistic)
+    # Look the distributions up once, as they may be evicted while the
+    # missing ones are stored
+    found = {}
+    for group in groups:
+        for length in lengths:
+            counter = _DISTRIBUTION_CACHE.peek((basis, length, group))
+            if counter is not None:
+                found[length, group] = counter
+    missing_groups = sorted(set(group for group in groups for length in lengths
+                                if (length, group) not in found),
+                            key=groups.index)
+    if missing_groups:
+        missing_lengths = [length for length in lengths
+                           if any((length, group) not in found
+                                  for group in missing_groups)]
+        counts = _count(basis, missing_lengths, missing_groups, processes)
+        for length, counters in counts.items():
+            for group, counter in zip(missing_groups, counters):
+                found.setdefault((length, group), counter)
+                _DISTRIBUTION_CACHE.put((basis, length, group), counter)
+                if len(group) == 1:
+                    continue
+                # The marginals come for free
+                for index, statistic in enumerate(group):
+                    if (basis, length, (statistic,)) in _DISTRIBUTION_CACHE:
+                        continue
+                    marginal = collections.Counter()
+                    for values, count in counter.items():
+                        marginal[values[index],] += count
+                    _DISTRIBUTION_CACHE.put((basis, length, (statistic,)), marginal)
+    return {length: [collections.Counter(found[length, group]) for group in groups]
+            for length in lengths}
+
+
+def joint_distribution(perm_class, lengths, *statistics, processes=None):
+    """Return the joint distribution of statistics over the perms of a class.
+
+    The perms of each length are generated on the fly rather than stored,
+    the work is shared among processes and the most recently used results
+    are cached for each basis, length and statistics.
+
+    Args:
+        perm_class: <permuta.PermSet> or <permuta.descriptors.Basis>
+            An avoidance class, all perms, or the basis of a class.
+        lengths: <numbers.Integral> or <collections.Iterable>
+            The length, or lengths, of the perms.
+        statistics: <str> or <collections.Callable>
+            Names of Perm methods, e.g., "count_inversions", or functions
+            taking a perm. Functions must be picklable to be used by more
+            than one process.
+        processes: <numbers.Integral>
+            The number of worker processes, defaults to the number of CPUs.
+
+    Returns: <dict> of <collections.Counter>
+        For each length, the number of perms with each tuple of values.
+
+    Examples:
+        >>> from permuta import Perm, PermSet
+        >>> av = PermSet.avoiding([Perm((0, 2, 1))])
+        >>> table = joint_distribution(av, 3, "count_descents", "count_fixed_points",
+        ...                            processes=1)
+        >>> sorted(table[3].items())
+        [((0, 3), 1), ((1, 0), 2), ((1, 1), 1), ((2, 1), 1)]
+    """
+    if not statistics:
+        raise ValueError("At least one statistic must be given")
+    counts = _cached_counts(_basis_of(perm_class), _lengths_of(lengths),
+                            (statistics,), processes)
+    return {length: counters[0] for length, counters in counts.items()}
+
+
+def distribution(perm_class, lengths, statistic, processes=None):
+    """Return the distribution of a statistic over the perms of a class.
+
+    See joint_distribution for the arguments.
+
+    Returns: <dict> of <collections.Counter>
+        For each length, the number of perms with each value.
+
+    Examples:
+        >>> from permuta import Perm, PermSet
+        >>> av = PermSet.avoiding([Perm((0, 1, 2))])
+        >>> histograms = distribution(av, range(5), "count_inversions", processes=1)
+        >>> sorted(histograms[4].items())
+        [(2, 1), (3, 4), (4, 5), (5, 3), (6, 1)]
+    """
+    return distributions(perm_class, lengths, statistic, processes=processes)[statistic]
+
+
+def distributions(perm_class, lengths, *statistics, processes=None):
+    """Return the distributions of several statistics over the perms of a
+    class, each computed on its own but all in a single traversal.
+
+    See joint_distribution for the arguments.
+
+    Returns: <dict> of <dict> of <collections.Counter>
+        For each statistic and length, the number of perms with each value.
+
+    Examples:
+        >>> from permuta import Perm, PermSet
+        >>> av = PermSet.avoiding([Perm((1, 0))])
+        >>> distributions(av, 3, "count_descents", "count_bonds", processes=1)
+        {'count_descents': {3: Counter({0: 1})}, 'count_bonds': {3: Counter({2: 1})}}
+    """
+    if not statistics:
+        raise ValueError("At least one statistic must be given")
+    groups = tuple((statistic,) for statistic in statistics)
+    counts = _cached_counts(_basis_of(perm_class), _lengths_of(lengths), groups, processes)
+    result = {}
+    for index, statistic in enumerate(statistics):
+        result[statistic] = {
+            length: collections.Counter({values[0]: count
+                                         for values, count in counters[index].items()})
+            for length, counters in counts.items()}
+    return result
+
+
+def clear_distribution_cache():
+    """Forget all the distributions computed."""
+    _DISTRIBUTION_CACHE.clear()
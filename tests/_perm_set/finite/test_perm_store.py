@@ -0,0 +1,60 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from permuta import Perm, PermSet, PermStore
+
+
+def test_dtype():
+    assert PermStore([Perm.random(5)]).array.dtype == np.uint8
+    assert PermStore([Perm.random(300)]).array.dtype == np.uint16
+    assert PermStore([], 70000).array.dtype == np.uint32
+
+
+def test_init():
+    perms = list(PermSet(4))
+    store = PermStore(perms)
+    assert len(store) == 24
+    assert store.length == 4
+    assert list(store) == perms
+    assert len(PermStore([], 3)) == 0
+    with pytest.raises(ValueError): PermStore([])
+    with pytest.raises(ValueError): PermStore([Perm((0, 1)), Perm((0,))])
+
+
+def test_contains():
+    for length in range(6):
+        perms = list(PermSet(length))
+        store = PermStore(perms[::2], length)
+        for index, perm in enumerate(perms):
+            assert (perm in store) == (index % 2 == 0)
+    store = PermStore([Perm((0, 1, 2))])
+    assert Perm((0, 1)) not in store
+    assert (0, 1, 2) not in store
+    assert Perm() in PermStore([Perm()])
+    assert Perm() not in PermStore([], 0)
+
+
+def test_getitem():
+    perms = list(PermSet(4))
+    store = PermStore(perms)
+    assert store[3] == perms[3]
+    assert store[-1] == perms[-1]
+    assert list(store[2:10:3]) == perms[2:10:3]
+    assert isinstance(store[2:10:3], PermStore)
+    with pytest.raises(TypeError): store["a"]
+
+
+def test_array_is_read_only_view():
+    array = np.array([[0, 1, 2], [2, 1, 0]], dtype=np.uint8)
+    store = PermStore.from_array(array)
+    assert np.shares_memory(store.array, array)
+    with pytest.raises(ValueError): store.array[0, 0] = 1
+    assert list(store) == [Perm((0, 1, 2)), Perm((2, 1, 0))]
+    with pytest.raises(ValueError): PermStore.from_array([0, 1, 2])
+
+
+def test_random():
+    store = PermStore(PermSet(5))
+    for _ in range(20):
+        assert store.random() in store
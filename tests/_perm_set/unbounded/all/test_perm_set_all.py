@@ -5,3 +5,16 @@ def test_random():
     for length in range(0, 10):
         for _ in range(100):
             assert list(range(length)) == sorted(PermSet(length).random())
+
+
+def test_random_many():
+    perms = PermSet(6).random_many(100, seed=5)
+    assert len(perms) == 100
+    assert all(perm in PermSet(6) for perm in perms)
+    assert list(perms) == list(PermSet(6).random_many(100, seed=5))
+
+
+def test_count_sum_indecomposable():
+    for length in range(8):
+        assert PermSet(length).count_sum_indecomposable() == \
+            sum(1 for perm in PermSet(length) if not perm.is_sum_decomposable())
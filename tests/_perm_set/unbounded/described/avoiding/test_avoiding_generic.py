@@ -105,3 +105,11 @@ def test_avoiding_generic_finite_class():
             cnt[len(perm)] += 1
 
         assert enum == cnt
+
+
+def test_count_sum_indecomposable():
+    avoiders = AvoidingGeneric(Basis([Perm((0, 2, 1)), Perm((3, 1, 0, 2))]))
+    for length in range(8):
+        level = avoiders.of_length(length)
+        assert level.count_sum_indecomposable() == \
+            sum(1 for perm in level if not perm.is_sum_decomposable())
@@ -0,0 +1,30 @@
+import random
+
+from permuta.misc import FenwickTree
+
+
+def test_prefix_sum():
+    for size in range(20):
+        values = [random.randint(-5, 5) for _ in range(size)]
+        tree = FenwickTree(size)
+        for index, value in enumerate(values):
+            tree.add(index, value)
+        for stop in range(size + 1):
+            assert tree.prefix_sum(stop) == sum(values[:stop])
+
+
+def test_fill():
+    tree = FenwickTree(10, fill=3)
+    assert len(tree) == 10
+    assert [tree.prefix_sum(stop) for stop in range(11)] == list(range(0, 33, 3))
+
+
+def test_find():
+    for size in range(1, 20):
+        tree = FenwickTree(size, fill=1)
+        present = list(range(size))
+        for _ in range(size):
+            for k in range(len(present)):
+                assert tree.find(k) == present[k]
+            removed = present.pop(random.randrange(len(present)))
+            tree.add(removed, -1)
@@ -0,0 +1,32 @@
+from permuta.misc import InternPool
+
+
+def test_intern():
+    pool = InternPool()
+    first = (1, 2, 3)
+    second = tuple([1, 2, 3])
+    assert pool.intern(first) is first
+    assert pool.intern(second) is first
+    assert second in pool
+    assert len(pool) == 1
+
+
+def test_collect():
+    pool = InternPool()
+    kept = pool.intern(tuple([0, 1]))
+    pool.intern(tuple([1, 0]))
+    pool.intern(tuple([2, 0, 1]))
+    assert len(pool) == 3
+    assert pool.collect() == 2
+    assert len(pool) == 1
+    assert kept in pool
+    del kept
+    assert pool.collect() == 1
+    assert len(pool) == 0
+
+
+def test_clear():
+    pool = InternPool()
+    pool.intern("a")
+    pool.clear()
+    assert len(pool) == 0
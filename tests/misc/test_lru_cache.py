@@ -0,0 +1,63 @@
+from permuta.misc import LRUCache
+
+
+def test_get():
+    calls = []
+    def function(key):
+        calls.append(key)
+        return len(key)
+    cache = LRUCache(function, maxsize=2)
+    assert cache.get("ab") == 2
+    assert cache.get("ab") == 2
+    assert calls == ["ab"]
+    assert cache.info() == (1, 1, 2, 1)
+
+
+def test_eviction():
+    cache = LRUCache(len, maxsize=2)
+    cache.get("a")
+    cache.get("ab")
+    cache.get("a")
+    cache.get("abc")
+    assert "a" in cache and "abc" in cache
+    assert "ab" not in cache
+    cache.resize(1)
+    assert len(cache) == 1 and "abc" in cache
+    cache.resize(None)
+    for key in ["a", "ab", "abcd"]:
+        cache.get(key)
+    assert len(cache) == 4
+
+
+def test_put():
+    cache = LRUCache(len, maxsize=2)
+    cache.put("a", 5)
+    assert cache.get("a") == 5
+    cache.get("ab")
+    cache.put("a", 6)
+    cache.put("abc", 7)
+    assert "ab" not in cache
+    assert cache.get("a") == 6
+    assert cache.info() == (2, 1, 2, 2)
+
+
+def test_peek():
+    cache = LRUCache(None, maxsize=2)
+    assert cache.peek("a") is None
+    assert cache.peek("a", 0) == 0
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.peek("a") == 1
+    cache.put("c", 3)
+    # Peeking made "a" the most recently used
+    assert "a" in cache and "b" not in cache
+    assert cache.info() == (1, 2, 2, 2)
+
+
+def test_clear():
+    cache = LRUCache(len)
+    cache.get("a")
+    cache.get("a")
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.info() == (0, 0, 128, 0)
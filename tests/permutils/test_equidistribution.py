@@ -0,0 +1,83 @@
+import json
+
+import pytest
+
+from permuta import Perm, PermSet
+from permuta.permutils import distribution, clear_distribution_cache
+from permuta.permutils import fingerprints, equidistribution_groups
+from permuta.permutils import equidistributed_classes, equidistributed_statistics
+from permuta.permutils import statistics
+
+
+def test_fingerprints():
+    av = PermSet.avoiding([Perm((0, 2, 1))])
+    (fingerprint,) = fingerprints([(av, "count_descents")], 5, processes=1)
+    assert len(fingerprint) == 6
+    for length, polynomial in enumerate(fingerprint):
+        assert dict(polynomial) == distribution(av, length, "count_descents")[length]
+        assert list(polynomial) == sorted(polynomial)
+
+
+def test_equidistributed_classes():
+    # Inverse classes have the same inversion and fixed point distributions
+    classes = [PermSet.avoiding([Perm((1, 2, 0))]), PermSet.avoiding([Perm((0, 1, 2))]),
+               PermSet.avoiding([Perm((2, 0, 1))])]
+    assert equidistributed_classes(classes, "count_inversions", 6, processes=1) == \
+        [[classes[0], classes[2]], [classes[1]]]
+    # Every class of a single pattern of length 3 has Catalan many perms
+    assert equidistributed_classes(classes, lambda perm: 0, 6, processes=1) == [classes]
+
+
+def test_equidistributed_statistics():
+    av = PermSet.avoiding([Perm((1, 0, 2))])
+    groups = equidistributed_statistics(
+        av, ["count_descents", "count_ascents", "count_inversions", "is_involution"],
+        5, processes=1)
+    assert groups == [["count_descents", "count_ascents"], ["count_inversions"],
+                      ["is_involution"]]
+
+
+def test_distinct_callables():
+    av = PermSet.avoiding([Perm((0, 2, 1))])
+    zero = lambda perm: 0
+    descents = lambda perm: perm.count_descents()
+    assert equidistributed_statistics(av, [zero, descents], 4, processes=1) == \
+        [[zero], [descents]]
+    first, second = fingerprints([(av, zero), (av, descents)], 4, processes=1)
+    assert first != second
+
+
+def test_parallel():
+    pairs = [(PermSet.avoiding([perm]), "majorindex") for perm in PermSet(3)]
+    clear_distribution_cache()
+    serial = equidistribution_groups(pairs, 6, processes=1)
+    clear_distribution_cache()
+    assert equidistribution_groups(pairs, 6, processes=2) == serial
+
+
+def test_disk_cache(tmpdir, monkeypatch):
+    path = str(tmpdir.join("fingerprints.json"))
+    pairs = [(PermSet.avoiding([Perm((0, 1, 2))]), "count_peaks"),
+             (PermSet.avoiding([Perm((0, 2, 1))]), "count_peaks")]
+    clear_distribution_cache()
+    first = fingerprints(pairs, 4, cache_path=path, processes=1)
+    with open(path) as file:
+        assert json.load(file)["version"] == 1
+    counted = []
+    count = statistics._count
+    def recording_count(basis, lengths, groups, processes):
+        counted.append(list(lengths))
+        return count(basis, lengths, groups, processes)
+    monkeypatch.setattr(statistics, "_count", recording_count)
+    clear_distribution_cache()
+    # Nothing is recomputed, and only the new lengths are
+    assert fingerprints(pairs, 4, cache_path=path, processes=1) == first
+    assert counted == []
+    longer = fingerprints(pairs, 6, cache_path=path, processes=1)
+    assert counted == [[5, 6], [5, 6]]
+    assert longer[0][:5] == first[0]
+    clear_distribution_cache()
+    monkeypatch.setattr(statistics, "_count", count)
+    assert fingerprints(pairs, 6, processes=1) == longer
+    with pytest.raises(ValueError):
+        fingerprints([(pairs[0][0], lambda perm: 0)], 4, cache_path=path, processes=1)
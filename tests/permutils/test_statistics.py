@@ -0,0 +1,89 @@
+import collections
+
+import pytest
+
+from permuta import Perm, PermSet
+from permuta.descriptors import Basis
+from permuta.permutils import distribution, joint_distribution, clear_distribution_cache
+from permuta.permutils import statistics
+
+
+def brute_force(basis, length, *functions):
+    return collections.Counter(tuple(function(perm) for function in functions)
+                               for perm in PermSet(length) if perm.avoids(*basis))
+
+
+def test_distribution():
+    clear_distribution_cache()
+    for basis in ([Perm((0, 2, 1))], [Perm((1, 0, 2)), Perm((2, 3, 0, 1))], []):
+        result = distribution(PermSet.avoiding(basis) if basis else PermSet(), range(7),
+                              "count_inversions", processes=1)
+        assert sorted(result) == list(range(7))
+        for length in range(7):
+            expected = brute_force(basis, length, Perm.count_inversions)
+            assert result[length] == {values[0]: count for values, count in expected.items()}
+
+
+def test_joint_distribution():
+    clear_distribution_cache()
+    basis = [Perm((0, 1, 2))]
+    result = joint_distribution(basis, [3, 6], "majorindex", Perm.count_peaks, processes=1)
+    assert sorted(result) == [3, 6]
+    for length in (3, 6):
+        assert result[length] == brute_force(basis, length, Perm.majorindex, Perm.count_peaks)
+
+
+def test_parallel():
+    clear_distribution_cache()
+    av = PermSet.avoiding([Perm((0, 2, 1, 3))])
+    parallel = joint_distribution(av, range(8), "count_descents", "count_cycles", processes=2)
+    clear_distribution_cache()
+    serial = joint_distribution(av, range(8), "count_descents", "count_cycles", processes=1)
+    assert parallel == serial
+
+
+def test_cache():
+    clear_distribution_cache()
+    basis = Basis([Perm((1, 0))])
+    result = joint_distribution(basis, 5, "count_ascents", "count_bonds", processes=1)
+    assert (basis, 5, ("count_ascents", "count_bonds")) in statistics._DISTRIBUTION_CACHE
+    # Marginals are cached along with the joint distribution
+    assert (basis, 5, ("count_ascents",)) in statistics._DISTRIBUTION_CACHE
+    assert distribution(basis, 5, "count_ascents") == {5: {4: 1}}
+    info = statistics._DISTRIBUTION_CACHE.info()
+    assert (info.hits, info.misses) == (1, 1)
+    # Results are copies of the cache
+    result[5].clear()
+    assert joint_distribution(basis, 5, "count_ascents", "count_bonds")[5] == {(4, 4): 1}
+
+
+def test_cache_bounded():
+    clear_distribution_cache()
+    cache = statistics._DISTRIBUTION_CACHE
+    try:
+        cache.resize(3)
+        basis = Basis([Perm((0, 2, 1))])
+        expected = distribution(PermSet.avoiding(basis), range(6), "count_descents")
+        assert len(cache) == 3
+        joint = joint_distribution(basis, range(6), "count_descents", "count_bonds")
+        assert len(cache) == 3
+        assert distribution(basis, range(6), "count_descents", processes=1) == expected
+        assert all(sum(counter.values()) == sum(expected[length].values())
+                   for length, counter in joint.items())
+    finally:
+        cache.resize(statistics._DISTRIBUTION_CACHE_SIZE)
+        clear_distribution_cache()
+
+
+def test_empty_class():
+    clear_distribution_cache()
+    assert distribution([Perm()], range(3), "count_descents") == \
+        {0: collections.Counter(), 1: collections.Counter(), 2: collections.Counter()}
+    assert distribution([Perm((0,))], range(3), "count_descents", processes=1)[0] == {0: 1}
+
+
+def test_bad_arguments():
+    with pytest.raises(ValueError): distribution([Perm((0, 1))], 3, "not_a_statistic")
+    with pytest.raises(TypeError): distribution([Perm((0, 1))], 3, 42)
+    with pytest.raises(ValueError): joint_distribution([Perm((0, 1))], 3)
+    with pytest.raises(ValueError): distribution([Perm((0, 1))], -1, "count_descents")
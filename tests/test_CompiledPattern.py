@@ -0,0 +1,54 @@
+import itertools
+import random
+
+from permuta import CompiledPattern, Perm
+
+
+def test_compile():
+    CompiledPattern.cache_clear()
+    compiled = CompiledPattern.compile(Perm((1, 3, 0, 2)))
+    assert compiled.pattern == (1, 3, 0, 2)
+    assert CompiledPattern.compile((1, 3, 0, 2)) is compiled
+    assert Perm((4, 1, 5, 0, 3, 2)).contains(Perm((1, 3, 0, 2)))
+    info = CompiledPattern.cache_info()
+    assert (info.hits, info.misses, info.currsize) == (2, 1, 1)
+    assert CompiledPattern.compile(()).direction == 0
+    assert CompiledPattern.compile((0, 1, 2)).direction == 1
+    assert CompiledPattern.compile((2, 1, 0)).direction == -1
+    assert CompiledPattern.compile((0, 2, 1)).direction == 0
+
+
+def test_cache_size():
+    CompiledPattern.cache_clear()
+    try:
+        CompiledPattern.set_cache_size(2)
+        for patt in [(0, 1), (1, 0), (0, 2, 1)]:
+            CompiledPattern.compile(patt)
+        assert CompiledPattern.cache_info().currsize == 2
+        assert CompiledPattern.cache_info().maxsize == 2
+    finally:
+        CompiledPattern.set_cache_size(4096)
+
+
+def test_occurrences_in():
+    for _ in range(100):
+        patt = Perm.random(random.randint(0, 5))
+        perm = Perm.random(random.randint(0, 10))
+        compiled = CompiledPattern.compile(patt)
+        occurrences = list(compiled.occurrences_in(perm))
+        assert occurrences == list(patt.occurrences_in(perm))
+        assert all(Perm.to_standard([perm[index] for index in occurrence]) == patt
+                   for occurrence in occurrences)
+        assert compiled.contained_in(perm) == bool(occurrences)
+
+
+def test_contained_in_small():
+    perms = [Perm(perm) for length in range(8)
+             for perm in itertools.permutations(range(length))]
+    for length in range(5):
+        for patt in itertools.permutations(range(length)):
+            compiled = CompiledPattern.compile(patt)
+            for perm in perms:
+                expected = any(True for _ in compiled.occurrences_in(perm))
+                assert compiled._search(perm) == expected
+                assert compiled.contained_in(perm) == expected
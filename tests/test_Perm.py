@@ -1,5 +1,8 @@
+import collections
 import random
+import numpy
 import pytest
+from math import factorial
 from permuta import Perm, PermSet
 
 def test_init():
@@ -25,6 +28,31 @@ def test_init():
     finally:
         Perm.toggle_check()
 
+def test_no_instance_dict():
+    perm = Perm((2, 0, 1))
+    assert not hasattr(perm, "__dict__")
+    with pytest.raises(AttributeError): perm.foo = 1
+    # Pattern details live in a side cache, so matching still works
+    assert perm.contained_in(Perm((3, 1, 2, 0)))
+    assert not perm.contained_in(Perm((0, 1, 2, 3)))
+
+def test_intern():
+    perm = Perm.intern(Perm((2, 0, 1)))
+    assert Perm.intern(Perm((2, 0, 1))) is perm
+    assert Perm.intern([2, 0, 1]) is perm
+    assert Perm((2, 0, 1)) is not perm
+    assert Perm.intern(Perm((0, 1))) == Perm((0, 1))
+
+def test_toggle_interning():
+    Perm.toggle_interning()
+    try:
+        assert Perm((0, 1, 2)) is Perm((0, 1, 2))
+        assert Perm((1, 0)).insert() is Perm((1, 0, 2))
+        assert Perm(201) is Perm((2, 0, 1))
+    finally:
+        Perm.toggle_interning()
+    assert Perm((0, 1, 2)) is not Perm((0, 1, 2))
+
 def test_to_standard():
     def gen(perm):
         res = list(perm)
@@ -42,6 +70,20 @@ def test_to_standard():
         assert perm == Perm.to_standard(perm)
         assert perm == Perm.to_standard(gen(perm))
 
+def test_to_standard_many():
+    for length in range(8):
+        rows = [[random.randint(0, 5) for _ in range(length)] for _ in range(50)]
+        expected = [Perm.to_standard(row) for row in rows]
+        result = Perm.to_standard_many(rows)
+        assert result.shape == (50, length)
+        assert [Perm(row.tolist()) for row in result] == expected
+        codes = Perm.to_standard_many(rows, codes=True)
+        assert [Perm.unrank(code, length) for code in codes] == expected
+    array = numpy.array([[3.5, -1.0, 2.0], [1.0, 1.0, 0.0]])
+    assert Perm.to_standard_many(array).tolist() == [[2, 0, 1], [1, 2, 0]]
+    assert Perm.to_standard_many([]).shape == (0, 0)
+    with pytest.raises(ValueError): Perm.to_standard_many([(0, 1), (0, 1, 2)])
+
 def test_from_string():
     assert Perm.from_string("203451") == Perm((2, 0, 3, 4, 5, 1))
     assert Perm.from_string("40132") == Perm((4, 0, 1, 3, 2))
@@ -76,6 +118,25 @@ def test_random():
     finally:
         Perm.toggle_check()
 
+def test_random_many():
+    for length in (0, 1, 5, 300):
+        perms = Perm.random_many(length, 100)
+        assert perms.array.shape == (100, length)
+        for perm in perms:
+            assert sorted(perm) == list(range(length))
+    # Reproducible per seed and worker, different across workers
+    first = Perm.random_many(12, 50, seed=7, worker=0)
+    assert numpy.array_equal(first.array, Perm.random_many(12, 50, seed=7, worker=0).array)
+    assert not numpy.array_equal(first.array, Perm.random_many(12, 50, seed=7, worker=1).array)
+    assert not numpy.array_equal(first.array, Perm.random_many(12, 50, seed=8, worker=0).array)
+    generator = numpy.random.default_rng(3)
+    assert len(Perm.random_many(4, 10, seed=generator)) == 10
+    with pytest.raises(ValueError): Perm.random_many(4, 10, seed=generator, worker=1)
+    # Roughly uniform
+    counts = collections.Counter(Perm.random_many(3, 6000, seed=1))
+    assert len(counts) == 6
+    assert all(800 < count < 1200 for count in counts.values())
+
 def test_monotone_increasing():
     for length in range(11):
         assert Perm.monotone_increasing(length) ==  Perm(range(length))
@@ -105,6 +166,58 @@ def test_unrank_2():
     for number, perm in enumerate(PermSet(length)):
         assert Perm.unrank(number, length) == perm
 
+def test_rank():
+    for length in range(7):
+        for number, perm in enumerate(PermSet(length)):
+            assert perm.rank() == number
+    for _ in range(20):
+        perm = Perm.random(random.randint(20, 200))
+        assert Perm.unrank(perm.rank(), len(perm)) == perm
+    assert Perm.monotone_decreasing(25).rank() == factorial(25) - 1
+
+def test_rank_many_unrank_many():
+    for length in range(7):
+        perms = list(PermSet(length))
+        ranks = Perm.rank_many(perms)
+        assert ranks.tolist() == list(range(len(perms)))
+        rows = Perm.unrank_many(ranks, length)
+        assert [Perm(row) for row in rows.tolist()] == perms
+    perms = [Perm.random(20) for _ in range(50)]
+    ranks = Perm.rank_many(perms)
+    assert ranks.dtype == numpy.int64
+    assert ranks.tolist() == [perm.rank() for perm in perms]
+    assert numpy.array_equal(Perm.unrank_many(ranks, 20), numpy.array(perms))
+    perms = [Perm.random(40) for _ in range(50)]
+    ranks = Perm.rank_many(perms)
+    assert ranks.dtype == object
+    assert ranks.tolist() == [perm.rank() for perm in perms]
+    assert numpy.array_equal(Perm.unrank_many(ranks, 40), numpy.array(perms))
+    with pytest.raises(ValueError): Perm.unrank_many([6], 3)
+    with pytest.raises(ValueError): Perm.unrank_many([-1], 3)
+
+def test_myrvold_ruskey_rank():
+    for length in range(7):
+        perms = list(PermSet(length))
+        ranks = [perm.myrvold_ruskey_rank() for perm in perms]
+        assert sorted(ranks) == list(range(len(perms)))
+        for number, perm in zip(ranks, perms):
+            assert Perm.myrvold_ruskey_unrank(number, length) == perm
+    for _ in range(20):
+        perm = Perm.random(random.randint(20, 100))
+        number = perm.myrvold_ruskey_rank()
+        assert 0 <= number < factorial(len(perm))
+        assert Perm.myrvold_ruskey_unrank(number, len(perm)) == perm
+    with pytest.raises(AssertionError): Perm.myrvold_ruskey_unrank(6, 3)
+
+def test_myrvold_ruskey_rank_many_unrank_many():
+    for length in (0, 1, 5, 20, 30):
+        perms = [Perm.random(length) for _ in range(50)]
+        ranks = Perm.myrvold_ruskey_rank_many(perms)
+        assert ranks.tolist() == [perm.myrvold_ruskey_rank() for perm in perms]
+        rows = Perm.myrvold_ruskey_unrank_many(ranks, length)
+        assert [Perm(row) for row in rows.tolist()] == perms
+    with pytest.raises(ValueError): Perm.myrvold_ruskey_unrank_many([24], 4)
+
 def test_contained_in():
     def generate_contained(n, perm):
         for i in range(len(perm), n):
@@ -149,6 +262,15 @@ def test_count_occurrences_in():
     assert Perm([1, 0]).count_occurrences_in(Perm([4, 1, 2, 3, 0])) == 7
     assert Perm([4, 1, 2, 3, 0]).count_occurrences_in(Perm([])) == 0
     assert Perm([4, 1, 2, 3, 0]).count_occurrences_in(Perm([1, 0])) == 0
+    for _ in range(200):
+        patt = Perm.random(random.randint(1, 6))
+        perm = Perm.random(random.randint(0, 16))
+        assert patt.count_occurrences_in(perm) == sum(1 for _ in patt.occurrences_in(perm))
+    # Counts far too large to enumerate
+    perm = Perm.monotone_increasing(200)
+    assert Perm.monotone_increasing(7).count_occurrences_in(perm) == 200*199*198*197*196*195*194//5040
+    perm = Perm.monotone_decreasing(100).inflate([Perm.monotone_increasing(10)]*100)
+    assert Perm((2, 3, 4, 0, 1)).count_occurrences_in(perm) == (100*99//2)*120*45
 
 def test_count_occurrences_of():
     assert Perm([4, 1, 2, 3, 0]).count_occurrences_of(Perm([1, 0])) == 7
@@ -506,6 +628,38 @@ def test_is_sum_decomposable():
     assert not p3.is_sum_decomposable()
     assert not Perm((4, 3, 2, 1, 0)).is_sum_decomposable()
 
+def test_sum_components():
+    assert Perm().sum_components() == []
+    assert Perm((0, 1, 2)).sum_components() == [Perm((0,))]*3
+    assert Perm((2, 1, 0)).sum_components() == [Perm((2, 1, 0))]
+    p1, p2, p3 = Perm((4, 2, 1, 3, 0)), Perm((0,)), Perm((1, 2, 0))
+    assert p1.direct_sum(p2, p3).sum_components() == [p1, p2, p3]
+    for _ in range(30):
+        perm = Perm.random(random.randint(1, 20))
+        components = perm.sum_components()
+        assert components[0].direct_sum(*components[1:]) == perm
+        assert not any(component.is_sum_decomposable() for component in components)
+
+def test_skew_components():
+    assert Perm().skew_components() == []
+    assert Perm((2, 1, 0)).skew_components() == [Perm((0,))]*3
+    p1, p2, p3 = Perm((0, 4, 2, 1, 3)), Perm((0,)), Perm((0, 2, 1))
+    assert p1.skew_sum(p2, p3).skew_components() == [p1, p2, p3]
+    for _ in range(30):
+        perm = Perm.random(random.randint(1, 20))
+        components = perm.skew_components()
+        assert components[0].skew_sum(*components[1:]) == perm
+        assert not any(component.is_skew_decomposable() for component in components)
+
+def test_sum_indecomposable_sequence():
+    assert Perm().sum_indecomposable_sequence() == []
+    assert Perm((0, 1, 2)).sum_indecomposable_sequence() == [1, 0, 0]
+    assert Perm((2, 1, 0)).sum_indecomposable_sequence() == [1, 1, 1]
+    perm = Perm((3, 1, 4, 0, 2))
+    for length, count in enumerate(perm.sum_indecomposable_sequence(), 1):
+        assert count == sum(1 for patt in PermSet(length)
+                            if perm.contains(patt) and not patt.is_sum_decomposable())
+
 def test_descent_set():
     assert Perm().descent_set() == []
     assert Perm((0, 1, 2, 3)).descent_set() == []
@@ -611,6 +765,62 @@ def test_order():
         args = tuple(perm for _ in range(perm.order() - 1))
         assert perm.compose(*args).is_identity()
 
+def test_power():
+    assert Perm() ** 5 == Perm()
+    perm = Perm((4, 2, 7, 0, 3, 1, 6, 5))
+    assert perm ** 0 == Perm.identity(8)
+    assert perm ** 1 == perm
+    assert perm ** -1 == perm.inverse()
+    assert perm ** (10**18 + 1) == perm ** (10**18 % perm.order() + 1)
+    with pytest.raises(TypeError): perm ** 1.5
+    for _ in range(30):
+        perm = Perm.random(random.randint(0, 15))
+        power = Perm.identity(len(perm))
+        for exponent in range(10):
+            assert perm ** exponent == power
+            assert perm ** -exponent == power.inverse()
+            power = power * perm
+
+def test_longest_increasing_subsequence():
+    assert Perm().longest_increasing_subsequence() == ()
+    assert Perm().length_of_longest_decreasing_subsequence() == 0
+    assert Perm((2, 0, 3, 1, 4, 5)).longest_increasing_subsequence() == (1, 3, 4, 5)
+    assert Perm((2, 0, 3, 1, 4, 5)).longest_decreasing_subsequence() == (2, 3)
+    for _ in range(50):
+        perm = Perm.random(random.randint(1, 30))
+        for positions, length, sign in (
+                (perm.longest_increasing_subsequence(),
+                 perm.length_of_longest_increasing_subsequence(), 1),
+                (perm.longest_decreasing_subsequence(),
+                 perm.length_of_longest_decreasing_subsequence(), -1)):
+            assert len(positions) == length
+            assert list(positions) == sorted(set(positions))
+            assert all((perm[second] - perm[first])*sign > 0
+                       for first, second in zip(positions, positions[1:]))
+            monotone = Perm.monotone_increasing if sign == 1 else Perm.monotone_decreasing
+            assert perm.contains(monotone(length))
+            assert perm.avoids(monotone(length + 1))
+
+def test_contains_monotone():
+    for _ in range(200):
+        perm = Perm.random(random.randint(0, 9))
+        for length in range(6):
+            for patt in (Perm.monotone_increasing(length), Perm.monotone_decreasing(length)):
+                assert (patt in perm) == any(True for _ in patt.occurrences_in(perm))
+    perm = Perm.random(3000)
+    patt = Perm.monotone_increasing(perm.length_of_longest_increasing_subsequence())
+    assert perm.contains(patt)
+    assert perm.avoids(Perm.monotone_increasing(len(patt) + 1))
+
+def test_cycle_type():
+    assert Perm().cycle_type() == ()
+    assert Perm((1, 2, 0, 4, 3, 5)).cycle_type() == (3, 2, 1)
+    for _ in range(30):
+        perm = Perm.random(random.randint(0, 15))
+        assert perm.cycle_type() == tuple(sorted(map(len, perm.cycle_decomp()), reverse=True))
+        conjugator = Perm.random(len(perm))
+        assert conjugator.compose(perm, conjugator.inverse()).cycle_type() == perm.cycle_type()
+
 def test_ltrmin():
     assert Perm(()).ltrmin() == []
     assert Perm((1)).ltrmin() == [0]
@@ -704,6 +914,50 @@ def test_count_noninversions():
                     invs += 1
         assert perm.count_noninversions() == invs
 
+def test_lehmer_code():
+    assert Perm(()).lehmer_code() == []
+    assert Perm((0,)).lehmer_code() == [0]
+    # Both the tree and the vectorized kernel
+    for length in list(range(10)) + [255, 256, 700]:
+        perm = Perm.random(length)
+        code = [sum(1 for later in perm[i + 1:] if later < perm[i]) for i in range(length)]
+        assert perm.lehmer_code() == code
+        assert perm.rank_encoding() == code
+        assert perm.count_inversions() == sum(code)
+        assert perm.count_noninversions() == length*(length - 1)//2 - sum(code)
+        vector = [sum(1 for earlier in perm[:perm.index(value)] if earlier > value)
+                  for value in range(length)]
+        assert perm.inversion_vector() == vector
+    perm = Perm.monotone_decreasing(10**5)
+    assert perm.count_inversions() == 10**5*(10**5 - 1)//2
+    assert perm.inversion_vector()[:3] == [10**5 - 1, 10**5 - 2, 10**5 - 3]
+
+def test_rtlmax_ltrmin_decomposition():
+    def brute_force(perm):
+        layers = []
+        remaining = list(perm)
+        while remaining:
+            layer = [index for index, element in enumerate(remaining)
+                     if all(other > element for other in remaining[:index])
+                     or all(other < element for other in remaining[index + 1:])]
+            layers.append(layer)
+            remaining = [element for index, element in enumerate(remaining)
+                         if index not in layer]
+        return layers
+    assert Perm(()).rtlmax_ltrmin_layers() == []
+    assert Perm(()).rtlmax_ltrmin_decomposition() == []
+    assert Perm(()).count_rtlmax_ltrmin_layers() == 0
+    for length in list(range(8)) + [50]*20:
+        perm = Perm.random(length)
+        layers = brute_force(perm)
+        assert perm.rtlmax_ltrmin_decomposition() == layers
+        assert perm.count_rtlmax_ltrmin_layers() == len(layers)
+        layer_of = perm.rtlmax_ltrmin_layers()
+        assert sorted(layer_of) == sorted(k for k, layer in enumerate(layers) for _ in layer)
+    perm = Perm.monotone_increasing(2001)
+    assert perm.count_rtlmax_ltrmin_layers() == 1001
+    assert perm.rtlmax_ltrmin_layers()[999:1002] == [999, 1000, 999]
+
 def test_count_bonds():
     assert Perm(()).count_bonds() == 0
     assert Perm((1)).count_bonds() == 0
@@ -809,6 +1063,18 @@ def test_fourpats():
         for key, val in fourpatdict.items():
             assert key.count_occurrences_in(perm) == val
 
+def test_pattern_counts_long():
+    perms = [Perm.random(random.randint(12, 45)) for _ in range(20)]
+    perms.append(Perm.monotone_increasing(30))
+    perms.append(Perm.monotone_decreasing(30))
+    perms.append(Perm((1, 3, 0, 2)).inflate([Perm.monotone_decreasing(8)]*4))
+    for perm in perms:
+        assert perm.threepats() == perm._small_pattern_counts(3)
+        assert perm.fourpats() == perm._small_pattern_counts(4)
+    perm = Perm.random(2000)
+    counts = perm.fourpats()
+    assert sum(counts.values()) == 2000*1999*1998*1997//24
+
 def test_rank_encoding():
     assert Perm(()).rank_encoding() == []
     assert Perm((0)).rank_encoding() == [0]
@@ -834,6 +1100,26 @@ def test_block_decomposition():
             for start in blocks[length]:
                 assert max(perm[start:start + length]) - min(perm[start:start + length]) == length - 1
                 assert Perm.to_standard(perm[start:start + length]) in patts
+    for _ in range(20):
+        perm = Perm.random(random.randint(0, 20))
+        blocks = [[] for _ in range(len(perm))]
+        for start in range(len(perm)):
+            for length in range(2, min(len(perm) - start + 1, len(perm))):
+                window = perm[start:start + length]
+                if max(window) - min(window) == length - 1:
+                    blocks[length].append(start)
+        assert perm.block_decomposition() == blocks
+
+def test_substitution_decomposition():
+    assert Perm(()).substitution_decomposition() is None
+    root = Perm((4, 1, 0, 2, 3)).substitution_decomposition()
+    assert root.kind == "decreasing"
+    assert root.components == [Perm((0,)), Perm((1, 0, 2, 3))]
+    assert Perm((4, 1, 0, 2, 3)).substitution_decomposition() is root
+    perm = Perm((1, 3, 0, 2)).inflate([Perm((0, 1)), Perm((0,)), Perm((2, 0, 3, 1)), Perm((0,))])
+    assert perm.substitution_decomposition().skeleton == Perm((1, 3, 0, 2))
+    assert perm.maximum_block() == (4, 3)
+    assert not perm.is_simple()
 
 def test_monotone_block_decomposition():
     assert Perm(()).monotone_block_decomposition(True) == []
@@ -0,0 +1,103 @@
+import random
+
+import numpy
+import pytest
+
+from permuta import Perm, PermSet, PermStore, PermBatch
+
+
+STATISTICS = [
+    "count_descents",
+    "count_ascents",
+    "count_peaks",
+    "count_valleys",
+    "count_fixed_points",
+    "count_bonds",
+    "majorindex",
+    "count_inversions",
+    "count_ltrmin",
+    "is_involution",
+    "count_cycles",
+    "is_sum_decomposable",
+    "is_skew_decomposable",
+]
+
+
+def assert_statistics(perms, batch):
+    for statistic in STATISTICS:
+        result = getattr(batch, statistic)()
+        assert len(result) == len(perms)
+        assert result.tolist() == [getattr(perm, statistic)() for perm in perms]
+
+
+def test_statistics():
+    for length in range(7):
+        perms = list(PermSet(length))
+        assert_statistics(perms, PermBatch(perms, length))
+    for length in (20, 300):
+        perms = [Perm.random(length) for _ in range(50)]
+        assert_statistics(perms, PermBatch(perms))
+
+
+def test_descents_ascents():
+    perms = [Perm.random(8) for _ in range(30)]
+    batch = PermBatch(perms)
+    assert [numpy.flatnonzero(row).tolist() for row in batch.descents()] == \
+        [list(perm.descents()) for perm in perms]
+    assert [numpy.flatnonzero(row).tolist() for row in batch.ascents()] == \
+        [list(perm.ascents()) for perm in perms]
+
+
+def test_construction():
+    level = PermSet.avoiding([Perm((0, 2, 1))]).of_length(6)
+    batch = PermBatch(level)
+    assert len(batch) == 132
+    assert set(batch) == set(level)
+    store = PermStore(PermSet(4))
+    assert numpy.array_equal(PermBatch(store).array, store.array)
+    assert numpy.array_equal(PermBatch(store.array).array, store.array)
+    assert len(PermBatch([], 3)) == 0
+    assert PermBatch([], 3).count_inversions().tolist() == []
+    with pytest.raises(ValueError): PermBatch([Perm((0, 1)), Perm((0,))])
+    with pytest.raises(ValueError): PermBatch(numpy.arange(3))
+
+
+def test_cycle_structure():
+    for length in (0, 1, 7, 300):
+        perms = [Perm.random(length) for _ in range(20)]
+        batch = PermBatch(perms, length)
+        assert batch.order().tolist() == [perm.order() for perm in perms]
+        for exponent in (0, 1, -1, 5, 10**18):
+            assert list(batch ** exponent) == [perm ** exponent for perm in perms]
+        for perm, row in zip(perms, batch.cycle_types()):
+            assert row.sum() == len(perm.cycle_decomp())
+            assert [length for length, count in enumerate(row.tolist())
+                    for _ in range(count)] == sorted(perm.cycle_type())
+
+
+def test_compose_inverse():
+    perms = [Perm.random(9) for _ in range(30)]
+    others = [Perm.random(9) for _ in range(30)]
+    batch, other_batch = PermBatch(perms), PermBatch(others)
+    assert list(batch.inverse()) == [perm.inverse() for perm in perms]
+    assert list(batch * other_batch) == [perm * other for perm, other in zip(perms, others)]
+    assert list(batch * others[0]) == [perm * others[0] for perm in perms]
+    assert list(others[0] * batch) == [others[0] * perm for perm in perms]
+    assert list(batch.compose(others[0], other_batch)) == \
+        [perm.compose(others[0], other) for perm, other in zip(perms, others)]
+    assert list(PermBatch([], 4).inverse()) == []
+    with pytest.raises(ValueError): batch * Perm((0, 1))
+    with pytest.raises(ValueError): batch * other_batch[:5]
+    with pytest.raises(TypeError): batch * 2
+    with pytest.raises(TypeError): batch.compose([0, 1, 2])
+
+
+def test_container():
+    perms = [Perm.random(5) for _ in range(10)]
+    batch = PermBatch(perms)
+    assert list(batch) == perms
+    assert batch[3] == perms[3]
+    assert list(batch[2:5]) == perms[2:5]
+    assert batch.length == 5
+    with pytest.raises(TypeError): batch["a"]
+    with pytest.raises(ValueError): batch.array[0, 0] = 1
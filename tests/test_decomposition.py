@@ -0,0 +1,77 @@
+import itertools
+import random
+
+from permuta import Perm
+from permuta.decomposition import DecompositionNode, substitution_decomposition
+
+
+def intervals(perm):
+    result = set()
+    for start in range(len(perm)):
+        for stop in range(start + 2, len(perm) + 1):
+            if max(perm[start:stop]) - min(perm[start:stop]) == stop - start - 1:
+                result.add((start, stop))
+    return result
+
+
+def tree_intervals(root):
+    result = set()
+    for node in root:
+        if len(node) > 1:
+            result.add((node.start, node.stop))
+        if node.is_linear:
+            for first, last in itertools.combinations(node.children, 2):
+                result.add((first.start, last.stop))
+    return result
+
+
+def check_tree(perm):
+    root = substitution_decomposition(perm)
+    assert (root.start, root.stop, root.low, root.high) == (0, len(perm), 0, len(perm) - 1)
+    assert tree_intervals(root) == intervals(perm)
+    for node in root:
+        assert node.pattern == Perm.to_standard(perm[node.start:node.stop])
+        if node.kind == DecompositionNode.POINT:
+            assert len(node) == 1 and not node.children
+            continue
+        assert node.skeleton.inflate(node.components) == node.pattern
+        if node.kind == DecompositionNode.SIMPLE:
+            assert len(node.children) >= 4
+            assert intervals(node.skeleton) == {(0, len(node.children))}
+        else:
+            assert len(node.children) >= 2
+            if node.kind == DecompositionNode.INCREASING:
+                assert node.skeleton == Perm.monotone_increasing(len(node.children))
+            else:
+                assert node.skeleton == Perm.monotone_decreasing(len(node.children))
+            # Components of a monotone node are indecomposable in its direction
+            assert all(child.kind != node.kind for child in node.children)
+
+
+def test_substitution_decomposition():
+    assert substitution_decomposition(Perm()) is None
+    root = substitution_decomposition(Perm((0,)))
+    assert root.kind == DecompositionNode.POINT
+    root = substitution_decomposition(Perm((2, 0, 3, 1)))
+    assert root.kind == DecompositionNode.SIMPLE
+    assert root.components == [Perm((0,))]*4
+    root = substitution_decomposition(Perm((1, 3, 0, 2, 5, 4)))
+    assert root.kind == DecompositionNode.INCREASING
+    assert root.components == [Perm((1, 3, 0, 2)), Perm((1, 0))]
+    for length in range(1, 8):
+        for perm in itertools.permutations(range(length)):
+            check_tree(Perm(perm))
+    for _ in range(50):
+        check_tree(Perm.random(random.randint(8, 80)))
+
+
+def test_substitution_decomposition_long():
+    length = 20000
+    root = substitution_decomposition(Perm.monotone_increasing(length))
+    assert root.kind == DecompositionNode.INCREASING
+    assert len(root.children) == length
+    perm = Perm.random(length)
+    root = substitution_decomposition(perm)
+    assert len(root) == length
+    assert sorted(child.start for child in root.children) \
+        == [child.start for child in root.children]
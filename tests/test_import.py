@@ -0,0 +1,45 @@
+import subprocess
+import sys
+
+import permuta
+
+
+def loaded_modules(statement):
+    """Return the modules loaded by a fresh interpreter running statement."""
+    code = "import sys\n{}\nprint(' '.join(sys.modules))".format(statement)
+    return set(subprocess.check_output([sys.executable, "-c", code]).decode().split())
+
+
+def test_lazy_import():
+    modules = loaded_modules("import permuta")
+    assert "permuta" in modules
+    assert "permuta.Perm" not in modules
+    assert "permuta.descriptors" not in modules
+    assert "numpy" not in modules
+    modules = loaded_modules("from permuta import PermSet")
+    assert "permuta.MeshPatt" not in modules
+    assert "numpy" not in modules
+
+
+def test_public_names():
+    assert isinstance(permuta.Perm, type)
+    assert isinstance(permuta.PermSet, type)
+    assert isinstance(permuta.MeshPatt, type)
+    assert permuta.Perm.__module__ == "permuta.Perm"
+    for name in permuta.__all__:
+        assert name in dir(permuta)
+        assert getattr(permuta, name) is not None
+    try:
+        permuta.NotAName
+    except AttributeError:
+        pass
+    else:
+        assert False
+
+
+def test_submodule_does_not_shadow_class():
+    code = ("import permuta.MeshPatt, permuta.permutils.symmetry\n"
+            "import permuta\n"
+            "print(isinstance(permuta.Perm, type), isinstance(permuta.MeshPatt, type))")
+    output = subprocess.check_output([sys.executable, "-c", code]).decode().split()
+    assert output == ["True", "True"]
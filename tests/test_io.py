@@ -0,0 +1,196 @@
+import concurrent.futures
+import io
+import pathlib
+import random
+
+import numpy
+import pytest
+
+from permuta import Perm, PermSet, PermStore
+from permuta.io import encode, decode, PermWriter, PermReader
+from permuta.io import write_perms, read_perms, iter_perms
+from permuta.io import load_text, convert_text, _bounded_map
+
+
+ENCODINGS = ["raw", "nibble", "lehmer", "varint"]
+
+
+def test_encode_decode():
+    for encoding in ENCODINGS:
+        for length in [0, 1, 2, 5, 16] + ([20, 30, 300] if encoding != "nibble" else []):
+            perms = [Perm.random(length) for _ in range(40)]
+            data = encode(perms, encoding)
+            result = decode(data, length, len(perms), encoding)
+            assert [Perm(row) for row in result.tolist()] == perms
+
+
+def test_encoding_sizes():
+    perms = list(PermSet(10))[:100]
+    assert len(encode(perms, "raw")) == 1000
+    assert len(encode(perms, "nibble")) == 500
+    assert len(encode(perms, "lehmer")) == 400
+    assert len(encode(perms, "varint")) <= 200
+
+
+def test_encode_errors():
+    with pytest.raises(ValueError): encode([Perm.random(17)], "nibble")
+    with pytest.raises(ValueError): encode([Perm.random(3)], "bogus")
+    with pytest.raises(ValueError): decode(b"\x00", 3, 2, "nibble")
+
+
+def test_write_read(tmpdir):
+    path = str(tmpdir.join("perms.bin"))
+    for encoding in ENCODINGS + [None]:
+        perms = [Perm.random(12) for _ in range(1000)]
+        assert write_perms(path, perms, encoding=encoding, chunk_size=64) == 1000
+        with PermReader(path) as reader:
+            assert reader.count == 1000
+            assert reader.length == 12
+            assert len(list(reader.chunks())) == 16
+        store = read_perms(path)
+        assert isinstance(store, PermStore)
+        assert list(store) == perms
+        assert list(iter_perms(path)) == perms
+        assert list(read_perms(path, use_mmap=True)) == perms
+
+
+def test_write_perm_set(tmpdir):
+    path = str(tmpdir.join("perms.bin"))
+    write_perms(path, PermSet(5))
+    assert list(read_perms(path)) == list(PermSet(5))
+    store = PermStore(PermSet(4))
+    write_perms(path, store, encoding="raw", chunk_size=5)
+    assert numpy.array_equal(read_perms(path).array, store.array)
+
+
+def test_empty(tmpdir):
+    path = str(tmpdir.join("perms.bin"))
+    assert write_perms(path, [], length=7) == 0
+    store = read_perms(path)
+    assert len(store) == 0
+    assert store.length == 7
+    with pytest.raises(ValueError): write_perms(path, [])
+
+
+def test_unseekable_stream():
+    class Stream(io.BytesIO):
+        def seekable(self):
+            return False
+    stream = Stream()
+    with PermWriter(stream, close_file=False) as writer:
+        writer.write(PermSet(3))
+    reader = PermReader(io.BytesIO(stream.getvalue()))
+    assert reader.count is None
+    assert list(reader) == list(PermSet(3))
+
+
+def test_bad_file():
+    with pytest.raises(ValueError): PermReader(io.BytesIO(b"NOTAPERMFILE" * 3))
+    stream = io.BytesIO()
+    with PermWriter(stream, close_file=False) as writer:
+        writer.write([Perm.random(6) for _ in range(10)])
+    truncated = io.BytesIO(stream.getvalue()[:-3])
+    with pytest.raises(ValueError): list(PermReader(truncated))
+    with pytest.raises(ValueError):
+        PermWriter(io.BytesIO(), length=3).write([Perm.random(4)])
+    data = bytearray(stream.getvalue())
+    data[5] = 4
+    with pytest.raises(ValueError): PermReader(io.BytesIO(bytes(data)))
+
+
+def test_prefix(tmpdir):
+    prefix = b"some other data\n"
+    perms = [Perm.random(7) for _ in range(50)]
+    stream = io.BytesIO()
+    stream.write(prefix)
+    with PermWriter(stream, close_file=False, chunk_size=16) as writer:
+        writer.write(perms)
+    stream.seek(len(prefix))
+    with PermReader(stream) as reader:
+        assert reader.count == 50
+        assert list(reader) == perms
+    path = str(tmpdir.join("perms.bin"))
+    with open(path, "wb") as file:
+        file.write(stream.getvalue())
+    with open(path, "rb") as file:
+        file.seek(len(prefix))
+        with PermReader(file, use_mmap=True) as reader:
+            assert [perm for chunk in reader.chunks()
+                    for perm in map(Perm, chunk.tolist())] == perms
+
+
+def test_path_like(tmpdir):
+    path = pathlib.Path(str(tmpdir.join("perms.bin")))
+    assert write_perms(path, PermSet(3)) == 6
+    assert list(read_perms(path)) == list(PermSet(3))
+    assert list(iter_perms(path)) == list(PermSet(3))
+
+
+def test_load_text(tmpdir):
+    path = str(tmpdir.join("perms.txt"))
+    perms = [Perm.random(9) for _ in range(500)]
+    styles = [
+        (dict(), lambda perm: " ".join(map(str, perm))),
+        (dict(), lambda perm: str(list(perm))),
+        (dict(), lambda perm: str(tuple(perm))),
+        (dict(one_based=True), lambda perm: ",".join(str(i + 1) for i in perm)),
+        (dict(digits=True), lambda perm: "".join(map(str, perm))),
+    ]
+    for options, format_perm in styles:
+        with open(path, "w") as file:
+            for perm in perms:
+                file.write(format_perm(perm) + "\n")
+        for processes in (1, 2):
+            store, errors = load_text(path, processes=processes, chunk_size=256, **options)
+            assert errors == []
+            assert list(store) == perms
+
+
+def test_load_text_malformed(tmpdir):
+    path = str(tmpdir.join("perms.txt"))
+    lines = ["2 0 1", "0 0 1", "x y z", "", "1 0", "3 0 1", "1 2 0",
+             "0 " + "9"*20 + " 1"]
+    with open(path, "w") as file:
+        file.write("\n".join(lines))
+    store, errors = load_text(path, processes=1)
+    assert list(store) == [Perm((2, 0, 1)), Perm((1, 2, 0))]
+    assert [(error.line_number, error.text) for error in errors] == [
+        (2, "0 0 1"), (3, "x y z"), (5, "1 0"), (6, "3 0 1"), (8, lines[7])]
+    assert errors[3].reason == "not a perm"
+    assert errors[2].reason == "length is not 3"
+    assert errors[4].reason == "element out of range"
+    store, errors = load_text(path, length=2, processes=1)
+    assert list(store) == [Perm((1, 0))]
+    assert len(errors) == 6
+    store, errors = load_text(path, digits=True, processes=1)
+    assert len(store) == 0
+    assert len(errors) == 7
+
+
+def test_bounded_map():
+    submitted = []
+    def task(number):
+        submitted.append(number)
+        return number*number
+    with concurrent.futures.ThreadPoolExecutor(2) as executor:
+        results = _bounded_map(executor, task, range(20), 3)
+        for number, result in enumerate(results):
+            assert result == number*number
+            # Only the tasks within the window ahead have been submitted
+            assert len(submitted) <= number + 3
+    assert sorted(submitted) == list(range(20))
+
+
+def test_convert_text(tmpdir):
+    text_path = str(tmpdir.join("perms.txt"))
+    perm_path = str(tmpdir.join("perms.bin"))
+    perms = [Perm.random(12) for _ in range(300)]
+    with open(text_path, "w") as file:
+        for perm in perms:
+            file.write(" ".join(map(str, perm)) + "\n")
+        file.write("not a perm\n")
+    count, errors = convert_text(text_path, perm_path, encoding="lehmer",
+                                 processes=2, chunk_size=1000)
+    assert count == 300
+    assert [error.line_number for error in errors] == [301]
+    assert list(read_perms(perm_path)) == perms
@@ -0,0 +1,65 @@
+import itertools
+import random
+
+from permuta import CompiledPattern, Perm
+from permuta._pattern_matchers import MATCHERS
+
+
+def random_inflation(length):
+    """Return a random perm built by inflating small perms, which avoids
+    the patterns not contained in any of them much more often than a
+    uniformly random perm."""
+    if length <= 3:
+        return Perm.random(length)
+    parts = random.randint(2, min(length, 4))
+    cuts = sorted(random.sample(range(1, length), parts - 1))
+    sizes = [stop - start for start, stop in zip([0] + cuts, cuts + [length])]
+    skeleton = random.choice([Perm.monotone_increasing(parts),
+                              Perm.monotone_decreasing(parts),
+                              Perm.random(parts)])
+    return skeleton.inflate([random_inflation(size) for size in sizes])
+
+
+def generic_contains(patt, perm):
+    return any(True for _ in CompiledPattern.compile(patt).occurrences_in(perm))
+
+
+def check(patt, perm):
+    matcher = MATCHERS[patt][0]
+    expected = generic_contains(patt, perm)
+    assert matcher(perm) == expected
+    compiled = CompiledPattern.compile(patt)
+    assert compiled.contained_in(perm) == expected
+    assert compiled._search(perm, len(perm)) in (expected, None)
+    assert Perm(perm).contains(Perm(patt)) == expected
+
+
+def test_patterns():
+    assert {len(patt) for patt in MATCHERS} == {3, 4}
+    for patt in itertools.permutations(range(3)):
+        if patt not in ((0, 1, 2), (2, 1, 0)):
+            assert patt in MATCHERS
+
+
+def test_all_short():
+    for patt in MATCHERS:
+        for length in range(7):
+            for perm in itertools.permutations(range(length)):
+                check(patt, Perm(perm))
+
+
+def test_random():
+    for patt in MATCHERS:
+        for _ in range(100):
+            check(patt, Perm.random(random.randint(7, 60)))
+            check(patt, random_inflation(random.randint(7, 80)))
+
+
+def test_avoiders():
+    for patt, (matcher, _, _) in MATCHERS.items():
+        found = 0
+        while found < 5:
+            perm = random_inflation(random.randint(32, 48))
+            if not matcher(perm):
+                check(patt, perm)
+                found += 1